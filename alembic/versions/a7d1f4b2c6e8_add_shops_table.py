@@ -0,0 +1,145 @@
+"""Add shops table and integer shop keys.
+
+Revision ID: a7d1f4b2c6e8
+Revises: f6c9e3a1b4d5
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "a7d1f4b2c6e8"
+down_revision: Union[str, Sequence[str], None] = "f6c9e3a1b4d5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# У админов и суперадминов в users.shop_id лежала заглушка, а не точка
+STAFF_ROLES = "('admin', 'superadmin')"
+
+
+def _create_shop_daily_stats(shop_column: sa.Column) -> None:
+    op.create_table(
+        "shop_daily_stats",
+        shop_column,
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("reports_count", sa.Integer(), nullable=False),
+        sa.Column("score_sum", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("shop_id", "day"),
+    )
+    op.execute(
+        """
+        INSERT INTO shop_daily_stats (shop_id, day, reports_count, score_sum)
+        SELECT users.shop_id, date(reports.created_at), count(reports.id),
+               coalesce(sum(reports.score_percent), 0)
+        FROM reports JOIN users ON reports.user_id = users.id
+        WHERE users.shop_id IS NOT NULL
+        GROUP BY users.shop_id, date(reports.created_at)
+        """
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "shops",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=50), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name", name="uq_shops_name"),
+    )
+    op.execute(
+        f"""
+        INSERT INTO shops (name)
+        SELECT name FROM (
+            SELECT shop_id AS name FROM users
+            WHERE shop_id IS NOT NULL AND role NOT IN {STAFF_ROLES}
+            UNION SELECT shop_id FROM checklists WHERE shop_id IS NOT NULL
+            UNION SELECT shop_name FROM admin_shops
+        ) AS names
+        ORDER BY name
+        """
+    )
+
+    op.drop_table("shop_daily_stats")
+    op.drop_index("ix_checklists_shop_id", table_name="checklists")
+
+    for table, name_column, where in (
+        ("users", "shop_id", f"role NOT IN {STAFF_ROLES}"),
+        ("checklists", "shop_id", "1 = 1"),
+        ("admin_shops", "shop_name", "1 = 1"),
+    ):
+        op.add_column(table, sa.Column("shop_ref", sa.Integer(), nullable=True))
+        op.execute(
+            f"UPDATE {table} SET shop_ref = "
+            f"(SELECT shops.id FROM shops WHERE shops.name = {table}.{name_column}) "
+            f"WHERE {where}"
+        )
+        with op.batch_alter_table(table) as batch_op:
+            if table == "admin_shops":
+                batch_op.drop_constraint("uq_admin_shops_admin_shop", type_="unique")
+            batch_op.drop_column(name_column)
+            batch_op.alter_column(
+                "shop_ref",
+                new_column_name="shop_id",
+                existing_type=sa.Integer(),
+                nullable=table != "admin_shops",
+            )
+        # Отдельным проходом: внешний ключ ссылается на уже переименованный столбец
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.create_foreign_key(f"fk_{table}_shop_id_shops", "shops", ["shop_id"], ["id"])
+            if table == "admin_shops":
+                batch_op.create_unique_constraint(
+                    "uq_admin_shops_admin_shop", ["admin_tg_id", "shop_id"]
+                )
+
+    op.create_index("ix_checklists_shop_id", "checklists", ["shop_id", "id"])
+    _create_shop_daily_stats(
+        sa.Column("shop_id", sa.Integer(), sa.ForeignKey("shops.id"), nullable=False)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("shop_daily_stats")
+    op.drop_index("ix_checklists_shop_id", table_name="checklists")
+
+    for table in ("users", "checklists", "admin_shops"):
+        op.add_column(table, sa.Column("shop_text", sa.String(length=50), nullable=True))
+        op.execute(
+            f"UPDATE {table} SET shop_text = "
+            f"(SELECT shops.name FROM shops WHERE shops.id = {table}.shop_id)"
+        )
+    op.execute(
+        "UPDATE users SET shop_text = CASE role "
+        "WHEN 'admin' THEN 'Управляющий' WHEN 'superadmin' THEN 'GLOBAL' ELSE shop_text END "
+        "WHERE shop_text IS NULL"
+    )
+
+    for table, name_column in (
+        ("users", "shop_id"),
+        ("checklists", "shop_id"),
+        ("admin_shops", "shop_name"),
+    ):
+        with op.batch_alter_table(table) as batch_op:
+            if table == "admin_shops":
+                batch_op.drop_constraint("uq_admin_shops_admin_shop", type_="unique")
+            batch_op.drop_constraint(f"fk_{table}_shop_id_shops", type_="foreignkey")
+            batch_op.drop_column("shop_id")
+            batch_op.alter_column(
+                "shop_text",
+                new_column_name=name_column,
+                existing_type=sa.String(length=50),
+                nullable=table != "admin_shops",
+            )
+        if table == "admin_shops":
+            with op.batch_alter_table(table) as batch_op:
+                batch_op.create_unique_constraint(
+                    "uq_admin_shops_admin_shop", ["admin_tg_id", "shop_name"]
+                )
+
+    op.create_index("ix_checklists_shop_id", "checklists", ["shop_id", "id"])
+    op.drop_table("shops")
+    _create_shop_daily_stats(sa.Column("shop_id", sa.String(length=50), nullable=False))
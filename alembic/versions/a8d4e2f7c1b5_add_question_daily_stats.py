@@ -0,0 +1,57 @@
+"""Add question_daily_stats rollup table.
+
+Revision ID: a8d4e2f7c1b5
+Revises: f7c3d1e6b9a4
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a8d4e2f7c1b5"
+down_revision: Union[str, Sequence[str], None] = "f7c3d1e6b9a4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "question_daily_stats",
+        sa.Column("question_id", sa.Integer(), nullable=False),
+        sa.Column("shop_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("answers_count", sa.Integer(), nullable=False),
+        sa.Column("zero_count", sa.Integer(), nullable=False),
+        sa.Column("low_count", sa.Integer(), nullable=False),
+        sa.Column("points_sum", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["question_id"], ["questions.id"]),
+        sa.ForeignKeyConstraint(["shop_id"], ["shops.id"]),
+        sa.PrimaryKeyConstraint("question_id", "shop_id", "day"),
+    )
+    # Заполняем итоги по ответам, которые еще в БД; 5 - SCALE_FAIL_MAX
+    op.execute(
+        """
+        INSERT INTO question_daily_stats
+            (question_id, shop_id, day, answers_count, zero_count, low_count, points_sum)
+        SELECT answers.question_id, users.shop_id, date(answers.created_at),
+               count(answers.id),
+               sum(CASE WHEN answers.points = 0 THEN 1 ELSE 0 END),
+               sum(CASE WHEN answers.points <= 5 THEN 1 ELSE 0 END),
+               coalesce(sum(answers.points), 0)
+        FROM answers
+        JOIN reports ON reports.id = answers.report_id
+            AND reports.created_at = answers.created_at
+        JOIN users ON reports.user_id = users.id
+        WHERE users.shop_id IS NOT NULL
+        GROUP BY answers.question_id, users.shop_id, date(answers.created_at)
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("question_daily_stats")
@@ -0,0 +1,188 @@
+"""Partition reports and answers by month on Postgres.
+
+Revision ID: b8e2a5c3d7f9
+Revises: a7d1f4b2c6e8
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "b8e2a5c3d7f9"
+down_revision: Union[str, Sequence[str], None] = "a7d1f4b2c6e8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Сколько месяцев вперед создать сразу; дальше их досоздает app.jobs.partitions
+MONTHS_AHEAD = 3
+
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _is_postgres() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def _create_partitions(first: date | None) -> None:
+    last = _add_months(date.today().replace(day=1), MONTHS_AHEAD)
+    month = (first or date.today()).replace(day=1)
+    while month <= last:
+        following = _add_months(month, 1)
+        for table in ("reports", "answers"):
+            op.execute(
+                f"CREATE TABLE {table}_y{month:%Y}m{month:%m} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month}') TO ('{following}')"
+            )
+        month = following
+    # Страховка на случай, если задача не успела создать партицию месяца
+    for table in ("reports", "answers"):
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not _is_postgres():
+        op.add_column("answers", sa.Column("created_at", sa.DateTime(), nullable=True))
+        op.execute(
+            "UPDATE answers SET created_at = "
+            "(SELECT reports.created_at FROM reports WHERE reports.id = answers.report_id)"
+        )
+        # Ответы без отчета недостижимы из интерфейса
+        op.execute("DELETE FROM answers WHERE created_at IS NULL")
+        with op.batch_alter_table("answers") as batch_op:
+            batch_op.alter_column("created_at", existing_type=sa.DateTime(), nullable=False)
+        op.create_index("ix_answers_report_created", "answers", ["report_id", "created_at"])
+        return
+
+    op.execute("ALTER TABLE answers RENAME TO answers_old")
+    op.execute("ALTER TABLE answers_old RENAME CONSTRAINT answers_pkey TO answers_old_pkey")
+    op.execute("ALTER TABLE reports RENAME TO reports_old")
+    op.execute("ALTER TABLE reports_old RENAME CONSTRAINT reports_pkey TO reports_old_pkey")
+    op.drop_index("ix_reports_checklist_created", table_name="reports_old")
+    op.drop_index("ix_reports_user_created", table_name="reports_old")
+
+    # Ключ партиции обязан входить в первичный ключ, поэтому PK - (id, created_at),
+    # а ответ ссылается на отчет парой (report_id, created_at)
+    op.execute(
+        """
+        CREATE TABLE reports (
+            id INTEGER NOT NULL DEFAULT nextval('reports_id_seq'),
+            user_id INTEGER NOT NULL REFERENCES users (id),
+            checklist_id INTEGER NOT NULL REFERENCES checklists (id),
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            score_percent INTEGER NOT NULL,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute(
+        """
+        CREATE TABLE answers (
+            id INTEGER NOT NULL DEFAULT nextval('answers_id_seq'),
+            report_id INTEGER NOT NULL,
+            question_id INTEGER NOT NULL REFERENCES questions (id),
+            answer_text VARCHAR(255),
+            photo_id VARCHAR(255),
+            points INTEGER NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            PRIMARY KEY (id, created_at),
+            FOREIGN KEY (report_id, created_at) REFERENCES reports (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    first = op.get_bind().scalar(sa.text("SELECT min(created_at) FROM reports_old"))
+    _create_partitions(first.date() if first else None)
+
+    op.execute(
+        """
+        INSERT INTO reports (id, user_id, checklist_id, created_at, score_percent)
+        SELECT id, user_id, checklist_id, created_at, score_percent FROM reports_old
+        """
+    )
+    # Ответы без отчета недостижимы из интерфейса и не переносятся
+    op.execute(
+        """
+        INSERT INTO answers
+            (id, report_id, question_id, answer_text, photo_id, points, created_at)
+        SELECT a.id, a.report_id, a.question_id, a.answer_text, a.photo_id, a.points,
+               r.created_at
+        FROM answers_old a JOIN reports_old r ON r.id = a.report_id
+        """
+    )
+
+    op.create_index("ix_reports_checklist_created", "reports", ["checklist_id", "created_at", "id"])
+    op.create_index("ix_reports_user_created", "reports", ["user_id", "created_at", "id"])
+    op.create_index("ix_answers_report_created", "answers", ["report_id", "created_at"])
+
+    op.execute("ALTER SEQUENCE reports_id_seq OWNED BY reports.id")
+    op.execute("ALTER SEQUENCE answers_id_seq OWNED BY answers.id")
+    op.drop_table("answers_old")
+    op.drop_table("reports_old")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if not _is_postgres():
+        op.drop_index("ix_answers_report_created", table_name="answers")
+        with op.batch_alter_table("answers") as batch_op:
+            batch_op.drop_column("created_at")
+        return
+
+    op.drop_index("ix_answers_report_created", table_name="answers")
+    op.drop_index("ix_reports_checklist_created", table_name="reports")
+    op.drop_index("ix_reports_user_created", table_name="reports")
+    op.execute("ALTER TABLE answers RENAME TO answers_part")
+    op.execute("ALTER TABLE answers_part RENAME CONSTRAINT answers_pkey TO answers_part_pkey")
+    op.execute("ALTER TABLE reports RENAME TO reports_part")
+    op.execute("ALTER TABLE reports_part RENAME CONSTRAINT reports_pkey TO reports_part_pkey")
+
+    op.execute(
+        """
+        CREATE TABLE reports (
+            id INTEGER NOT NULL DEFAULT nextval('reports_id_seq') PRIMARY KEY,
+            user_id INTEGER NOT NULL REFERENCES users (id),
+            checklist_id INTEGER NOT NULL REFERENCES checklists (id),
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            score_percent INTEGER NOT NULL
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE TABLE answers (
+            id INTEGER NOT NULL DEFAULT nextval('answers_id_seq') PRIMARY KEY,
+            report_id INTEGER NOT NULL REFERENCES reports (id),
+            question_id INTEGER NOT NULL REFERENCES questions (id),
+            answer_text VARCHAR(255),
+            photo_id VARCHAR(255),
+            points INTEGER NOT NULL
+        )
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO reports (id, user_id, checklist_id, created_at, score_percent)
+        SELECT id, user_id, checklist_id, created_at, score_percent FROM reports_part
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO answers (id, report_id, question_id, answer_text, photo_id, points)
+        SELECT id, report_id, question_id, answer_text, photo_id, points FROM answers_part
+        """
+    )
+    op.create_index("ix_reports_checklist_created", "reports", ["checklist_id", "created_at", "id"])
+    op.create_index("ix_reports_user_created", "reports", ["user_id", "created_at", "id"])
+
+    op.execute("ALTER SEQUENCE reports_id_seq OWNED BY reports.id")
+    op.execute("ALTER SEQUENCE answers_id_seq OWNED BY answers.id")
+    # Партиции удаляются вместе с родительскими таблицами
+    op.execute("DROP TABLE answers_part")
+    op.execute("DROP TABLE reports_part")
@@ -0,0 +1,30 @@
+"""Add answers_archived flag to reports.
+
+Revision ID: c3a9f7e1d2b6
+Revises: b8e2a5c3d7f9
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c3a9f7e1d2b6"
+down_revision: Union[str, Sequence[str], None] = "b8e2a5c3d7f9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "reports",
+        sa.Column("answers_archived", sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("reports", "answers_archived")
@@ -0,0 +1,117 @@
+"""Add status to reports; daily rollups count completed reports only.
+
+Revision ID: c4e7a2d9f1b8
+Revises: b9f5c3e8d2a6
+
+"""
+from datetime import timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app import clock
+from config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c4e7a2d9f1b8"
+down_revision: Union[str, Sequence[str], None] = "b9f5c3e8d2a6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _business_day(column: str) -> str:
+    """Рабочий день по created_at, как в app.crud.reports.business_day_sources.
+
+    Своих пояса и смены у точек на этой ревизии нет: пояс точки совпадает с
+    поясом хранения, и рабочий день - дата (время - начало смены).
+    """
+    shift = settings.shift_start
+    seconds = int(
+        timedelta(hours=shift.hour, minutes=shift.minute, seconds=shift.second).total_seconds()
+    )
+    if not seconds:
+        return f"date({column})"
+    if op.get_bind().dialect.name == "sqlite":
+        return f"date({column}, '-{seconds} seconds')"
+    return f"date({column} - interval '{seconds} seconds')"
+
+
+def _refresh_shop_daily_stats(where: str) -> None:
+    day = _business_day("reports.created_at")
+    op.execute("DELETE FROM shop_daily_stats")
+    op.execute(
+        f"""
+        INSERT INTO shop_daily_stats (shop_id, day, reports_count, score_sum)
+        SELECT users.shop_id, {day}, count(reports.id),
+               coalesce(sum(reports.score_percent), 0)
+        FROM reports JOIN users ON reports.user_id = users.id
+        WHERE users.shop_id IS NOT NULL {where}
+        GROUP BY users.shop_id, {day}
+        """
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "reports",
+        sa.Column("status", sa.String(length=20), nullable=False, server_default="in_progress"),
+    )
+    # Статус раньше не хранился: завершенными считались отчеты с ненулевым
+    # баллом; остальные за прошлые рабочие дни - брошенные. Граница - начало
+    # текущего рабочего дня в поясе хранения, а не CURRENT_DATE сервера БД
+    op.execute("UPDATE reports SET status = 'completed' WHERE score_percent > 0")
+    op.execute(
+        sa.text(
+            "UPDATE reports SET status = 'abandoned' "
+            "WHERE status = 'in_progress' AND created_at < :cutoff"
+        ).bindparams(cutoff=clock.day_bounds()[0])
+    )
+    op.create_index("ix_reports_status_created", "reports", ["status", "created_at"])
+
+    _refresh_shop_daily_stats("AND reports.status = 'completed'")
+    day = _business_day("answers.created_at")
+    op.execute(
+        f"""
+        DELETE FROM question_daily_stats WHERE (question_id, shop_id, day) IN (
+            SELECT answers.question_id, users.shop_id, {day}
+            FROM answers
+            JOIN reports ON reports.id = answers.report_id
+                AND reports.created_at = answers.created_at
+            JOIN users ON reports.user_id = users.id
+            WHERE reports.status <> 'completed'
+        )
+        """
+    )
+    # 5 - SCALE_FAIL_MAX
+    op.execute(
+        f"""
+        INSERT INTO question_daily_stats
+            (question_id, shop_id, day, answers_count, zero_count, low_count, points_sum)
+        SELECT answers.question_id, users.shop_id, {day},
+               count(answers.id),
+               sum(CASE WHEN answers.points = 0 THEN 1 ELSE 0 END),
+               sum(CASE WHEN answers.points <= 5 THEN 1 ELSE 0 END),
+               coalesce(sum(answers.points), 0)
+        FROM answers
+        JOIN reports ON reports.id = answers.report_id
+            AND reports.created_at = answers.created_at
+        JOIN users ON reports.user_id = users.id
+        WHERE users.shop_id IS NOT NULL AND reports.status = 'completed'
+            AND (answers.question_id, users.shop_id, {day}) NOT IN (
+                SELECT question_id, shop_id, day FROM question_daily_stats
+            )
+        GROUP BY answers.question_id, users.shop_id, {day}
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_reports_status_created", table_name="reports")
+    with op.batch_alter_table("reports") as batch_op:
+        batch_op.drop_column("status")
+    # Прежде итоги точек учитывали и незавершенные отчеты
+    _refresh_shop_daily_stats("")
@@ -0,0 +1,29 @@
+"""Add composite indexes for keyset pagination of reports.
+
+Revision ID: d4a7c1e9f2b3
+Revises: c2d8e5f3a4b5
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "d4a7c1e9f2b3"
+down_revision: Union[str, Sequence[str], None] = "c2d8e5f3a4b5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_reports_checklist_created", "reports", ["checklist_id", "created_at", "id"]
+    )
+    op.create_index("ix_reports_user_created", "reports", ["user_id", "created_at", "id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_reports_user_created", table_name="reports")
+    op.drop_index("ix_reports_checklist_created", table_name="reports")
@@ -0,0 +1,46 @@
+"""Soft delete for checklists.
+
+Revision ID: d5e1a8c4f7b2
+Revises: c3a9f7e1d2b6
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d5e1a8c4f7b2"
+down_revision: Union[str, Sequence[str], None] = "c3a9f7e1d2b6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "checklists",
+        sa.Column("is_deleted", sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+    op.add_column("checklists", sa.Column("deleted_at", sa.DateTime(), nullable=True))
+    # Индекс списков шаблонов - только по неудаленным
+    op.drop_index("ix_checklists_shop_id", table_name="checklists")
+    op.create_index(
+        "ix_checklists_shop_id",
+        "checklists",
+        ["shop_id", "id"],
+        postgresql_where=sa.text("is_deleted = false"),
+        sqlite_where=sa.text("is_deleted = 0"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_checklists_shop_id", table_name="checklists")
+    op.create_index("ix_checklists_shop_id", "checklists", ["shop_id", "id"])
+    # Мягко удаленные шаблоны после отката снова видны в списках;
+    # перед откатом их можно вычистить: python -m app.jobs.purge --days 0
+    with op.batch_alter_table("checklists") as batch_op:
+        batch_op.drop_column("deleted_at")
+        batch_op.drop_column("is_deleted")
@@ -0,0 +1,30 @@
+"""Add timezone and shift_start to shops.
+
+Revision ID: d6b3f8e1a9c2
+Revises: c4e7a2d9f1b8
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d6b3f8e1a9c2"
+down_revision: Union[str, Sequence[str], None] = "c4e7a2d9f1b8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("shops", sa.Column("timezone", sa.String(length=50), nullable=True))
+    op.add_column("shops", sa.Column("shift_start", sa.Time(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("shops") as batch_op:
+        batch_op.drop_column("shift_start")
+        batch_op.drop_column("timezone")
@@ -0,0 +1,25 @@
+"""Add index on checklists (shop_id, id).
+
+Revision ID: e5b8d2f0a3c4
+Revises: d4a7c1e9f2b3
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "e5b8d2f0a3c4"
+down_revision: Union[str, Sequence[str], None] = "d4a7c1e9f2b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_checklists_shop_id", "checklists", ["shop_id", "id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_checklists_shop_id", table_name="checklists")
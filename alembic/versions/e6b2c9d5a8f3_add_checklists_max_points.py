@@ -0,0 +1,41 @@
+"""Add precomputed max_points to checklists.
+
+Revision ID: e6b2c9d5a8f3
+Revises: d5e1a8c4f7b2
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e6b2c9d5a8f3"
+down_revision: Union[str, Sequence[str], None] = "d5e1a8c4f7b2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "checklists",
+        sa.Column("max_points", sa.Integer(), nullable=False, server_default="0"),
+    )
+    # Binary - 1 балл, scale - 10, удаленные вопросы не считаются
+    op.execute(
+        """
+        UPDATE checklists SET max_points = COALESCE((
+            SELECT SUM(CASE questions.type WHEN 'binary' THEN 1 WHEN 'scale' THEN 10 ELSE 0 END)
+            FROM questions
+            WHERE questions.checklist_id = checklists.id AND questions.is_deleted = false
+        ), 0)
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("checklists") as batch_op:
+        batch_op.drop_column("max_points")
@@ -0,0 +1,37 @@
+"""Add shop_id snapshot to reports.
+
+Revision ID: e9a4c7f2b5d8
+Revises: d6b3f8e1a9c2
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e9a4c7f2b5d8"
+down_revision: Union[str, Sequence[str], None] = "d6b3f8e1a9c2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("reports", sa.Column("shop_id", sa.Integer(), nullable=True))
+    with op.batch_alter_table("reports") as batch_op:
+        batch_op.create_foreign_key("fk_reports_shop_id_shops", "shops", ["shop_id"], ["id"])
+    # Точка на момент создания не сохранялась - берем текущую точку сотрудника,
+    # по ней же сейчас собраны дневные итоги, так что пересчитывать их не нужно
+    op.execute(
+        "UPDATE reports SET shop_id = "
+        "(SELECT users.shop_id FROM users WHERE users.id = reports.user_id)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("reports") as batch_op:
+        batch_op.drop_constraint("fk_reports_shop_id_shops", type_="foreignkey")
+        batch_op.drop_column("shop_id")
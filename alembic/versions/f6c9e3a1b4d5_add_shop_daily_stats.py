@@ -0,0 +1,44 @@
+"""Add shop_daily_stats rollup table.
+
+Revision ID: f6c9e3a1b4d5
+Revises: e5b8d2f0a3c4
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "f6c9e3a1b4d5"
+down_revision: Union[str, Sequence[str], None] = "e5b8d2f0a3c4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "shop_daily_stats",
+        sa.Column("shop_id", sa.String(length=50), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("reports_count", sa.Integer(), nullable=False),
+        sa.Column("score_sum", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("shop_id", "day"),
+    )
+    # Заполняем итоги по уже накопленной истории
+    op.execute(
+        """
+        INSERT INTO shop_daily_stats (shop_id, day, reports_count, score_sum)
+        SELECT users.shop_id, date(reports.created_at), count(reports.id),
+               coalesce(sum(reports.score_percent), 0)
+        FROM reports JOIN users ON reports.user_id = users.id
+        WHERE users.shop_id IS NOT NULL
+        GROUP BY users.shop_id, date(reports.created_at)
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("shop_daily_stats")
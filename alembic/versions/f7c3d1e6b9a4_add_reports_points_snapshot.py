@@ -0,0 +1,56 @@
+"""Add points_sum and max_points snapshot to reports.
+
+Revision ID: f7c3d1e6b9a4
+Revises: e6b2c9d5a8f3
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f7c3d1e6b9a4"
+down_revision: Union[str, Sequence[str], None] = "e6b2c9d5a8f3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "reports", sa.Column("points_sum", sa.Integer(), nullable=False, server_default="0")
+    )
+    op.add_column(
+        "reports", sa.Column("max_points", sa.Integer(), nullable=False, server_default="0")
+    )
+    # Исторический максимум не сохранялся - берем текущий максимум шаблона
+    op.execute(
+        """
+        UPDATE reports SET max_points = COALESCE(
+            (SELECT checklists.max_points FROM checklists
+             WHERE checklists.id = reports.checklist_id), 0)
+        """
+    )
+    op.execute(
+        """
+        UPDATE reports SET points_sum = COALESCE(
+            (SELECT SUM(answers.points) FROM answers
+             WHERE answers.report_id = reports.id
+               AND answers.created_at = reports.created_at), 0)
+        WHERE answers_archived = false
+        """
+    )
+    # Ответы вынесенных в архив отчетов уже не в БД - восстанавливаем по проценту
+    op.execute(
+        "UPDATE reports SET points_sum = score_percent * max_points / 100 "
+        "WHERE answers_archived = true"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("reports") as batch_op:
+        batch_op.drop_column("max_points")
+        batch_op.drop_column("points_sum")
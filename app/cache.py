@@ -0,0 +1,147 @@
+"""Кэш в памяти процесса для тяжелых аналитических выборок.
+
+Значения живут `ttl` секунд; при переполнении вытесняются давно не
+читавшиеся (LRU). Декоратор `cached` кэширует async-функцию по ее
+аргументам и сбрасывает кэш по доменным событиям из `app.events`.
+Счетчики попаданий и промахов всех кэшей - `cache_stats()`.
+Кэш не разделяется между процессами и сбрасывается при перезапуске.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable, Iterable
+from typing import Any, TypeVar
+
+from app import events
+
+
+MISSING = object()
+
+DEFAULT_TTL = 5 * 60
+DEFAULT_MAXSIZE = 256
+
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+
+class TTLCache:
+    def __init__(self, ttl: float, maxsize: int = DEFAULT_MAXSIZE, name: str = "") -> None:
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.name = name
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        # Растет при каждом сбросе: результат, посчитанный до сброса, не сохраняется
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Any:
+        """Значение по ключу или MISSING, если его нет или оно устарело."""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return MISSING
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._data.pop(key, None)
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.generation += 1
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_registry: dict[str, TTLCache] = {}
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    return value
+
+
+def cached(
+    ttl: float = DEFAULT_TTL,
+    maxsize: int = DEFAULT_MAXSIZE,
+    invalidate_on: Iterable[str] = events.ALL_EVENTS,
+) -> Callable[[F], F]:
+    """Кэшировать результат async-функции по аргументам.
+
+    Кэш сбрасывается целиком по любому событию из invalidate_on. Результат
+    отдается без копирования - вызывающий не должен его менять.
+    """
+
+    def decorator(fn: F) -> F:
+        signature = inspect.signature(fn)
+        cache = TTLCache(ttl, maxsize, name=fn.__name__)
+        _registry[fn.__name__] = cache
+        for event in invalidate_on:
+            events.subscribe(event, lambda **_: cache.clear())
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            # Через сигнатуру: f(1) и f(shop_id=1) - один ключ
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = _freeze(tuple(bound.arguments.values()))
+            value = cache.get(key)
+            if value is not MISSING:
+                return value
+            generation = cache.generation
+            value = await fn(*args, **kwargs)
+            if cache.generation == generation:
+                cache.set(key, value)
+            return value
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+
+def cache_stats() -> list[dict]:
+    """Счетчики всех кэшей, созданных через cached."""
+    return [cache.stats() for cache in _registry.values()]
+
+
+def clear_caches() -> None:
+    for cache in _registry.values():
+        cache.clear()
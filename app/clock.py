@@ -0,0 +1,148 @@
+"""Время бота: пояс хранения и рабочий день точек.
+
+Метки времени в БД наивные и означают время в поясе `settings.timezone`
+(пусто - пояс сервера из TZ или /etc/localtime, как до появления
+настройки). Текущее время для записи и сравнения с колонками берется из
+`now()`, а не из datetime.now(), так что от пояса сервера оно не зависит. Тип колонок не меняется:
+reports.created_at и answers.created_at - ключ секционирования на Postgres.
+
+У точки свой пояс и начало смены (Shop.timezone, Shop.shift_start; пусто -
+значения из настроек). Рабочий день точки идет от начала смены до начала
+следующей по ее часам. `day_bounds` переводит его в пояс хранения один раз
+на запрос, и фильтр по created_at остается диапазоном по индексу. По рабочим
+дням раскладываются и дневные итоги (`day_offsets`).
+"""
+
+from __future__ import annotations
+
+import functools
+import logging
+import os
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+from pathlib import Path
+from typing import TYPE_CHECKING
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from config import settings
+
+if TYPE_CHECKING:
+    from app.models import Shop
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_zone(name: str) -> ZoneInfo:
+    """Пояс по имени IANA (Europe/Moscow); ValueError, если такого нет."""
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Неизвестный часовой пояс: {name}") from None
+
+
+@functools.cache
+def local_zone() -> tzinfo:
+    """Пояс сервера как зона IANA: из TZ или /etc/localtime.
+
+    Именно зона, а не текущее смещение: границы прошлых дней по другую
+    сторону перехода на летнее время должны считаться по своему смещению.
+    """
+    name = os.environ.get("TZ", "").lstrip(":")
+    if name:
+        try:
+            return get_zone(name)
+        except ValueError:
+            pass
+    localtime = Path("/etc/localtime")
+    if localtime.is_symlink():
+        target = str(localtime.resolve())
+        if "zoneinfo/" in target:
+            try:
+                return get_zone(target.split("zoneinfo/", 1)[1])
+            except ValueError:
+                pass
+    if localtime.exists():
+        with localtime.open("rb") as f:
+            return ZoneInfo.from_file(f, key="localtime")
+    # Без базы поясов (Windows) остается только текущее смещение
+    logger.warning("Пояс сервера не определен, задайте settings.timezone")
+    return datetime.now().astimezone().tzinfo
+
+
+def storage_zone() -> tzinfo:
+    if settings.timezone:
+        return get_zone(settings.timezone)
+    return local_zone()
+
+
+def to_storage(moment: datetime) -> datetime:
+    """Момент с поясом -> наивное время в поясе хранения."""
+    return moment.astimezone(storage_zone()).replace(tzinfo=None)
+
+
+def from_storage(value: datetime) -> datetime:
+    """Наивное время из БД -> момент с поясом."""
+    return value.replace(tzinfo=storage_zone())
+
+
+def now() -> datetime:
+    """Текущее время в поясе хранения - для записи и сравнения с колонками БД."""
+    return to_storage(datetime.now(timezone.utc))
+
+
+def today() -> date:
+    """Текущая дата в поясе хранения (дни дневных итогов и партиций)."""
+    return now().date()
+
+
+def shop_zone(shop: Shop | None) -> tzinfo:
+    if shop is not None and shop.timezone:
+        return get_zone(shop.timezone)
+    return storage_zone()
+
+
+def shop_shift_start(shop: Shop | None) -> time:
+    if shop is not None and shop.shift_start is not None:
+        return shop.shift_start
+    return settings.shift_start
+
+
+def business_day(shop: Shop | None = None, moment: datetime | None = None) -> date:
+    """Рабочий день точки, к которому относится moment (с поясом; по умолчанию - сейчас)."""
+    local = (moment or datetime.now(timezone.utc)).astimezone(shop_zone(shop))
+    day = local.date()
+    if local.time() < shop_shift_start(shop):
+        day -= timedelta(days=1)
+    return day
+
+
+def day_bounds(shop: Shop | None = None, day: date | None = None) -> tuple[datetime, datetime]:
+    """[начало, конец) рабочего дня точки (по умолчанию текущего) в поясе хранения."""
+    if day is None:
+        day = business_day(shop)
+    zone = shop_zone(shop)
+    start = shop_shift_start(shop)
+    return (
+        to_storage(datetime.combine(day, start, tzinfo=zone)),
+        to_storage(datetime.combine(day + timedelta(days=1), start, tzinfo=zone)),
+    )
+
+
+def day_offsets(
+    shop: Shop | None, start: date, end: date
+) -> list[tuple[datetime, timedelta]]:
+    """Рабочие дни [start, end) в виде сдвигов времени хранения: [(с момента, сдвиг)].
+
+    С указанного момента рабочий день точки - дата (время - сдвиг). Новый
+    элемент появляется, только когда сдвиг меняется (переход на летнее время),
+    так что в SQL рабочий день считается выражением над created_at.
+    """
+    offsets: list[tuple[datetime, timedelta]] = []
+    day = start
+    while day < end or not offsets:
+        begin = day_bounds(shop, day)[0]
+        offset = begin - datetime.combine(day, time())
+        if not offsets or offsets[-1][1] != offset:
+            offsets.append((begin, offset))
+        day += timedelta(days=1)
+    return offsets
@@ -12,37 +12,50 @@ from .users import (
     get_all_shops,
     get_all_workers,
     get_admin_shops,
+    get_admins_with_shops,
     get_employees_by_shop,
     get_employees_with_reports,
+    get_shop,
     get_user,
     get_user_by_pk,
+    update_shop_schedule,
     update_user,
 )
 from .checklists import (
     add_question,
     create_checklist,
     delete_checklist,
+    purge_checklist,
+    rebuild_checklist_max_points,
     delete_question,
     get_checklist,
     get_checklists,
+    get_checklists_count_by_shop,
     get_checklists_for_user,
-    get_checklists_today,
+    get_checklists_page,
     get_question,
     get_questions,
     update_checklist,
     update_question,
 )
 from .reports import (
+    abandon_stale_reports,
     create_report,
     finish_report_calculation,
     get_all_reports_data,
+    get_checklists_today,
     get_monthly_stats_by_shop,
+    get_pending_checklists_today,
     get_report_details,
     get_reports_by_checklist_id,
     get_reports_by_user_tg_id,
     get_today_completed_checklist_ids,
+    rebuild_question_daily_stats,
+    rebuild_report_scores,
+    rebuild_shop_daily_stats,
     save_answer_with_points,
 )
+from .leaderboard import get_workers_leaderboard
 from .analytics import (
     get_admin_activity_stats,
     get_admin_checklists,
@@ -53,6 +66,10 @@ from .analytics import (
     get_checklists_by_shop,
     get_checklists_shops,
     get_network_overview_stats,
+    get_question_failure_stats,
+    get_score_distribution,
+    get_score_series,
+    get_score_series_by_shop,
     get_workers_by_shop,
     get_workers_shops,
 )
@@ -69,16 +86,23 @@ __all__ = [
     "get_all_workers",
     "get_all_admins",
     "get_all_shops",
+    "get_shop",
+    "update_shop_schedule",
     "get_admin_shops",
+    "get_admins_with_shops",
     "get_employees_by_shop",
     "get_employees_with_reports",
     # checklists
     "create_checklist",
     "update_checklist",
     "delete_checklist",
+    "purge_checklist",
+    "rebuild_checklist_max_points",
     "get_checklist",
     "get_checklists_for_user",
     "get_checklists",
+    "get_checklists_page",
+    "get_checklists_count_by_shop",
     "get_questions",
     "get_question",
     "add_question",
@@ -90,8 +114,13 @@ __all__ = [
     "save_answer_with_points",
     "finish_report_calculation",
     "get_monthly_stats_by_shop",
+    "rebuild_question_daily_stats",
+    "rebuild_report_scores",
+    "rebuild_shop_daily_stats",
+    "abandon_stale_reports",
     "get_all_reports_data",
     "get_today_completed_checklist_ids",
+    "get_pending_checklists_today",
     "get_reports_by_checklist_id",
     "get_report_details",
     "get_employees_with_reports",
@@ -108,4 +137,10 @@ __all__ = [
     "get_checklists_by_shop",
     "get_workers_shops",
     "get_workers_by_shop",
+    "get_question_failure_stats",
+    "get_score_series",
+    "get_score_series_by_shop",
+    "get_score_distribution",
+    # leaderboard
+    "get_workers_leaderboard",
 ]
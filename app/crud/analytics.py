@@ -1,13 +1,35 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from math import ceil, floor
 
-from sqlalchemy import desc, func, select
+from sqlalchemy import Date, Float, and_, case, cast, desc, func, or_, select
 
+from app.cache import cached
+from app.clock import now, today
+from app.crud.leaderboard import get_workers_leaderboard
+from app.crud.reports import business_day_sources, today_filter
 from app.db import async_session
-from app.models import AdminShop, Checklist, Question, Report, User
-
-
+from app.events import (
+    CHECKLISTS_CHANGED,
+    REPORT_EVENTS,
+    REPORT_FINISHED,
+    REPORTS_CHANGED,
+    USERS_CHANGED,
+)
+from app.models import (
+    AdminShop,
+    Checklist,
+    Question,
+    QuestionDailyStats,
+    Report,
+    Shop,
+    ShopDailyStats,
+    User,
+)
+
+
+@cached()
 async def get_admin_activity_stats(admin_tg_id: int) -> dict:
     """Получить статистику активности управленца."""
     async with async_session() as session:
@@ -17,15 +39,21 @@ async def get_admin_activity_stats(admin_tg_id: int) -> dict:
 
         # Получаем точки админа
         shops_result = await session.execute(
-            select(AdminShop.shop_name).where(AdminShop.admin_tg_id == admin_tg_id)
+            select(Shop.id, Shop.name)
+            .join(AdminShop, AdminShop.shop_id == Shop.id)
+            .where(AdminShop.admin_tg_id == admin_tg_id)
+            .order_by(AdminShop.id)
         )
-        admin_shops = [row[0] for row in shops_result.all()]
+        shops_rows = shops_result.all()
+        admin_shops = [shop_id for shop_id, _ in shops_rows]
 
         # Количество чек-листов, созданных для точек админа
         checklists_count = 0
         if admin_shops:
             checklists_result = await session.execute(
-                select(func.count(Checklist.id)).where(Checklist.shop_id.in_(admin_shops))
+                select(func.count(Checklist.id))
+                .where(Checklist.shop_id.in_(admin_shops))
+                .where(Checklist.is_deleted == False)
             )
             checklists_count = checklists_result.scalar() or 0
 
@@ -54,7 +82,7 @@ async def get_admin_activity_stats(admin_tg_id: int) -> dict:
                 last_activity = last_activity_row[0]
 
         # Количество отчетов за последние 7 дней
-        week_ago = datetime.now() - timedelta(days=7)
+        week_ago = now() - timedelta(days=7)
         reports_count_week = 0
         if admin_shops:
             reports_result = await session.execute(
@@ -62,12 +90,13 @@ async def get_admin_activity_stats(admin_tg_id: int) -> dict:
                 .join(User, Report.user_id == User.id)
                 .where(User.shop_id.in_(admin_shops))
                 .where(Report.created_at >= week_ago)
+                .where(Report.status == "completed")
             )
             reports_count_week = reports_result.scalar() or 0
 
         return {
             "admin": admin,
-            "shops": admin_shops,
+            "shops": [name for _, name in shops_rows],
             "checklists_count": checklists_count,
             "workers_count": workers_count,
             "last_activity": last_activity,
@@ -75,6 +104,7 @@ async def get_admin_activity_stats(admin_tg_id: int) -> dict:
         }
 
 
+@cached()
 async def get_all_admins_activity() -> list[dict]:
     """Получить статистику активности всех управленцев."""
     async with async_session() as session:
@@ -91,6 +121,7 @@ async def get_all_admins_activity() -> list[dict]:
         return result
 
 
+@cached(invalidate_on=(*REPORT_EVENTS, USERS_CHANGED))
 async def get_worker_activity_stats(worker_id: int) -> dict:
     """Получить статистику активности сотрудника."""
     async with async_session() as session:
@@ -106,20 +137,18 @@ async def get_worker_activity_stats(worker_id: int) -> dict:
         )
         reports = list(reports_result.scalars().all())
 
-        # Статистика
-        total_reports = len(reports)
+        # Статистика по завершенным; активность - и по начатым
+        completed = [r for r in reports if r.status == "completed"]
+        total_reports = len(completed)
         avg_score = 0
-        last_activity = None
+        last_activity = reports[0].created_at if reports else None
 
-        if reports:
-            scores = [r.score_percent for r in reports if r.score_percent > 0]
-            if scores:
-                avg_score = int(sum(scores) / len(scores))
-            last_activity = reports[0].created_at
+        if completed:
+            avg_score = int(sum(r.score_percent for r in completed) / len(completed))
 
         # Отчеты за последние 7 дней
-        week_ago = datetime.now() - timedelta(days=7)
-        reports_week = [r for r in reports if r.created_at >= week_ago]
+        week_ago = now() - timedelta(days=7)
+        reports_week = [r for r in completed if r.created_at >= week_ago]
         reports_count_week = len(reports_week)
 
         return {
@@ -131,6 +160,7 @@ async def get_worker_activity_stats(worker_id: int) -> dict:
         }
 
 
+@cached(invalidate_on=(*REPORT_EVENTS, USERS_CHANGED))
 async def get_all_workers_activity() -> list[dict]:
     """Получить статистику активности всех сотрудников."""
     async with async_session() as session:
@@ -148,6 +178,7 @@ async def get_all_workers_activity() -> list[dict]:
         return result
 
 
+@cached()
 async def get_checklist_usage_stats(checklist_id: int) -> dict:
     """Получить статистику использования чек-листа."""
     async with async_session() as session:
@@ -166,7 +197,9 @@ async def get_checklist_usage_stats(checklist_id: int) -> dict:
 
         # Количество отчетов
         reports_result = await session.execute(
-            select(func.count(Report.id)).where(Report.checklist_id == checklist_id)
+            select(func.count(Report.id))
+            .where(Report.checklist_id == checklist_id)
+            .where(Report.status == "completed")
         )
         reports_count = reports_result.scalar() or 0
 
@@ -174,7 +207,7 @@ async def get_checklist_usage_stats(checklist_id: int) -> dict:
         avg_score_result = await session.execute(
             select(func.avg(Report.score_percent))
             .where(Report.checklist_id == checklist_id)
-            .where(Report.score_percent > 0)
+            .where(Report.status == "completed")
         )
         avg_score = avg_score_result.scalar()
         avg_score = int(avg_score) if avg_score else 0
@@ -194,7 +227,7 @@ async def get_checklist_usage_stats(checklist_id: int) -> dict:
         if checklist.shop_id:
             admin_shops_result = await session.execute(
                 select(AdminShop.admin_tg_id)
-                .where(AdminShop.shop_name == checklist.shop_id)
+                .where(AdminShop.shop_id == checklist.shop_id)
                 .limit(1)
             )
             admin_tg_id_row = admin_shops_result.first()
@@ -216,10 +249,13 @@ async def get_checklist_usage_stats(checklist_id: int) -> dict:
         }
 
 
+@cached()
 async def get_all_checklists_stats() -> list[dict]:
     """Получить статистику всех чек-листов."""
     async with async_session() as session:
-        checklists = await session.execute(select(Checklist).order_by(Checklist.id))
+        checklists = await session.execute(
+            select(Checklist).where(Checklist.is_deleted == False).order_by(Checklist.id)
+        )
         checklists_list = list(checklists.scalars().all())
 
         result = []
@@ -231,34 +267,40 @@ async def get_all_checklists_stats() -> list[dict]:
         return result
 
 
-async def get_checklists_shops() -> list[str]:
-    """Получить список всех уникальных точек, у которых есть чек-листы."""
+@cached(invalidate_on=(CHECKLISTS_CHANGED, USERS_CHANGED))
+async def get_checklists_shops() -> list[tuple[int | None, str, int]]:
+    """Точки, у которых есть чек-листы: (id точки, название, число шаблонов).
+
+    Общие шаблоны (без точки) идут первыми как (None, "Все точки", n).
+    """
     async with async_session() as session:
-        result = await session.execute(
-            select(Checklist.shop_id)
-            .where(Checklist.shop_id.is_not(None))
-            .distinct()
-            .order_by(Checklist.shop_id)
+        counts = (
+            select(Checklist.shop_id, func.count(Checklist.id).label("n"))
+            .where(Checklist.is_deleted == False)
+            .group_by(Checklist.shop_id)
+            .subquery()
         )
-        shops = [row[0] for row in result.all() if row[0]]
-        # Добавляем "Все точки" если есть чек-листы без точки
-        checklists_without_shop = await session.scalar(
-            select(func.count(Checklist.id)).where(Checklist.shop_id.is_(None))
+        result = await session.execute(
+            select(counts.c.shop_id, Shop.name, counts.c.n)
+            .outerjoin(Shop, Shop.id == counts.c.shop_id)
+            .order_by(counts.c.shop_id.is_not(None), Shop.name)
         )
-        if checklists_without_shop and checklists_without_shop > 0:
-            shops.insert(0, "Все точки")
-        return shops
+        return [
+            (shop_id, name if shop_id is not None else "Все точки", n)
+            for shop_id, name, n in result.all()
+        ]
 
 
-async def get_checklists_by_shop(shop_id: str | None) -> list[dict]:
-    """Получить все чек-листы для конкретной точки с статистикой."""
+@cached()
+async def get_checklists_by_shop(shop_id: int | None) -> list[dict]:
+    """Получить все чек-листы для конкретной точки с статистикой (None - общие)."""
     async with async_session() as session:
-        if shop_id == "Все точки":
+        if shop_id is None:
             query = select(Checklist).where(Checklist.shop_id.is_(None)).order_by(Checklist.id)
         else:
             query = select(Checklist).where(Checklist.shop_id == shop_id).order_by(Checklist.id)
         
-        checklists_result = await session.execute(query)
+        checklists_result = await session.execute(query.where(Checklist.is_deleted == False))
         checklists = list(checklists_result.scalars().all())
 
         result = []
@@ -270,6 +312,7 @@ async def get_checklists_by_shop(shop_id: str | None) -> list[dict]:
         return result
 
 
+@cached()
 async def get_admin_checklists(admin_tg_id: int) -> list[dict]:
     """Получить все чек-листы управленца с статистикой."""
     async with async_session() as session:
@@ -279,16 +322,19 @@ async def get_admin_checklists(admin_tg_id: int) -> list[dict]:
 
         # Получаем точки админа
         shops_result = await session.execute(
-            select(AdminShop.shop_name).where(AdminShop.admin_tg_id == admin_tg_id)
+            select(AdminShop.shop_id).where(AdminShop.admin_tg_id == admin_tg_id)
         )
-        admin_shops = [row[0] for row in shops_result.all()]
+        admin_shops = list(shops_result.scalars().all())
 
         if not admin_shops:
             return []
 
         # Получаем чек-листы для точек админа
         checklists_result = await session.execute(
-            select(Checklist).where(Checklist.shop_id.in_(admin_shops)).order_by(Checklist.id)
+            select(Checklist)
+            .where(Checklist.shop_id.in_(admin_shops))
+            .where(Checklist.is_deleted == False)
+            .order_by(Checklist.id)
         )
         checklists = list(checklists_result.scalars().all())
 
@@ -301,6 +347,7 @@ async def get_admin_checklists(admin_tg_id: int) -> list[dict]:
         return result
 
 
+@cached(invalidate_on=(*REPORT_EVENTS, USERS_CHANGED))
 async def get_admin_workers(admin_tg_id: int) -> list[dict]:
     """Получить всех сотрудников управленца с статистикой."""
     async with async_session() as session:
@@ -310,9 +357,9 @@ async def get_admin_workers(admin_tg_id: int) -> list[dict]:
 
         # Получаем точки админа
         shops_result = await session.execute(
-            select(AdminShop.shop_name).where(AdminShop.admin_tg_id == admin_tg_id)
+            select(AdminShop.shop_id).where(AdminShop.admin_tg_id == admin_tg_id)
         )
-        admin_shops = [row[0] for row in shops_result.all()]
+        admin_shops = list(shops_result.scalars().all())
 
         if not admin_shops:
             return []
@@ -335,63 +382,84 @@ async def get_admin_workers(admin_tg_id: int) -> list[dict]:
         return result
 
 
-async def get_workers_shops() -> list[str]:
-    """Получить список всех уникальных точек, у которых есть сотрудники."""
+@cached(invalidate_on=(USERS_CHANGED,))
+async def get_workers_shops() -> list[tuple[int | None, str, int]]:
+    """Точки, у которых есть сотрудники: (id точки, название, число сотрудников).
+
+    Сотрудники без точки идут последними как (None, "Без точки", n).
+    """
     async with async_session() as session:
-        result = await session.execute(
-            select(User.shop_id)
+        counts = (
+            select(User.shop_id, func.count(User.id).label("n"))
             .where(User.role == "worker")
-            .where(User.shop_id.is_not(None))
-            .distinct()
-            .order_by(User.shop_id)
+            .group_by(User.shop_id)
+            .subquery()
         )
-        shops = [row[0] for row in result.all() if row[0]]
-        # Добавляем "Без точки" если есть сотрудники без точки
-        workers_without_shop = await session.scalar(
-            select(func.count(User.id)).where(User.role == "worker").where(User.shop_id.is_(None))
+        result = await session.execute(
+            select(counts.c.shop_id, Shop.name, counts.c.n)
+            .outerjoin(Shop, Shop.id == counts.c.shop_id)
+            .order_by(counts.c.shop_id.is_(None), Shop.name)
         )
-        if workers_without_shop and workers_without_shop > 0:
-            shops.append("Без точки")
-        return shops
+        return [
+            (shop_id, name if shop_id is not None else "Без точки", n)
+            for shop_id, name, n in result.all()
+        ]
 
 
-async def get_workers_by_shop(shop_id: str | None, offset: int = 0, limit: int = 5) -> tuple[list[dict], int]:
-    """Получить сотрудников конкретной точки с пагинацией.
-    
+@cached(invalidate_on=(*REPORT_EVENTS, USERS_CHANGED))
+async def get_workers_by_shop(
+    shop_id: int | None, offset: int = 0, limit: int = 5, order: str = "reports"
+) -> tuple[list[dict], int]:
+    """Получить сотрудников конкретной точки с пагинацией (None - без точки).
+
+    Порядок - по месту в рейтинге (order: "reports" или "score", см.
+    get_workers_leaderboard), так что он сквозной для всех страниц.
+
     Returns:
         tuple: (список сотрудников со статистикой, общее количество сотрудников)
     """
+    rows, total_count = await get_workers_leaderboard(shop_id, order, offset, limit)
+    if not rows:
+        return [], total_count
+
+    # Активность за неделю зависит от текущего времени - ее досчитываем только для страницы
+    week_ago = now() - timedelta(days=7)
+    completed_this_week = and_(Report.created_at >= week_ago, Report.status == "completed")
     async with async_session() as session:
-        if shop_id == "Без точки":
-            query = select(User).where(User.role == "worker").where(User.shop_id.is_(None))
-            count_query = select(func.count(User.id)).where(User.role == "worker").where(User.shop_id.is_(None))
-        else:
-            query = select(User).where(User.role == "worker").where(User.shop_id == shop_id)
-            count_query = select(func.count(User.id)).where(User.role == "worker").where(User.shop_id == shop_id)
-        
-        # Получаем общее количество
-        total_count = await session.scalar(count_query) or 0
-        
-        # Получаем сотрудников с пагинацией, сортируем по активности (по количеству отчетов)
-        workers_result = await session.execute(
-            query.order_by(User.full_name).offset(offset).limit(limit)
+        activity = await session.execute(
+            select(
+                User,
+                func.max(Report.created_at),
+                func.count(case((completed_this_week, Report.id))),
+            )
+            .outerjoin(Report, Report.user_id == User.id)
+            .where(User.id.in_([user_id for _, user_id, _, _ in rows]))
+            .group_by(User.id)
         )
-        workers = list(workers_result.scalars().all())
-        
-        result = []
-        for worker in workers:
-            stats = await get_worker_activity_stats(worker.id)
-            if stats:
-                result.append(stats)
-        
-        # Сортируем по активности (количество отчетов)
-        result.sort(key=lambda x: x.get("total_reports", 0), reverse=True)
-        
-        return result, total_count
+        by_id = {worker.id: (worker, last, week) for worker, last, week in activity}
+
+    result = []
+    for rank, user_id, total_reports, avg_score in rows:
+        if user_id not in by_id:
+            # Удален после загрузки рейтинга
+            continue
+        worker, last_activity, reports_week = by_id[user_id]
+        result.append(
+            {
+                "worker": worker,
+                "rank": rank,
+                "total_reports": total_reports,
+                "avg_score": avg_score,
+                "last_activity": last_activity,
+                "reports_count_week": reports_week,
+            }
+        )
+    return result, total_count
 
 
+@cached()
 async def get_network_overview_stats() -> dict:
-    """Получить общую статистику по сети."""
+    """Получить общую статистику по сети (отчеты - только завершенные)."""
     async with async_session() as session:
         # Общее количество админов
         admins_count_result = await session.execute(
@@ -407,32 +475,38 @@ async def get_network_overview_stats() -> dict:
 
         # Общее количество чек-листов
         checklists_count_result = await session.execute(
-            select(func.count(Checklist.id))
+            select(func.count(Checklist.id)).where(Checklist.is_deleted == False)
         )
         checklists_count = checklists_count_result.scalar() or 0
 
+        completed = Report.status == "completed"
+
         # Общее количество отчетов
-        reports_count_result = await session.execute(select(func.count(Report.id)))
+        reports_count_result = await session.execute(
+            select(func.count(Report.id)).where(completed)
+        )
         reports_count = reports_count_result.scalar() or 0
 
         # Средний балл по всем отчетам
         avg_score_result = await session.execute(
-            select(func.avg(Report.score_percent)).where(Report.score_percent > 0)
+            select(func.avg(Report.score_percent)).where(completed)
         )
         avg_score = avg_score_result.scalar()
         avg_score = int(avg_score) if avg_score else 0
 
-        # Отчеты за сегодня
-        today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        # Отчеты за сегодня - по рабочему дню точки каждого сотрудника
         reports_today_result = await session.execute(
-            select(func.count(Report.id)).where(Report.created_at >= today_start)
+            select(func.count(Report.id))
+            .join(User, Report.user_id == User.id)
+            .where(completed)
+            .where(await today_filter(session))
         )
         reports_today = reports_today_result.scalar() or 0
 
         # Отчеты за последние 7 дней
-        week_ago = datetime.now() - timedelta(days=7)
+        week_ago = now() - timedelta(days=7)
         reports_week_result = await session.execute(
-            select(func.count(Report.id)).where(Report.created_at >= week_ago)
+            select(func.count(Report.id)).where(completed).where(Report.created_at >= week_ago)
         )
         reports_week = reports_week_result.scalar() or 0
 
@@ -455,3 +529,374 @@ async def get_network_overview_stats() -> dict:
             "shops_count": shops_count,
         }
 
+
+FAILURE_MIN_ANSWERS = 5
+
+
+@cached(invalidate_on=(REPORT_FINISHED, REPORTS_CHANGED, CHECKLISTS_CHANGED, USERS_CHANGED))
+async def get_question_failure_stats(
+    shop_ids: list[int] | None = None,
+    start: date | None = None,
+    end: date | None = None,
+    by_shop: bool = True,
+    min_answers: int = FAILURE_MIN_ANSWERS,
+    limit: int = 10,
+) -> list[dict]:
+    """Пункты чек-листов, которые чаще всего проваливают, за дни [start, end).
+
+    Провал - "Нет" в binary или оценка не выше SCALE_FAIL_MAX в scale.
+    По умолчанию - последние 30 дней по всей сети с разбивкой по точкам
+    (by_shop=False - по вопросу в целом). Тренд - доля провалов за такой же
+    предыдущий период. Пункты без провалов не попадают в список.
+    Читает дневные итоги question_daily_stats, а не ответы.
+    """
+    if shop_ids is not None and not shop_ids:
+        return []
+    if end is None:
+        end = today() + timedelta(days=1)
+    if start is None:
+        start = end - timedelta(days=30)
+    prev_start = start - (end - start)
+
+    stats = QuestionDailyStats
+    current = stats.day >= start
+    fails = case((Question.type == "binary", stats.zero_count), else_=stats.low_count)
+
+    group = [Question.id, Question.type]
+    if by_shop:
+        group.append(stats.shop_id)
+    query = (
+        select(
+            *group,
+            func.sum(case((current, stats.answers_count), else_=0)).label("answers"),
+            func.sum(case((current, fails), else_=0)).label("fails"),
+            func.sum(case((current, stats.points_sum), else_=0)).label("points"),
+            func.sum(case((current, 0), else_=stats.answers_count)).label("prev_answers"),
+            func.sum(case((current, 0), else_=fails)).label("prev_fails"),
+        )
+        .join(Question, Question.id == stats.question_id)
+        .join(Checklist, Checklist.id == Question.checklist_id)
+        .where(stats.day >= prev_start)
+        .where(stats.day < end)
+        .where(Question.type.in_(("binary", "scale")))
+        .where(Question.is_deleted == False)
+        .where(Checklist.is_deleted == False)
+        .group_by(*group)
+    )
+    if shop_ids is not None:
+        query = query.where(stats.shop_id.in_(shop_ids))
+    # Отбор и сортировка - снаружи, по готовым колонкам
+    totals = query.subquery()
+    query = (
+        select(totals)
+        .where(totals.c.answers >= min_answers)
+        .where(totals.c.fails > 0)
+        .order_by(desc(cast(totals.c.fails, Float) / totals.c.answers), desc(totals.c.answers))
+        .limit(limit)
+    )
+
+    async with async_session() as session:
+        rows = (await session.execute(query)).all()
+        if not rows:
+            return []
+
+        names = await session.execute(
+            select(Question.id, Question.text, Checklist.title)
+            .join(Checklist, Checklist.id == Question.checklist_id)
+            .where(Question.id.in_({row.id for row in rows}))
+        )
+        questions = {qid: (text, title) for qid, text, title in names.all()}
+        shops = {}
+        if by_shop:
+            shops = {
+                shop.id: shop.name
+                for shop in await session.scalars(
+                    select(Shop).where(Shop.id.in_({row.shop_id for row in rows}))
+                )
+            }
+
+    result = []
+    for row in rows:
+        question_text, checklist_title = questions[row.id]
+        shop_id = row.shop_id if by_shop else None
+        result.append(
+            {
+                "question_id": row.id,
+                "question": question_text,
+                "checklist": checklist_title,
+                "shop_id": shop_id,
+                "shop": shops.get(shop_id) if by_shop else None,
+                "answers": row.answers,
+                "fails": row.fails,
+                "fail_rate": row.fails / row.answers,
+                "avg_scale": row.points / row.answers if row.type == "scale" else None,
+                "prev_fail_rate": (
+                    row.prev_fails / row.prev_answers if row.prev_answers else None
+                ),
+            }
+        )
+    return result
+
+
+SERIES_BUCKETS = ("day", "week", "month")
+
+
+def _bucket_start(day: date, bucket: str) -> date:
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _next_bucket(start: date, bucket: str) -> date:
+    if bucket == "week":
+        return start + timedelta(days=7)
+    if bucket == "month":
+        return (start + timedelta(days=32)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+@cached(invalidate_on=(*REPORT_EVENTS, USERS_CHANGED))
+async def get_score_series(
+    shop_id: int | None = None,
+    checklist_id: int | None = None,
+    user_id: int | None = None,
+    start: date | None = None,
+    end: date | None = None,
+    bucket: str = "week",
+) -> list[dict]:
+    """Динамика отчетов за дни [start, end) по корзинам day/week/month.
+
+    Ряд строится по одному из: точке, шаблону или сотруднику (id в БД);
+    без них - по всей сети. Корзины идут подряд, пустые - с reports=0 и
+    avg_score=None. Без start - с первого дня с отчетами (вся история).
+    Точка и сеть читают дневные итоги shop_daily_stats, шаблон и сотрудник -
+    отчеты по индексу (checklist_id / user_id, created_at); в корзины
+    дни складываются уже здесь, так что строк не больше, чем дней. Дни -
+    рабочие дни точек (app.clock), как в дневных итогах.
+    """
+    if bucket not in SERIES_BUCKETS:
+        raise ValueError(f"Неизвестная корзина: {bucket}")
+    if sum(value is not None for value in (shop_id, checklist_id, user_id)) > 1:
+        raise ValueError("Ряд строится только по одному из: точка, шаблон, сотрудник")
+    if end is None:
+        end = today() + timedelta(days=1)
+
+    async with async_session() as session:
+        if checklist_id is None and user_id is None:
+            day = ShopDailyStats.day
+            query = (
+                select(
+                    day,
+                    func.sum(ShopDailyStats.reports_count),
+                    func.sum(ShopDailyStats.score_sum),
+                )
+                .where(day < end)
+                .group_by(day)
+                .order_by(day)
+            )
+            if start is not None:
+                query = query.where(day >= start)
+            if shop_id is not None:
+                query = query.where(ShopDailyStats.shop_id == shop_id)
+            rows = (await session.execute(query)).all()
+        else:
+            # День отчета - рабочий день его точки, как в дневных итогах
+            owner = (
+                Report.checklist_id == checklist_id
+                if checklist_id is not None
+                else Report.user_id == user_id
+            )
+            days: dict[date, list[int]] = {}
+            for day, where in await business_day_sources(session, Report.created_at, start, end):
+                query = (
+                    select(day, func.count(Report.id), func.sum(Report.score_percent))
+                    .where(Report.status == "completed")
+                    .where(owner)
+                    .where(*where)
+                    .group_by(day)
+                )
+                for row_day, reports_count, score_sum in await session.execute(query):
+                    totals = days.setdefault(row_day, [0, 0])
+                    totals[0] += reports_count
+                    totals[1] += score_sum or 0
+            rows = sorted((row_day, *totals) for row_day, totals in days.items())
+
+    return _series_from_days(rows, start, end, bucket)
+
+
+def _series_from_days(
+    rows: list[tuple[date, int, int]], start: date | None, end: date, bucket: str
+) -> list[dict]:
+    """Ряд по корзинам из дневных строк (день, отчетов, сумма баллов) по возрастанию дня."""
+    if start is None:
+        if not rows:
+            return []
+        start = rows[0][0]
+
+    totals: dict[date, list[int]] = {}
+    for row_day, reports_count, score_sum in rows:
+        bucket_totals = totals.setdefault(_bucket_start(row_day, bucket), [0, 0])
+        bucket_totals[0] += reports_count or 0
+        bucket_totals[1] += score_sum or 0
+
+    series = []
+    current = _bucket_start(start, bucket)
+    while current < end:
+        reports_count, score_sum = totals.get(current, (0, 0))
+        series.append(
+            {
+                "start": current,
+                "reports": reports_count,
+                "avg_score": score_sum / reports_count if reports_count else None,
+            }
+        )
+        current = _next_bucket(current, bucket)
+    return series
+
+
+@cached(invalidate_on=(*REPORT_EVENTS, USERS_CHANGED))
+async def get_score_series_by_shop(
+    shop_ids: list[int],
+    start: date | None = None,
+    end: date | None = None,
+    bucket: str = "week",
+) -> dict[int, list[dict]]:
+    """Ряды get_score_series(shop_id=...) сразу для нескольких точек: {shop_id: ряд}.
+
+    Один запрос к shop_daily_stats с группировкой по точке и дню. Без start
+    ряд каждой точки начинается с ее первого дня с отчетами.
+    """
+    if bucket not in SERIES_BUCKETS:
+        raise ValueError(f"Неизвестная корзина: {bucket}")
+    if not shop_ids:
+        return {}
+    if end is None:
+        end = today() + timedelta(days=1)
+
+    day = ShopDailyStats.day
+    query = (
+        select(
+            ShopDailyStats.shop_id,
+            day,
+            func.sum(ShopDailyStats.reports_count),
+            func.sum(ShopDailyStats.score_sum),
+        )
+        .where(ShopDailyStats.shop_id.in_(shop_ids))
+        .where(day < end)
+        .group_by(ShopDailyStats.shop_id, day)
+        .order_by(ShopDailyStats.shop_id, day)
+    )
+    if start is not None:
+        query = query.where(day >= start)
+
+    async with async_session() as session:
+        rows = (await session.execute(query)).all()
+
+    by_shop: dict[int, list[tuple[date, int, int]]] = {shop_id: [] for shop_id in shop_ids}
+    for shop_id, row_day, reports_count, score_sum in rows:
+        by_shop[shop_id].append((row_day, reports_count, score_sum))
+    return {
+        shop_id: _series_from_days(shop_rows, start, end, bucket)
+        for shop_id, shop_rows in by_shop.items()
+    }
+
+
+SCORE_HISTOGRAM_BUCKETS = 10
+SCORE_PERCENTILES = {"p10": 0.1, "median": 0.5, "p90": 0.9}
+
+
+def _percentile_from_counts(counts: list[tuple[int, int]], total: int, fraction: float) -> float:
+    """percentile_cont по отсортированным парам (значение, число отчетов)."""
+
+    def value_at(rank: int) -> int:
+        seen = 0
+        for value, count in counts:
+            seen += count
+            if rank < seen:
+                return value
+        return counts[-1][0]
+
+    position = fraction * (total - 1)
+    lower, upper = value_at(floor(position)), value_at(ceil(position))
+    return lower + (upper - lower) * (position - floor(position))
+
+
+@cached(invalidate_on=(REPORT_FINISHED, REPORTS_CHANGED, USERS_CHANGED))
+async def get_score_distribution(
+    shop_id: int | None = None,
+    checklist_id: int | None = None,
+    start: date | None = None,
+    end: date | None = None,
+) -> dict:
+    """Медиана, p10/p90 и гистограмма score_percent отчетов за дни [start, end).
+
+    По умолчанию - последние 30 дней по всей сети; shop_id и checklist_id
+    сужают выборку. Гистограмма - число отчетов по корзинам 0-9%, 10-19%, ...
+    90-100%. Как и средний балл, учитывает только завершенные отчеты. Дни -
+    рабочие дни точек (app.clock), как в дневных итогах и рядах.
+
+    Одним запросом считается число отчетов на каждое значение (их не больше
+    101), из него - гистограмма, а на SQLite и перцентили (как percentile_cont).
+    На Postgres перцентили считает сам percentile_cont.
+    """
+    if end is None:
+        end = today() + timedelta(days=1)
+    if start is None:
+        start = end - timedelta(days=30)
+
+    score = Report.score_percent
+    # Грубый диапазон - для индекса по created_at (пояс и смена сдвигают
+    # рабочий день меньше чем на 2 суток), точные рабочие дни - по группам точек
+    filters = [
+        Report.status == "completed",
+        Report.created_at >= datetime.combine(start - timedelta(days=2), datetime.min.time()),
+        Report.created_at < datetime.combine(end + timedelta(days=2), datetime.min.time()),
+    ]
+    if checklist_id is not None:
+        filters.append(Report.checklist_id == checklist_id)
+    if shop_id is not None:
+        # Точка отчета, как в дневных итогах
+        filters.append(Report.shop_id == shop_id)
+
+    result = {
+        "reports": 0,
+        **dict.fromkeys(SCORE_PERCENTILES),
+        "histogram": [0] * SCORE_HISTOGRAM_BUCKETS,
+    }
+    top = SCORE_HISTOGRAM_BUCKETS - 1
+    async with async_session() as session:
+        sources = await business_day_sources(session, Report.created_at, start, end)
+        filters.append(or_(*(and_(*where) for _, where in sources)))
+        counts = (
+            await session.execute(
+                select(score, func.count(Report.id))
+                .where(*filters)
+                .group_by(score)
+                .order_by(score)
+            )
+        ).all()
+        total = sum(count for _, count in counts)
+        result["reports"] = total
+        for value, count in counts:
+            result["histogram"][min(value // (100 // SCORE_HISTOGRAM_BUCKETS), top)] += count
+
+        if total and session.bind.dialect.name == "postgresql":
+            row = (
+                await session.execute(
+                    select(
+                        *(
+                            func.percentile_cont(fraction).within_group(score)
+                            for fraction in SCORE_PERCENTILES.values()
+                        )
+                    )
+                    .where(*filters)
+                )
+            ).one()
+            result.update(zip(SCORE_PERCENTILES, (float(value) for value in row)))
+        elif total:
+            for name, fraction in SCORE_PERCENTILES.items():
+                result[name] = _percentile_from_counts(counts, total, fraction)
+
+    return result
@@ -1,24 +1,67 @@
 from __future__ import annotations
 
-from sqlalchemy import select
+from collections.abc import Awaitable, Callable
+from datetime import datetime
 
+from sqlalchemy import case, delete, func, select, update
+
+from app.clock import now
+from app.crud.reports import business_day_span, refresh_shop_daily_stats
 from app.db import async_session
-from app.models import Checklist, Question, User
+from app.events import CHECKLISTS_CHANGED, REPORTS_CHANGED, emit
+from app.jobs.archive import delete_archived_answers
+from app.models import Answer, Checklist, Question, QuestionDailyStats, Report, User
+
+
+CHECKLISTS_PAGE_SIZE = 10
+DELETE_BATCH_SIZE = 500
+# Максимум баллов за вопрос по типу; текстовые вопросы баллов не дают
+QUESTION_MAX_POINTS = {"binary": 1, "scale": 10}
+
+
+async def _refresh_max_points(session, checklist_id: int | None = None) -> None:
+    """Пересчитать Checklist.max_points по неудаленным вопросам (все шаблоны, если None).
+
+    Один UPDATE с коррелированным подзапросом; коммит остается за вызывающим.
+    """
+    points = (
+        select(
+            func.coalesce(
+                func.sum(case(QUESTION_MAX_POINTS, value=Question.type, else_=0)), 0
+            )
+        )
+        .where(Question.checklist_id == Checklist.id)
+        .where(Question.is_deleted == False)
+        .scalar_subquery()
+    )
+    stmt = update(Checklist).values(max_points=points)
+    if checklist_id is not None:
+        stmt = stmt.where(Checklist.id == checklist_id)
+    await session.execute(stmt.execution_options(synchronize_session=False))
 
 
-async def create_checklist(title: str, shop_id: str, target_position: str | None = None) -> int:
+async def rebuild_checklist_max_points() -> None:
+    """Пересчитать max_points всех шаблонов (ремонт после ручных правок БД)."""
+    async with async_session() as session:
+        await _refresh_max_points(session)
+        await session.commit()
+    emit(CHECKLISTS_CHANGED)
+
+
+async def create_checklist(title: str, shop_id: int | None, target_position: str | None = None) -> int:
     async with async_session() as session:
         checklist = Checklist(title=title, shop_id=shop_id, target_position=target_position)
         session.add(checklist)
         await session.commit()
         await session.refresh(checklist)
-        return checklist.id
+    emit(CHECKLISTS_CHANGED, checklist_id=checklist.id)
+    return checklist.id
 
 
 async def update_checklist(
     checklist_id: int,
     title: str | None = None,
-    shop_id: str | None = None,
+    shop_id: int | None = None,
     target_position: str | None = None,
 ) -> None:
     async with async_session() as session:
@@ -33,6 +76,7 @@ async def update_checklist(
         if target_position is not None:
             checklist.target_position = target_position
         await session.commit()
+    emit(CHECKLISTS_CHANGED, checklist_id=checklist_id)
 
 
 async def get_checklists_for_user(user_tg_id: int) -> list[Checklist]:
@@ -44,6 +88,7 @@ async def get_checklists_for_user(user_tg_id: int) -> list[Checklist]:
         query = select(Checklist).where(
             ((Checklist.shop_id == user.shop_id) | (Checklist.shop_id == None))
             & ((Checklist.target_position == user.position) | (Checklist.target_position == None))
+            & (Checklist.is_deleted == False)
         )
         result = await session.execute(query)
         return list(result.scalars().all())
@@ -51,10 +96,58 @@ async def get_checklists_for_user(user_tg_id: int) -> list[Checklist]:
 
 async def get_checklists() -> list[Checklist]:
     async with async_session() as session:
-        result = await session.execute(select(Checklist))
+        result = await session.execute(select(Checklist).where(Checklist.is_deleted == False))
         return list(result.scalars().all())
 
 
+async def get_checklists_count_by_shop(shop_ids: list[int]) -> list[tuple[int | None, int]]:
+    """Количество шаблонов по точкам (None - общие для всех точек), одним GROUP BY."""
+    async with async_session() as session:
+        result = await session.execute(
+            select(Checklist.shop_id, func.count(Checklist.id))
+            .where(Checklist.shop_id.in_(shop_ids) | Checklist.shop_id.is_(None))
+            .where(Checklist.is_deleted == False)
+            .group_by(Checklist.shop_id)
+        )
+        return [(shop_id, count) for shop_id, count in result.all()]
+
+
+async def get_checklists_page(
+    shop_id: int | None,
+    after_id: int | None = None,
+    before_id: int | None = None,
+    limit: int = CHECKLISTS_PAGE_SIZE,
+) -> tuple[list[Checklist], bool, bool]:
+    """Страница шаблонов точки по возрастанию id (keyset по id).
+
+    after_id - следующая страница, before_id - предыдущая.
+    Возвращает (шаблоны, есть_предыдущая, есть_следующая).
+    """
+    async with async_session() as session:
+        if shop_id is None:
+            query = select(Checklist).where(Checklist.shop_id.is_(None))
+        else:
+            query = select(Checklist).where(Checklist.shop_id == shop_id)
+        query = query.where(Checklist.is_deleted == False)
+
+        if before_id is not None:
+            query = query.where(Checklist.id < before_id).order_by(Checklist.id.desc())
+        else:
+            if after_id is not None:
+                query = query.where(Checklist.id > after_id)
+            query = query.order_by(Checklist.id)
+
+        result = await session.execute(query.limit(limit + 1))
+        checklists = list(result.scalars().all())
+        has_more = len(checklists) > limit
+        checklists = checklists[:limit]
+
+        if before_id is not None:
+            checklists.reverse()
+            return checklists, has_more, True
+        return checklists, after_id is not None, has_more
+
+
 async def add_question(
     checklist_id: int,
     text: str,
@@ -70,7 +163,10 @@ async def add_question(
                 needs_photo=needs_photo,
             )
         )
+        await session.flush()
+        await _refresh_max_points(session, checklist_id)
         await session.commit()
+    emit(CHECKLISTS_CHANGED, checklist_id=checklist_id)
 
 
 async def get_questions(checklist_id: int, include_deleted: bool = False) -> list[Question]:
@@ -83,8 +179,12 @@ async def get_questions(checklist_id: int, include_deleted: bool = False) -> lis
 
 
 async def get_checklist(checklist_id: int) -> Checklist | None:
+    """Шаблон по id; удаленный - как отсутствующий."""
     async with async_session() as session:
-        return await session.get(Checklist, checklist_id)
+        checklist = await session.get(Checklist, checklist_id)
+        if checklist is None or checklist.is_deleted:
+            return None
+        return checklist
 
 
 async def get_question(question_id: int, include_deleted: bool = False) -> Question | None:
@@ -112,7 +212,11 @@ async def update_question(
             question.type = type
         if needs_photo is not None:
             question.needs_photo = needs_photo
+        if type is not None:
+            await session.flush()
+            await _refresh_max_points(session, question.checklist_id)
         await session.commit()
+    emit(CHECKLISTS_CHANGED, checklist_id=question.checklist_id)
 
 
 async def delete_question(question_id: int) -> None:
@@ -121,77 +225,135 @@ async def delete_question(question_id: int) -> None:
         question = await session.get(Question, question_id)
         if question:
             question.is_deleted = True
+            await session.flush()
+            await _refresh_max_points(session, question.checklist_id)
             await session.commit()
+            emit(CHECKLISTS_CHANGED, checklist_id=question.checklist_id)
+
+
+async def _delete_reports_batch(session, checklist_id: int, bound: datetime | None) -> int:
+    """Удалить отчеты шаблона с created_at <= bound (все, если None) и их ответы.
+
+    Ответы выбираются подзапросом, а не списком id из Python; диапазон
+    created_at ограничивает проход индексом (и партиции на Postgres).
+    """
+    in_batch = [Report.checklist_id == checklist_id]
+    first_at = await session.scalar(select(func.min(Report.created_at)).where(*in_batch))
+    if first_at is None:
+        return 0
+    if bound is not None:
+        in_batch.append(Report.created_at <= bound)
+    last_at = bound or await session.scalar(
+        select(func.max(Report.created_at)).where(Report.checklist_id == checklist_id)
+    )
+
+    await session.execute(
+        delete(Answer)
+        .where(Answer.report_id.in_(select(Report.id).where(*in_batch)))
+        .where(Answer.created_at.between(first_at, last_at))
+    )
+    result = await session.execute(delete(Report).where(*in_batch))
+    # Дневные итоги точек за затронутые дни пересчитываем без удаленных отчетов
+    await refresh_shop_daily_stats(session, *await business_day_span(session, first_at, last_at))
+    return result.rowcount or 0
 
 
 async def delete_checklist(checklist_id: int) -> tuple[bool, str, int]:
     """
-    Удаляет чек-лист вместе со всеми отчетами и ответами.
-    Возвращает (успех, сообщение, количество удаленных отчетов).
+    Мягко удаляет чек-лист: он пропадает из списков, отчеты и ответы остаются
+    в истории. Физически удаляет purge_checklist (python -m app.jobs.purge).
+    Возвращает (успех, сообщение, количество сохраненных отчетов).
     """
-    from app.models import Answer, Report
-    from sqlalchemy import delete, func
-    
     async with async_session() as session:
         checklist = await session.get(Checklist, checklist_id)
-        if not checklist:
+        if not checklist or checklist.is_deleted:
             return (False, "Шаблон не найден.", 0)
-        
-        # Подсчитываем количество отчетов перед удалением
+
         reports_count = await session.scalar(
             select(func.count(Report.id)).where(Report.checklist_id == checklist_id)
         ) or 0
-        
-        # Удаляем все ответы, связанные с отчетами этого чек-листа
-        if reports_count > 0:
-            # Получаем ID всех отчетов для этого чек-листа
-            report_ids_result = await session.execute(
-                select(Report.id).where(Report.checklist_id == checklist_id)
-            )
-            report_ids = [row[0] for row in report_ids_result.all()]
-            
-            # Удаляем все ответы для этих отчетов
-            if report_ids:
-                await session.execute(
-                    delete(Answer).where(Answer.report_id.in_(report_ids))
-                )
-            
-            # Удаляем все отчеты
-            await session.execute(
-                delete(Report).where(Report.checklist_id == checklist_id)
-            )
-        
-        # Удаляем сам чек-лист (вопросы удалятся автоматически через cascade)
-        await session.delete(checklist)
+        checklist.is_deleted = True
+        checklist.deleted_at = now()
         await session.commit()
-        
-        checklist_title = checklist.title
+        emit(CHECKLISTS_CHANGED, checklist_id=checklist_id)
+
         if reports_count > 0:
             return (
                 True,
-                f"✅ Шаблон '{checklist_title}' и {reports_count} связанных отчетов успешно удалены.",
+                f"✅ Шаблон '{checklist.title}' удален. "
+                f"{reports_count} его отчетов сохранены в истории.",
                 reports_count
             )
-        else:
-            return (
-                True,
-                f"✅ Шаблон '{checklist_title}' успешно удален.",
-                0
-            )
+        return (
+            True,
+            f"✅ Шаблон '{checklist.title}' успешно удален.",
+            0
+        )
+
+
+async def purge_checklist(
+    checklist_id: int,
+    batch_size: int = DELETE_BATCH_SIZE,
+    on_progress: Callable[[int, int], Awaitable[None]] | None = None,
+) -> int:
+    """
+    Физически удаляет чек-лист вместе со всеми отчетами и ответами.
 
+    Отчеты удаляются пачками по batch_size в отдельных коротких транзакциях,
+    чтобы не держать блокировку answers на всю историю шаблона.
+    on_progress(удалено, всего) вызывается после каждой пачки.
+    Ответы отчетов, вынесенные в архив, удаляются из архивных файлов.
+    Возвращает количество удаленных отчетов.
+    """
+    async with async_session() as session:
+        reports_count = await session.scalar(
+            select(func.count(Report.id)).where(Report.checklist_id == checklist_id)
+        ) or 0
+        archived = (
+            await session.execute(
+                select(Report.id, Report.created_at)
+                .where(Report.checklist_id == checklist_id)
+                .where(Report.answers_archived == True)
+            )
+        ).all()
+    # До удаления из БД: если прервемся, отчеты останутся и удалятся при повторе
+    if archived:
+        await delete_archived_answers(archived)
 
-async def get_checklists_today() -> list[Checklist]:
-    # Implemented in reports.py to keep the join near Report.
-    from datetime import datetime
-    from app.models import Report
+    deleted = 0
+    while True:
+        async with async_session() as session:
+            # Граница пачки - created_at batch_size-го по старшинству отчета
+            bound = await session.scalar(
+                select(Report.created_at)
+                .where(Report.checklist_id == checklist_id)
+                .order_by(Report.created_at, Report.id)
+                .offset(batch_size - 1)
+                .limit(1)
+            )
+            if bound is None:
+                break
+            deleted += await _delete_reports_batch(session, checklist_id, bound)
+            await session.commit()
+        if on_progress is not None:
+            await on_progress(deleted, reports_count)
 
     async with async_session() as session:
-        today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        query = (
-            select(Checklist)
-            .join(Report, Checklist.id == Report.checklist_id)
-            .where(Report.created_at >= today_start)
-            .distinct()
+        # Остаток меньше пачки и отчеты, созданные во время удаления
+        deleted += await _delete_reports_batch(session, checklist_id, None)
+        await session.execute(
+            delete(QuestionDailyStats).where(
+                QuestionDailyStats.question_id.in_(
+                    select(Question.id).where(Question.checklist_id == checklist_id)
+                )
+            )
         )
-        result = await session.execute(query)
-        return list(result.scalars().all())
+        checklist = await session.get(Checklist, checklist_id)
+        if checklist:
+            # Вопросы удалятся автоматически через cascade
+            await session.delete(checklist)
+        await session.commit()
+
+    emit(CHECKLISTS_CHANGED, checklist_id=checklist_id)
+    emit(REPORTS_CHANGED)
+    return deleted
@@ -0,0 +1,158 @@
+"""Рейтинг сотрудников по точкам в памяти процесса.
+
+Итоги сотрудников (число завершенных отчетов, средний балл) загружаются одним
+агрегирующим запросом и хранятся в упорядоченных списках ключей по каждой
+точке - отдельно для сортировки по отчетам и по баллу. Страница рейтинга -
+срез списка, без пересчета по всем сотрудникам. События прохождения
+чек-листов (app.events) обновляют итоги на месте; изменения сотрудников и
+пачечные изменения отчетов сбрасывают рейтинг, и он перечитывается при
+следующем обращении. Раз в LEADERBOARD_TTL секунд он перечитывается в
+любом случае: изменения из других процессов (CLI-задачи, второй экземпляр
+бота) иначе не были бы видны.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+
+from sqlalchemy import and_, func, select
+
+from app import events
+from app.db import async_session
+from app.models import Report, User
+
+
+LEADERBOARD_TTL = 10 * 60
+LEADERBOARD_ORDERS = ("reports", "score")
+
+
+@dataclass(slots=True)
+class _Entry:
+    user_id: int
+    shop_id: int | None
+    full_name: str
+    reports: int = 0
+    score_sum: int = 0
+
+    @property
+    def avg_score(self) -> int:
+        return self.score_sum // self.reports if self.reports else 0
+
+    def key(self, order: str) -> tuple:
+        if order == "score":
+            return (-self.avg_score, -self.reports, self.full_name, self.user_id)
+        return (-self.reports, self.full_name, self.user_id)
+
+
+class _Leaderboard:
+    def __init__(self, ttl: float = LEADERBOARD_TTL) -> None:
+        self.ttl = ttl
+        self._entries: dict[int, _Entry] = {}
+        # точка -> порядок -> отсортированные ключи
+        self._boards: dict[int | None, dict[str, list[tuple]]] = {}
+        self._loaded_at: float | None = None
+        # Меняется при каждом bump/reset: загрузка, во время которой он
+        # сменился, могла не увидеть изменение и не считается свежей
+        self._version = 0
+        self._lock = asyncio.Lock()
+
+    def _insert(self, entry: _Entry) -> None:
+        board = self._boards.setdefault(
+            entry.shop_id, {order: [] for order in LEADERBOARD_ORDERS}
+        )
+        for order in LEADERBOARD_ORDERS:
+            insort(board[order], entry.key(order))
+
+    def _remove(self, entry: _Entry) -> None:
+        board = self._boards[entry.shop_id]
+        for order in LEADERBOARD_ORDERS:
+            keys = board[order]
+            del keys[bisect_left(keys, entry.key(order))]
+
+    async def _ensure_loaded(self) -> None:
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl:
+            return
+        async with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl:
+                return
+            version = self._version
+            async with async_session() as session:
+                rows = await session.execute(
+                    select(
+                        User.id,
+                        User.shop_id,
+                        User.full_name,
+                        func.count(Report.id),
+                        func.coalesce(func.sum(Report.score_percent), 0),
+                    )
+                    .outerjoin(
+                        Report, and_(Report.user_id == User.id, Report.status == "completed")
+                    )
+                    .where(User.role == "worker")
+                    .group_by(User.id, User.shop_id, User.full_name)
+                )
+                entries = {row[0]: _Entry(*row) for row in rows}
+
+            self._entries = entries
+            self._boards = {}
+            for entry in entries.values():
+                self._insert(entry)
+            self._loaded_at = time.monotonic() if version == self._version else None
+
+    def reset(self) -> None:
+        self._version += 1
+        self._loaded_at = None
+
+    def bump(self, user_id: int, score: int) -> None:
+        """Учесть завершенный отчет сотрудника с баллом score."""
+        self._version += 1
+        if self._loaded_at is None:
+            return
+        entry = self._entries.get(user_id)
+        if entry is None:
+            # Сотрудник появился в обход CRUD - проще перечитать всё
+            self.reset()
+            return
+        self._remove(entry)
+        entry.reports += 1
+        entry.score_sum += score
+        self._insert(entry)
+
+    async def page(
+        self, shop_id: int | None, order: str, offset: int, limit: int
+    ) -> tuple[list[tuple[int, _Entry]], int]:
+        """[(место, итоги)] на странице и число сотрудников точки."""
+        await self._ensure_loaded()
+        keys = self._boards.get(shop_id, {}).get(order, [])
+        return [
+            (offset + i + 1, self._entries[key[-1]])
+            for i, key in enumerate(keys[offset : offset + limit])
+        ], len(keys)
+
+
+_leaderboard = _Leaderboard()
+
+events.subscribe(
+    events.REPORT_FINISHED, lambda user_id, score, **_: _leaderboard.bump(user_id, score)
+)
+for _event in (events.USERS_CHANGED, events.REPORTS_CHANGED):
+    events.subscribe(_event, lambda **_: _leaderboard.reset())
+
+
+async def get_workers_leaderboard(
+    shop_id: int | None, order: str = "reports", offset: int = 0, limit: int = 5
+) -> tuple[list[tuple[int, int, int, int]], int]:
+    """Страница рейтинга точки (None - без точки) и общее число сотрудников.
+
+    order - "reports" (по числу отчетов) или "score" (по среднему баллу).
+    Строки - (место, id сотрудника, число отчетов, средний балл).
+    """
+    if order not in LEADERBOARD_ORDERS:
+        raise ValueError(f"Неизвестная сортировка: {order}")
+    rows, total = await _leaderboard.page(shop_id, order, offset, limit)
+    return [
+        (rank, entry.user_id, entry.reports, entry.avg_score) for rank, entry in rows
+    ], total
@@ -1,21 +1,410 @@
 from __future__ import annotations
 
-from datetime import datetime
+from collections import defaultdict
+from collections.abc import Sequence
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import (
+    Date,
+    DateTime,
+    Float,
+    Integer,
+    and_,
+    bindparam,
+    case,
+    cast,
+    delete,
+    desc,
+    func,
+    insert,
+    or_,
+    select,
+    true,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Row
+from sqlalchemy.sql import ColumnElement, Select
+
+from config import settings
+
+from app.clock import business_day, day_bounds, day_offsets, from_storage, now, today
+from app.db import async_session
+from app.events import REPORT_CREATED, REPORT_FINISHED, REPORTS_CHANGED, emit
+from app.jobs.archive import load_archived_answers
+from app.models import (
+    Answer,
+    Checklist,
+    Question,
+    QuestionDailyStats,
+    Report,
+    Shop,
+    ShopDailyStats,
+    User,
+)
+
+
+REPORTS_PAGE_SIZE = 10
+# Оценка scale не выше этой считается проваленным пунктом
+SCALE_FAIL_MAX = 5
+
+
+async def _reports_page(
+    session,
+    query: Select,
+    cursor: tuple[datetime, int] | None,
+    direction: str,
+    limit: int,
+) -> tuple[list, bool, bool]:
+    """Keyset-пагинация по (created_at, id), новые отчеты сверху.
+
+    cursor - (created_at, id) граничного отчета уже показанной страницы,
+    direction "older" - отчеты старше курсора, "newer" - новее.
+    Стоимость любой страницы - один проход по индексу на limit + 1 строк.
+    Возвращает (строки, есть_новее, есть_старше).
+    """
+    key = tuple_(Report.created_at, Report.id)
+    if cursor is not None:
+        bound = tuple_(
+            bindparam(None, cursor[0], type_=DateTime),
+            bindparam(None, cursor[1], type_=Integer),
+        )
+        query = query.where(key > bound if direction == "newer" else key < bound)
 
-from sqlalchemy import desc, func, select
+    if direction == "newer":
+        query = query.order_by(Report.created_at, Report.id)
+    else:
+        query = query.order_by(desc(Report.created_at), desc(Report.id))
 
-from app.db import async_session
-from app.models import Answer, Checklist, Question, Report, User
+    rows = list((await session.execute(query.limit(limit + 1))).all())
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    if direction == "newer":
+        rows.reverse()
+        return rows, has_more, cursor is not None
+    return rows, cursor is not None, has_more
+
+
+async def _bump_shop_daily_stats(
+    session, shop_id: int | None, day: date, reports: int = 0, score: int = 0
+) -> None:
+    """Прибавить к дневным итогам точки (upsert в той же транзакции)."""
+    if shop_id is None:
+        return
+    dialect = postgresql if session.bind.dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(ShopDailyStats).values(
+        shop_id=shop_id, day=day, reports_count=reports, score_sum=score
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ShopDailyStats.shop_id, ShopDailyStats.day],
+        set_={
+            "reports_count": ShopDailyStats.reports_count + stmt.excluded.reports_count,
+            "score_sum": ShopDailyStats.score_sum + stmt.excluded.score_sum,
+        },
+    )
+    await session.execute(stmt)
+
+
+def _dialect_name(executor) -> str:
+    # Сессия или соединение
+    if hasattr(executor, "dialect"):
+        return executor.dialect.name
+    return executor.bind.dialect.name
+
+
+def _date_minus(column, offset: timedelta, dialect: str) -> ColumnElement[date]:
+    if not offset:
+        return func.date(column, type_=Date)
+    if dialect == "sqlite":
+        return func.date(column, f"{-int(offset.total_seconds())} seconds", type_=Date)
+    return func.date(column - offset, type_=Date)
+
+
+async def _schedule_groups(executor) -> list[tuple[Row | None, ColumnElement[bool]]]:
+    """Точки с одинаковыми поясом и началом смены: (образец, условие на Report.shop_id).
+
+    Образец - строка точки для функций app.clock. Первая группа - точки с настройками по умолчанию и отчеты без точки
+    (образец None).
+    """
+    rows = await executor.execute(
+        select(Shop.id, Shop.timezone, Shop.shift_start).where(
+            or_(Shop.timezone.is_not(None), Shop.shift_start.is_not(None))
+        )
+    )
+    groups: dict[tuple, list[int]] = defaultdict(list)
+    samples: dict[tuple, Row] = {}
+    for row in rows:
+        key = (row.timezone, row.shift_start)
+        groups[key].append(row.id)
+        samples[key] = row
+    in_default = true()
+    if groups:
+        in_default = or_(
+            Report.shop_id == None,
+            Report.shop_id.not_in([i for ids in groups.values() for i in ids]),
+        )
+    return [
+        (None, in_default),
+        *((samples[key], Report.shop_id.in_(ids)) for key, ids in groups.items()),
+    ]
+
+
+async def business_day_span(executor, first: datetime, last: datetime) -> tuple[date, date]:
+    """Рабочие дни [с, по) всех точек, в которые попадает время хранения first..last."""
+    samples = [sample for sample, _ in await _schedule_groups(executor)]
+    return (
+        min(business_day(sample, from_storage(first)) for sample in samples),
+        max(business_day(sample, from_storage(last)) for sample in samples) + timedelta(days=1),
+    )
+
+
+async def business_day_sources(
+    executor, column, start: date | None, end: date | None
+) -> list[tuple[ColumnElement[date], list[ColumnElement[bool]]]]:
+    """Для каждой группы точек: (рабочий день строки по column, условия отбора).
+
+    Условия - точки группы и column в пределах ее рабочих дней [start, end);
+    в запросе должен быть Report. Пустой список - строк нет совсем.
+    """
+    if start is None:
+        first = await executor.scalar(select(func.min(column)))
+        if first is None:
+            return []
+        span_start = first.date() - timedelta(days=1)
+    else:
+        span_start = start
+    span_end = end if end is not None else today() + timedelta(days=2)
+    dialect = _dialect_name(executor)
+
+    sources = []
+    for sample, in_group in await _schedule_groups(executor):
+        offsets = day_offsets(sample, span_start, span_end)
+        day = _date_minus(column, offsets[-1][1], dialect)
+        if len(offsets) > 1:
+            day = case(
+                *(
+                    (column < begin, _date_minus(column, offset, dialect))
+                    for (_, offset), (begin, _) in zip(offsets, offsets[1:])
+                ),
+                else_=day,
+            )
+        where = [in_group]
+        if start is not None:
+            where.append(column >= offsets[0][0])
+        if end is not None:
+            where.append(column < day_bounds(sample, end)[0])
+        sources.append((day, where))
+    return sources
+
+
+async def refresh_shop_daily_stats(
+    executor, start: date | None = None, end: date | None = None
+) -> None:
+    """Пересчитать дневные итоги за рабочие дни [start, end) из завершенных отчетов.
+
+    Отчет относится к точке, в которой сотрудник был при его создании
+    (Report.shop_id), и к ее рабочему дню (пояс и начало смены, см. app.clock).
+    executor - сессия или соединение; коммит остается за вызывающим.
+    """
+    cleanup = delete(ShopDailyStats)
+    if start is not None:
+        cleanup = cleanup.where(ShopDailyStats.day >= start)
+    if end is not None:
+        cleanup = cleanup.where(ShopDailyStats.day < end)
+    sources = await business_day_sources(executor, Report.created_at, start, end)
+
+    await executor.execute(cleanup)
+    for day, where in sources:
+        source = (
+            select(
+                Report.shop_id,
+                day,
+                func.count(Report.id),
+                func.coalesce(func.sum(Report.score_percent), 0),
+            )
+            .where(Report.status == "completed")
+            .where(Report.shop_id.is_not(None))
+            .where(*where)
+            .group_by(Report.shop_id, day)
+        )
+        await executor.execute(
+            insert(ShopDailyStats).from_select(
+                ["shop_id", "day", "reports_count", "score_sum"], source
+            )
+        )
+
+
+def _question_totals():
+    """Колонки итогов ответов: (число, нулевых, низких, сумма баллов)."""
+    return (
+        func.count(Answer.id),
+        func.sum(case((Answer.points == 0, 1), else_=0)),
+        func.sum(case((Answer.points <= SCALE_FAIL_MAX, 1), else_=0)),
+        func.coalesce(func.sum(Answer.points), 0),
+    )
+
+
+async def _bump_question_daily_stats(
+    session, shop_id: int | None, day: date, totals: list
+) -> None:
+    """Прибавить итоги ответов отчета; totals - строки (question_id, *_question_totals())."""
+    if shop_id is None or not totals:
+        return
+    dialect = postgresql if session.bind.dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(QuestionDailyStats).values(
+        [
+            {
+                "question_id": question_id,
+                "shop_id": shop_id,
+                "day": day,
+                "answers_count": answers,
+                "zero_count": zeros,
+                "low_count": lows,
+                "points_sum": points,
+            }
+            for question_id, answers, zeros, lows, points in totals
+        ]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            QuestionDailyStats.question_id,
+            QuestionDailyStats.shop_id,
+            QuestionDailyStats.day,
+        ],
+        set_={
+            name: getattr(QuestionDailyStats, name) + getattr(stmt.excluded, name)
+            for name in ("answers_count", "zero_count", "low_count", "points_sum")
+        },
+    )
+    await session.execute(stmt)
+
+
+async def _first_unarchived_day(executor) -> date | None:
+    """Рабочий день после последнего отчета с ответами в архиве (None - архива нет).
+
+    Архив выносит отчеты по порядку created_at, так что с этого дня все
+    ответы еще в БД.
+    """
+    last = await executor.scalar(
+        select(func.max(Report.created_at)).where(Report.answers_archived == True)
+    )
+    if last is None:
+        return None
+    return (await business_day_span(executor, last, last))[1]
+
+
+async def refresh_question_daily_stats(
+    executor, start: date | None = None, end: date | None = None
+) -> None:
+    """Пересчитать дневные итоги вопросов за рабочие дни [start, end) по завершенным отчетам.
+
+    Ответы, вынесенные в архив, в БД уже не лежат - их дни не пересчитываются:
+    start не раньше дня после последнего архивного отчета.
+    executor - сессия или соединение; коммит остается за вызывающим.
+    """
+    floor = await _first_unarchived_day(executor)
+    if floor is not None and (start is None or start < floor):
+        start = floor
+    if start is not None and end is not None and start >= end:
+        return
+    cleanup = delete(QuestionDailyStats)
+    if start is not None:
+        cleanup = cleanup.where(QuestionDailyStats.day >= start)
+    if end is not None:
+        cleanup = cleanup.where(QuestionDailyStats.day < end)
+    sources = await business_day_sources(executor, Answer.created_at, start, end)
+
+    await executor.execute(cleanup)
+    for day, where in sources:
+        source = (
+            select(Answer.question_id, Report.shop_id, day, *_question_totals())
+            .join(
+                Report,
+                and_(Report.id == Answer.report_id, Report.created_at == Answer.created_at),
+            )
+            .where(Report.status == "completed")
+            .where(Report.shop_id.is_not(None))
+            .where(*where)
+            .group_by(Answer.question_id, Report.shop_id, day)
+        )
+        await executor.execute(
+            insert(QuestionDailyStats).from_select(
+                [
+                    "question_id",
+                    "shop_id",
+                    "day",
+                    "answers_count",
+                    "zero_count",
+                    "low_count",
+                    "points_sum",
+                ],
+                source,
+            )
+        )
+
+
+async def rebuild_question_daily_stats(
+    start: date | None = None, end: date | None = None
+) -> None:
+    """Пересобрать дневные итоги вопросов (по умолчанию - все дни, ответы которых в БД)."""
+    async with async_session() as session:
+        await refresh_question_daily_stats(session, start, end)
+        await session.commit()
+    emit(REPORTS_CHANGED)
+
+
+async def rebuild_shop_daily_stats(start: date | None = None, end: date | None = None) -> None:
+    """Пересобрать дневные итоги (по умолчанию за всю историю)."""
+    async with async_session() as session:
+        await refresh_shop_daily_stats(session, start, end)
+        await session.commit()
+    emit(REPORTS_CHANGED)
+
+
+async def _archived_answer_rows(session, records: list[dict]) -> list[tuple[Answer, Question]]:
+    """(Answer, Question) из архивных записей - в том же виде, что и из БД."""
+    question_ids = {r["question_id"] for r in records}
+    questions = {}
+    if question_ids:
+        questions = {
+            q.id: q
+            for q in await session.scalars(select(Question).where(Question.id.in_(question_ids)))
+        }
+    rows = []
+    for r in records:
+        answer = Answer(
+            id=r["id"],
+            report_id=r["report_id"],
+            question_id=r["question_id"],
+            answer_text=r["answer_text"],
+            photo_id=r["photo_id"],
+            points=r["points"],
+            created_at=datetime.fromisoformat(r["created_at"]),
+        )
+        question = questions.get(r["question_id"]) or Question(
+            id=r["question_id"], text=r["question"] or "—"
+        )
+        rows.append((answer, question))
+    return rows
 
 
 async def create_report(user_tg_id: int, checklist_id: int) -> int:
     async with async_session() as session:
         user = await session.scalar(select(User).where(User.tg_id == user_tg_id))
-        report = Report(user_id=user.id, checklist_id=checklist_id, score_percent=0)
+        report = Report(
+            user_id=user.id,
+            checklist_id=checklist_id,
+            shop_id=user.shop_id,
+            score_percent=0,
+            created_at=now(),
+        )
         session.add(report)
         await session.commit()
         await session.refresh(report)
-        return report.id
+    emit(REPORT_CREATED, user_id=user.id)
+    return report.id
 
 
 async def save_answer_with_points(
@@ -33,6 +422,9 @@ async def save_answer_with_points(
                 answer_text=answer_text,
                 photo_id=photo_id,
                 points=points,
+                created_at=(
+                    select(Report.created_at).where(Report.id == report_id).scalar_subquery()
+                ),
             )
         )
         await session.commit()
@@ -40,70 +432,233 @@ async def save_answer_with_points(
 
 async def finish_report_calculation(report_id: int) -> int:
     async with async_session() as session:
-        sum_points = (
+        report = await session.get(Report, report_id)
+        if report.status == "completed":
+            # Повторное завершение (двойное нажатие) не учитываем в итогах дважды
+            return report.score_percent
+        totals = (
+            await session.execute(
+                select(Answer.question_id, *_question_totals())
+                .where(Answer.report_id == report_id)
+                .where(Answer.created_at == report.created_at)
+                .group_by(Answer.question_id)
+            )
+        ).all()
+        sum_points = sum(row[-1] for row in totals)
+        # Максимум по неудаленным вопросам хранится в самом шаблоне
+        max_points = (
             await session.scalar(
-                select(func.sum(Answer.points)).where(Answer.report_id == report_id)
+                select(Checklist.max_points).where(Checklist.id == report.checklist_id)
             )
             or 0
         )
-        report = await session.get(Report, report_id)
-        # Для расчета баллов учитываем только не удаленные вопросы
-        questions = await session.scalars(
-            select(Question)
-            .where(Question.checklist_id == report.checklist_id)
-            .where(Question.is_deleted == False)
-        )
-
-        max_points = 0
-        for q in questions:
-            if q.type == "binary":
-                max_points += 1
-            elif q.type == "scale":
-                max_points += 10
 
         percent = 0
         if max_points > 0:
             percent = int((sum_points / max_points) * 100)
 
         report.score_percent = percent
+        report.status = "completed"
+        # Снимок на момент прохождения: правки шаблона не меняют старые отчеты
+        report.points_sum = sum_points
+        report.max_points = max_points
+        # Итоги - за точку отчета и ее рабочий день, как и при пересчете
+        shop = await session.get(Shop, report.shop_id) if report.shop_id else None
+        day = business_day(shop, from_storage(report.created_at))
+        await _bump_shop_daily_stats(session, report.shop_id, day, reports=1, score=percent)
+        await _bump_question_daily_stats(session, report.shop_id, day, totals)
         await session.commit()
-        return percent
+    emit(REPORT_FINISHED, report_id=report_id, user_id=report.user_id, score=percent)
+    return percent
+
 
+async def rebuild_report_scores() -> None:
+    """Пересчитать score_percent из снимка points_sum / max_points самих отчетов.
 
-async def get_monthly_stats_by_shop():
+    Вопросы и ответы не читаются; дневные итоги после этого пересобирает
+    rebuild_shop_daily_stats.
+    """
     async with async_session() as session:
-        today = datetime.now()
-        start_month = today.replace(day=1, hour=0, minute=0, second=0)
-        query = (
-            select(User.shop_id, func.avg(Report.score_percent), func.count(Report.id))
-            .join(User, Report.user_id == User.id)
-            .where(Report.created_at >= start_month)
-            .group_by(User.shop_id)
+        await session.execute(
+            update(Report)
+            .where(Report.max_points > 0)
+            .values(score_percent=Report.points_sum * 100 // Report.max_points)
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+    emit(REPORTS_CHANGED)
+
+
+async def abandon_stale_reports(older_than_hours: int | None = None) -> int:
+    """Пометить брошенными незавершенные отчеты старше older_than_hours часов.
+
+    По умолчанию - settings.report_abandon_after_hours. Возвращает их число.
+    Итоги и средние считаются только по завершенным отчетам, так что
+    сбрасывать их не нужно.
+    """
+    if older_than_hours is None:
+        older_than_hours = settings.report_abandon_after_hours
+    cutoff = now() - timedelta(hours=older_than_hours)
+    async with async_session() as session:
+        result = await session.execute(
+            update(Report)
+            .where(Report.status == "in_progress")
+            .where(Report.created_at < cutoff)
+            .values(status="abandoned")
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+        return result.rowcount
+
+
+async def get_monthly_stats_by_shop(
+    shop_ids: list[int] | None = None,
+    start: date | None = None,
+    end: date | None = None,
+) -> list[tuple[str, float, int]]:
+    """(название точки, средний результат, число отчетов) за [start, end).
+
+    По умолчанию - текущий месяц по всей сети. Читает дневные итоги
+    shop_daily_stats, а не сами отчеты.
+    """
+    if shop_ids is not None and not shop_ids:
+        return []
+    if start is None:
+        start = today().replace(day=1)
+
+    reports_count = func.sum(ShopDailyStats.reports_count)
+    query = (
+        select(
+            Shop.name,
+            cast(func.sum(ShopDailyStats.score_sum), Float) / reports_count,
+            reports_count,
         )
+        .join(Shop, Shop.id == ShopDailyStats.shop_id)
+        .where(ShopDailyStats.day >= start)
+        .group_by(Shop.id, Shop.name)
+        .having(reports_count > 0)
+        .order_by(Shop.name)
+    )
+    if end is not None:
+        query = query.where(ShopDailyStats.day < end)
+    if shop_ids is not None:
+        query = query.where(ShopDailyStats.shop_id.in_(shop_ids))
+
+    async with async_session() as session:
         result = await session.execute(query)
         return result.all()
 
 
+async def today_filter(session) -> ColumnElement[bool]:
+    """Условие «отчет создан в текущий рабочий день точки сотрудника».
+
+    Границы считаются один раз на группу точек с одинаковыми поясом и
+    началом смены; точки без настроек и сотрудники без точки - по
+    умолчанию. Условие ссылается на Report.created_at и User.shop_id,
+    в запросе должен быть User (join или внешний запрос).
+    """
+    default = day_bounds()
+    groups: dict[tuple[datetime, datetime], list[int]] = defaultdict(list)
+    shops = await session.scalars(
+        select(Shop).where(or_(Shop.timezone.is_not(None), Shop.shift_start.is_not(None)))
+    )
+    for shop in shops:
+        bounds = day_bounds(shop)
+        if bounds != default:
+            groups[bounds].append(shop.id)
+
+    created = Report.created_at
+    in_default = and_(created >= default[0], created < default[1])
+    if not groups:
+        return in_default
+    special = [shop_id for ids in groups.values() for shop_id in ids]
+    clauses = [
+        and_(in_default, or_(User.shop_id == None, User.shop_id.not_in(special))),
+        *(
+            and_(created >= start, created < end, User.shop_id.in_(ids))
+            for (start, end), ids in groups.items()
+        ),
+    ]
+    # Общий диапазон - чтобы индекс по created_at работал и здесь
+    bounds = [default, *groups]
+    return and_(
+        created >= min(start for start, _ in bounds),
+        created < max(end for _, end in bounds),
+        or_(*clauses),
+    )
+
+
 async def get_today_completed_checklist_ids(tg_id: int) -> list[int]:
     async with async_session() as session:
         user = await session.scalar(select(User).where(User.tg_id == tg_id))
         if not user:
             return []
 
-        today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        # Рабочий день точки сотрудника (user.shop загружается вместе с ним)
+        day_start, day_end = day_bounds(user.shop)
         result = await session.execute(
             select(Report.checklist_id)
             .where(Report.user_id == user.id)
-            .where(Report.created_at >= today_start)
+            .where(Report.created_at >= day_start)
+            .where(Report.created_at < day_end)
+            .where(Report.status == "completed")
         )
         return list(result.scalars().all())
 
 
+async def get_pending_checklists_today(
+    shop_ids: Sequence[int | None] | None = None,
+) -> list[tuple[int, str, list[str]]]:
+    """Сотрудники, не прошедшие сегодня свои чек-листы: (tg_id, имя, [названия]).
+
+    Правила те же, что в get_checklists_for_user и
+    get_today_completed_checklist_ids, но одним запросом на всех сотрудников:
+    пары сотрудник-шаблон без завершенного сегодня отчета. shop_ids -
+    только сотрудники этих точек (None в списке - без точки).
+    """
+    if shop_ids is not None and not shop_ids:
+        return []
+    pending: dict[int, tuple[str, list[str]]] = {}
+    async with async_session() as session:
+        done_today = (
+            select(Report.id)
+            .where(Report.user_id == User.id)
+            .where(Report.checklist_id == Checklist.id)
+            .where(await today_filter(session))
+            .where(Report.status == "completed")
+            .exists()
+        )
+        query = (
+            select(User.tg_id, User.full_name, Checklist.title)
+            .join(
+                Checklist,
+                or_(Checklist.shop_id == User.shop_id, Checklist.shop_id == None)
+                & or_(
+                    Checklist.target_position == User.position,
+                    Checklist.target_position == None,
+                ),
+            )
+            .where(User.role == "worker")
+            .where(Checklist.is_deleted == False)
+            .where(~done_today)
+            .order_by(User.id, Checklist.title)
+        )
+        if shop_ids is not None:
+            in_shops = User.shop_id.in_([i for i in shop_ids if i is not None])
+            if None in shop_ids:
+                in_shops = or_(in_shops, User.shop_id == None)
+            query = query.where(in_shops)
+        for tg_id, full_name, title in await session.execute(query):
+            pending.setdefault(tg_id, (full_name, []))[1].append(title)
+    return [(tg_id, full_name, titles) for tg_id, (full_name, titles) in pending.items()]
+
+
 async def get_all_reports_data():
     async with async_session() as session:
         query = select(Report).order_by(desc(Report.created_at))
         result = await session.execute(query)
         reports = result.scalars().all()
+        archived = await load_archived_answers([r for r in reports if r.answers_archived])
 
         export_data = []
         for report in reports:
@@ -111,12 +666,16 @@ async def get_all_reports_data():
             checklist = await session.scalar(
                 select(Checklist).where(Checklist.id == report.checklist_id)
             )
-            answers_result = await session.execute(
-                select(Answer, Question)
-                .join(Question, Answer.question_id == Question.id)
-                .where(Answer.report_id == report.id)
-            )
-            answers = answers_result.all()
+            if report.answers_archived:
+                answers = await _archived_answer_rows(session, archived.get(report.id, []))
+            else:
+                answers_result = await session.execute(
+                    select(Answer, Question)
+                    .join(Question, Answer.question_id == Question.id)
+                    .where(Answer.report_id == report.id)
+                    .where(Answer.created_at == report.created_at)
+                )
+                answers = answers_result.all()
 
             formatted_answers = []
             for ans, quest in answers:
@@ -126,7 +685,7 @@ async def get_all_reports_data():
             export_data.append(
                 {
                     "date": report.created_at.strftime("%Y-%m-%d %H:%M"),
-                    "shop": user.shop_id,
+                    "shop": user.shop_name,
                     "employee": user.full_name,
                     "checklist": checklist.title,
                     "answers": " || ".join(formatted_answers),
@@ -137,29 +696,35 @@ async def get_all_reports_data():
 
 
 async def get_checklists_today() -> list[Checklist]:
+    """Шаблоны, пройденные сегодня (по рабочему дню точки сотрудника)."""
     async with async_session() as session:
-        today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
         query = (
             select(Checklist)
             .join(Report, Checklist.id == Report.checklist_id)
-            .where(Report.created_at >= today_start)
+            .join(User, Report.user_id == User.id)
+            .where(await today_filter(session))
+            .where(Report.status == "completed")
+            .where(Checklist.is_deleted == False)
             .distinct()
         )
         result = await session.execute(query)
         return list(result.scalars().all())
 
 
-async def get_reports_by_checklist_id(checklist_id: int):
+async def get_reports_by_checklist_id(
+    checklist_id: int,
+    cursor: tuple[datetime, int] | None = None,
+    direction: str = "older",
+    limit: int = REPORTS_PAGE_SIZE,
+) -> tuple[list, bool, bool]:
+    """Страница отчетов (Report, User) по шаблону: (строки, есть_новее, есть_старше)."""
     async with async_session() as session:
         query = (
             select(Report, User)
             .join(User, Report.user_id == User.id)
             .where(Report.checklist_id == checklist_id)
-            .order_by(desc(Report.created_at))
-            .limit(10)
         )
-        result = await session.execute(query)
-        return result.all()
+        return await _reports_page(session, query, cursor, direction, limit)
 
 
 async def get_report_details(report_id: int):
@@ -167,12 +732,18 @@ async def get_report_details(report_id: int):
         report = await session.get(Report, report_id)
         user = await session.get(User, report.user_id)
         checklist = await session.get(Checklist, report.checklist_id)
-        answers_res = await session.execute(
-            select(Answer, Question)
-            .join(Question, Answer.question_id == Question.id)
-            .where(Answer.report_id == report_id)
-        )
-        answers = answers_res.all()
+        if report.answers_archived:
+            # Старые ответы вынесены из БД (app.jobs.archive)
+            archived = await load_archived_answers([report])
+            answers = await _archived_answer_rows(session, archived.get(report.id, []))
+        else:
+            answers_res = await session.execute(
+                select(Answer, Question)
+                .join(Question, Answer.question_id == Question.id)
+                .where(Answer.report_id == report_id)
+                .where(Answer.created_at == report.created_at)
+            )
+            answers = answers_res.all()
 
         return {
             "report": report,
@@ -182,18 +753,22 @@ async def get_report_details(report_id: int):
         }
 
 
-async def get_reports_by_user_tg_id(tg_id: int):
+async def get_reports_by_user_tg_id(
+    tg_id: int,
+    cursor: tuple[datetime, int] | None = None,
+    direction: str = "older",
+    limit: int = REPORTS_PAGE_SIZE,
+) -> tuple[list, bool, bool]:
+    """Страница отчетов (Report, Checklist) сотрудника: (строки, есть_новее, есть_старше)."""
     async with async_session() as session:
         user = await session.scalar(select(User).where(User.tg_id == tg_id))
         if not user:
-            return []
+            return [], False, False
 
         query = (
             select(Report, Checklist)
             .join(Checklist, Report.checklist_id == Checklist.id)
             .where(Report.user_id == user.id)
-            .order_by(desc(Report.created_at))
-            .limit(10)
         )
-        result = await session.execute(query)
-        return result.all()
+        return await _reports_page(session, query, cursor, direction, limit)
+
@@ -1,9 +1,16 @@
 from __future__ import annotations
 
-from sqlalchemy import delete, select
+from datetime import datetime, time
 
+from sqlalchemy import DateTime, Integer, bindparam, delete, desc, func, select, tuple_
+
+from app.clock import get_zone
 from app.db import async_session
-from app.models import AdminShop, User
+from app.events import USERS_CHANGED, emit
+from app.models import AdminShop, Report, Shop, User
+
+
+EMPLOYEES_PAGE_SIZE = 10
 
 
 async def get_user(tg_id: int) -> User | None:
@@ -20,7 +27,7 @@ async def add_user(
     tg_id: int,
     full_name: str,
     role: str,
-    shop_id: str,
+    shop_id: int | None,
     position: str,
 ) -> None:
     async with async_session() as session:
@@ -38,28 +45,71 @@ async def add_user(
             )
         )
         await session.commit()
+    emit(USERS_CHANGED)
+
+
+async def get_shop(shop_id: int) -> Shop | None:
+    async with async_session() as session:
+        return await session.get(Shop, shop_id)
+
+
+async def update_shop_schedule(
+    shop_id: int, timezone: str | None = None, shift_start: time | None = None
+) -> bool:
+    """Задать пояс и начало смены точки; None - значения из настроек.
+
+    Неизвестный пояс - ValueError. Дневные итоги прошлых дней остаются
+    разложенными по старой смене, пока их не пересчитают
+    (python -m app.jobs.repair daily-stats question-stats).
+    """
+    if timezone is not None:
+        get_zone(timezone)
+    async with async_session() as session:
+        shop = await session.get(Shop, shop_id)
+        if not shop:
+            return False
+        shop.timezone = timezone
+        shop.shift_start = shift_start
+        await session.commit()
+    emit(USERS_CHANGED)
+    return True
+
+
+async def _get_or_create_shop(session, name: str) -> Shop:
+    """Точка по названию; создается при первом упоминании (в транзакции session)."""
+    shop = await session.scalar(select(Shop).where(Shop.name == name))
+    if shop is None:
+        shop = Shop(name=name)
+        session.add(shop)
+        await session.flush()
+    return shop
 
 
 async def add_admin_shop(admin_tg_id: int, shop_name: str) -> None:
     """Attach a shop to an admin (avoids duplicates)."""
     async with async_session() as session:
+        shop = await _get_or_create_shop(session, shop_name)
         exists = await session.scalar(
             select(AdminShop).where(
-                (AdminShop.admin_tg_id == admin_tg_id) & (AdminShop.shop_name == shop_name)
+                (AdminShop.admin_tg_id == admin_tg_id) & (AdminShop.shop_id == shop.id)
             )
         )
         if exists:
             return
 
-        session.add(AdminShop(admin_tg_id=admin_tg_id, shop_name=shop_name))
+        session.add(AdminShop(admin_tg_id=admin_tg_id, shop_id=shop.id))
         await session.commit()
+    emit(USERS_CHANGED)
 
 
-async def get_admin_shops(admin_tg_id: int) -> list[str]:
-    """Return all shop names attached to the admin."""
+async def get_admin_shops(admin_tg_id: int) -> list[Shop]:
+    """Return all shops attached to the admin."""
     async with async_session() as session:
         result = await session.execute(
-            select(AdminShop.shop_name).where(AdminShop.admin_tg_id == admin_tg_id)
+            select(Shop)
+            .join(AdminShop, AdminShop.shop_id == Shop.id)
+            .where(AdminShop.admin_tg_id == admin_tg_id)
+            .order_by(AdminShop.id)
         )
         return list(result.scalars().all())
 
@@ -93,7 +143,8 @@ async def update_user(user_id: int, full_name: str | None = None, tg_id: int | N
                 user.tg_id = tg_id
 
         await session.commit()
-        return True
+    emit(USERS_CHANGED)
+    return True
 
 
 async def delete_user(user_id: int) -> bool:
@@ -107,7 +158,8 @@ async def delete_user(user_id: int) -> bool:
 
         await session.delete(user)
         await session.commit()
-        return True
+    emit(USERS_CHANGED)
+    return True
 
 
 async def get_all_positions() -> list[str]:
@@ -123,24 +175,23 @@ async def get_all_workers() -> list[User]:
         return list(result.scalars().all())
 
 
-async def get_all_shops() -> list[str]:
+async def get_all_shops() -> list[Shop]:
     async with async_session() as session:
-        result = await session.execute(
-            select(User.shop_id).where(User.shop_id.is_not(None)).distinct()
-        )
-        return [s for s in result.scalars().all() if s]
+        result = await session.execute(select(Shop).order_by(Shop.name))
+        return list(result.scalars().all())
 
 
-async def get_all_worker_shops() -> list[str]:
-    """Get all unique shop IDs that have workers assigned."""
+async def get_all_worker_shops() -> list[Shop]:
+    """Get all shops that have workers assigned."""
     async with async_session() as session:
-        result = await session.execute(
-            select(User.shop_id)
+        has_workers = (
+            select(User.id)
+            .where(User.shop_id == Shop.id)
             .where(User.role == "worker")
-            .where(User.shop_id.is_not(None))
-            .distinct()
+            .exists()
         )
-        return sorted([s for s in result.scalars().all() if s])
+        result = await session.execute(select(Shop).where(has_workers).order_by(Shop.name))
+        return list(result.scalars().all())
 
 
 async def get_all_admins() -> list[User]:
@@ -151,7 +202,26 @@ async def get_all_admins() -> list[User]:
         return list(result.scalars().all())
 
 
-async def get_employees_by_shop(shop_id: str) -> list[User]:
+async def get_admins_with_shops() -> list[tuple[User, list[str]]]:
+    """Все админы со списками их точек одним запросом (LEFT JOIN admin_shops)."""
+    async with async_session() as session:
+        result = await session.execute(
+            select(User, Shop.name)
+            .outerjoin(AdminShop, AdminShop.admin_tg_id == User.tg_id)
+            .outerjoin(Shop, Shop.id == AdminShop.shop_id)
+            .where(User.role == "admin")
+            .order_by(User.full_name, User.id, AdminShop.id)
+        )
+
+        admins: dict[int, tuple[User, list[str]]] = {}
+        for user, shop_name in result.all():
+            _, shops = admins.setdefault(user.id, (user, []))
+            if shop_name is not None:
+                shops.append(shop_name)
+        return list(admins.values())
+
+
+async def get_employees_by_shop(shop_id: int) -> list[User]:
     async with async_session() as session:
         result = await session.execute(
             select(User).where(User.shop_id == shop_id).order_by(User.full_name)
@@ -159,11 +229,56 @@ async def get_employees_by_shop(shop_id: str) -> list[User]:
         return list(result.scalars().all())
 
 
-async def get_employees_with_reports() -> list[User]:
-    # NOTE: implemented in reports.py to avoid circular joins.
-    from app.models import Report
+async def get_employees_with_reports(
+    shop_ids: list[int],
+    cursor: tuple[datetime, int] | None = None,
+    direction: str = "older",
+    limit: int = EMPLOYEES_PAGE_SIZE,
+) -> tuple[list[tuple[User, datetime]], bool, bool]:
+    """Сотрудники точек, у которых есть отчеты, по дате последнего отчета.
+
+    Фильтр по точкам и сортировка выполняются в SQL: EXISTS-полусоединение
+    вместо DISTINCT по join, дата последнего отчета - коррелированный MAX
+    по индексу (user_id, created_at). Keyset-пагинация по (last_report_at, id).
+    Возвращает ([(User, last_report_at)], есть_новее, есть_старше).
+    """
+    if not shop_ids:
+        return [], False, False
+
+    last_report_at = (
+        select(func.max(Report.created_at))
+        .where(Report.user_id == User.id)
+        .correlate(User)
+        .scalar_subquery()
+    )
+    has_reports = select(Report.id).where(Report.user_id == User.id).exists()
+    employees = (
+        select(User.id.label("user_id"), last_report_at.label("last_report_at"))
+        .where(User.shop_id.in_(shop_ids))
+        .where(has_reports)
+        .subquery()
+    )
+
+    key = tuple_(employees.c.last_report_at, employees.c.user_id)
+    query = select(User, employees.c.last_report_at).join(employees, User.id == employees.c.user_id)
+    if cursor is not None:
+        bound = tuple_(
+            bindparam(None, cursor[0], type_=DateTime),
+            bindparam(None, cursor[1], type_=Integer),
+        )
+        query = query.where(key > bound if direction == "newer" else key < bound)
+    if direction == "newer":
+        query = query.order_by(employees.c.last_report_at, employees.c.user_id)
+    else:
+        query = query.order_by(desc(employees.c.last_report_at), desc(employees.c.user_id))
 
     async with async_session() as session:
-        query = select(User).join(Report, User.id == Report.user_id).distinct()
-        result = await session.execute(query)
-        return list(result.scalars().all())
+        result = await session.execute(query.limit(limit + 1))
+        rows = [(user, last_at) for user, last_at in result.all()]
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if direction == "newer":
+        rows.reverse()
+        return rows, has_more, cursor is not None
+    return rows, cursor is not None, has_more
@@ -0,0 +1,45 @@
+"""Доменные события внутри процесса.
+
+CRUD-функции сообщают об изменениях через `emit`, а кэши в памяти
+(`app.cache`, рейтинг сотрудников) подписываются на них через `subscribe`.
+Обработчики синхронные и вызываются сразу после коммита; другие процессы
+(CLI-задачи, второй экземпляр бота) этих событий не видят.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from collections.abc import Callable
+
+
+logger = logging.getLogger(__name__)
+
+# Отчет начат (user_id)
+REPORT_CREATED = "report_created"
+# Отчет завершен и посчитан (report_id, user_id, score)
+REPORT_FINISHED = "report_finished"
+# Отчеты изменены или удалены пачкой (удаление шаблона, пересчет баллов)
+REPORTS_CHANGED = "reports_changed"
+# Пользователи или точки добавлены, изменены или удалены
+USERS_CHANGED = "users_changed"
+# Шаблоны или их вопросы добавлены, изменены или удалены
+CHECKLISTS_CHANGED = "checklists_changed"
+
+REPORT_EVENTS = (REPORT_CREATED, REPORT_FINISHED, REPORTS_CHANGED)
+ALL_EVENTS = (*REPORT_EVENTS, USERS_CHANGED, CHECKLISTS_CHANGED)
+
+_handlers: dict[str, list[Callable[..., None]]] = defaultdict(list)
+
+
+def subscribe(event: str, handler: Callable[..., None]) -> None:
+    _handlers[event].append(handler)
+
+
+def emit(event: str, **payload) -> None:
+    """Вызвать обработчики события; ошибка одного не мешает остальным."""
+    for handler in _handlers.get(event, ()):
+        try:
+            handler(**payload)
+        except Exception:
+            logger.exception("Обработчик события %s завершился ошибкой", event)
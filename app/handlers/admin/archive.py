@@ -1,17 +1,65 @@
 from __future__ import annotations
 
 import asyncio
+import logging
+from datetime import date, timedelta
 
 from aiogram import F, types
 from aiogram.fsm.context import FSMContext
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
+from app import clock
 from app import crud as db
 from app import keyboards as kb
+from app.utils import decode_cursor, encode_cursor, score_series_line
 
 from .router import router
 
 
+logger = logging.getLogger(__name__)
+
+TREND_WEEKS = 12
+
+
+def _parse_page(data: str) -> tuple[int, tuple | None, str]:
+    """`<prefix>_<id>[_<o|n>_<cursor>]` -> (id, курсор, направление)."""
+    parts = data.split("_", 4)
+    target_id = int(parts[2])
+    if len(parts) < 5:
+        return target_id, None, "older"
+    return target_id, decode_cursor(parts[4]), "newer" if parts[3] == "n" else "older"
+
+
+def _trend_start(weeks: int = TREND_WEEKS) -> date:
+    """Понедельник недели, с которой начинается ряд из weeks недель."""
+    today = clock.today()
+    return today - timedelta(days=today.weekday(), weeks=weeks - 1)
+
+
+def _report_key(row) -> tuple:
+    report = row[0]
+    return report.created_at, report.id
+
+
+def _add_page_buttons(
+    builder: InlineKeyboardBuilder,
+    base: str,
+    rows: list,
+    has_newer: bool,
+    has_older: bool,
+    key=_report_key,
+) -> int:
+    """Кнопки «Новее/Старше» с курсором по краям страницы. Возвращает их число."""
+    count = 0
+    if has_newer:
+        builder.button(text="⬅️ Новее", callback_data=f"{base}_n_{encode_cursor(*key(rows[0]))}")
+        count += 1
+    if has_older:
+        builder.button(text="Старше ➡️", callback_data=f"{base}_o_{encode_cursor(*key(rows[-1]))}")
+        count += 1
+    return count
+
+
 @router.message(F.text == "🗄 Архив")
 async def cmd_archive_menu(message: types.Message) -> None:
     await message.answer("🗄 <b>Архив проверок</b>", reply_markup=kb.checklists_mode_kb)
@@ -30,29 +78,46 @@ async def back_to_modes(callback: types.CallbackQuery) -> None:
 @router.callback_query(F.data == "show_general_stats")
 async def show_general_stats(callback: types.CallbackQuery) -> None:
     admin_shops = await db.get_admin_shops(callback.from_user.id)
-    stats = await db.get_monthly_stats_by_shop()
+    stats = await db.get_monthly_stats_by_shop([shop.id for shop in admin_shops])
     if not stats:
-        await callback.answer("Данных нет.", show_alert=True)
+        await callback.answer("По вашим точкам данных нет.", show_alert=True)
         return
 
+    shop_ids = {shop.name: shop.id for shop in admin_shops}
+    trends = await db.get_score_series_by_shop(list(shop_ids.values()), start=_trend_start())
     text_lines = ["📊 <b>Сводка эффективности (Текущий месяц)</b>", "➖➖➖➖➖➖➖➖➖➖"]
-    has_data = False
     for shop, avg_score, _count in stats:
-        if shop not in admin_shops:
-            continue
-        has_data = True
         score = int(avg_score)
         icon = "🟢" if score >= 90 else "🟡" if score >= 75 else "🔴"
+        series = trends[shop_ids[shop]]
         text_lines.append(f"🏠 <b>{shop}</b>")
         text_lines.append(f"   📈 Результат: <b>{icon} {score}%</b>")
+        text_lines.append(f"   📉 {TREND_WEEKS} нед.: {score_series_line(series)}")
         text_lines.append("")
 
-    if not has_data:
-        await callback.answer("По вашим точкам данных нет.", show_alert=True)
-        return
-
     builder = InlineKeyboardBuilder()
+    builder.button(text="📈 Вся история", callback_data="general_stats_history")
     builder.button(text="🔙 Назад", callback_data="back_to_modes")
+    builder.adjust(1)
+    await callback.message.edit_text("\n".join(text_lines), reply_markup=builder.as_markup())
+
+
+@router.callback_query(F.data == "general_stats_history")
+async def show_general_stats_history(callback: types.CallbackQuery) -> None:
+    admin_shops = await db.get_admin_shops(callback.from_user.id)
+    history = await db.get_score_series_by_shop([shop.id for shop in admin_shops], bucket="month")
+    text_lines = ["📈 <b>Результаты по месяцам (вся история)</b>", "➖➖➖➖➖➖➖➖➖➖"]
+    for shop in admin_shops:
+        series = history[shop.id]
+        text_lines.append(f"🏠 <b>{shop.name}</b>")
+        if series:
+            text_lines.append(f"   с {series[0]['start']:%m.%Y}: {score_series_line(series)}")
+        else:
+            text_lines.append("   нет данных")
+        text_lines.append("")
+
+    builder = InlineKeyboardBuilder()
+    builder.button(text="🔙 Назад", callback_data="show_general_stats")
     await callback.message.edit_text("\n".join(text_lines), reply_markup=builder.as_markup())
 
 
@@ -76,25 +141,74 @@ async def mode_by_checklist(callback: types.CallbackQuery) -> None:
 
 @router.callback_query(F.data == "stats_history")
 async def stats_history_list(callback: types.CallbackQuery) -> None:
-    checklists = await db.get_checklists()
-    builder = InlineKeyboardBuilder()
-    if checklists:
-        for ch in checklists:
-            builder.button(text=f"📋 {ch.title}", callback_data=f"view_ch_{ch.id}")
-    else:
+    admin_shops = await db.get_admin_shops(callback.from_user.id)
+    counts = await db.get_checklists_count_by_shop([shop.id for shop in admin_shops])
+    if not counts:
         await callback.answer("Пусто", show_alert=True)
+        return
 
+    builder = InlineKeyboardBuilder()
+    by_shop = dict(counts)
+    if by_shop.get(None):
+        builder.button(text=f"🌍 Все точки ({by_shop[None]})", callback_data="hch_a_0_*")
+    for shop in admin_shops:
+        if by_shop.get(shop.id):
+            builder.button(
+                text=f"🏠 {shop.name} ({by_shop[shop.id]})", callback_data=f"hch_a_0_{shop.id}"
+            )
     builder.button(text="🔙 Назад", callback_data="stats_chat")
     builder.adjust(1)
-    await callback.message.edit_text("📂 <b>Архив всех шаблонов:</b>", reply_markup=builder.as_markup())
+    await callback.message.edit_text("📂 <b>Архив шаблонов по точкам:</b>", reply_markup=builder.as_markup())
+
+
+@router.callback_query(F.data.startswith("hch_"))
+async def stats_history_shop(callback: types.CallbackQuery) -> None:
+    # hch_<a|b>_<id>_<id точки>: a - после id, b - до id; "*" - общие шаблоны
+    _, direction, cursor_id, shop_key = callback.data.split("_", 3)
+    cursor_id = int(cursor_id)
+    shop_id = None if shop_key == "*" else int(shop_key)
+
+    shop_text = "Все точки"
+    if shop_id is not None:
+        admin_shops = {shop.id: shop.name for shop in await db.get_admin_shops(callback.from_user.id)}
+        if shop_id not in admin_shops:
+            await callback.answer("⛔️ Доступ запрещен.", show_alert=True)
+            return
+        shop_text = admin_shops[shop_id]
+
+    if direction == "b":
+        checklists, has_prev, has_next = await db.get_checklists_page(shop_id, before_id=cursor_id)
+    else:
+        checklists, has_prev, has_next = await db.get_checklists_page(
+            shop_id, after_id=cursor_id or None
+        )
+
+    builder = InlineKeyboardBuilder()
+    for ch in checklists:
+        builder.button(text=f"📋 {ch.title}", callback_data=f"view_ch_{ch.id}")
+    nav_count = 0
+    if has_prev:
+        builder.button(text="⬅️ Назад", callback_data=f"hch_b_{checklists[0].id}_{shop_key}")
+        nav_count += 1
+    if has_next:
+        builder.button(text="Далее ➡️", callback_data=f"hch_a_{checklists[-1].id}_{shop_key}")
+        nav_count += 1
+    builder.button(text="🔙 К точкам", callback_data="stats_history")
+    builder.adjust(*[1] * len(checklists), *([nav_count] if nav_count else []), 1)
+
+    text = f"📂 <b>Шаблоны: {shop_text}</b>" if checklists else f"📭 {shop_text}: шаблонов нет."
+    await callback.message.edit_text(text, reply_markup=builder.as_markup())
 
 
 @router.callback_query(F.data.startswith("view_ch_"))
 async def stats_show_reports_list(callback: types.CallbackQuery, state: FSMContext) -> None:
-    checklist_id = int(callback.data.split("_")[2])
-    await state.update_data(parent_menu=f"view_ch_{checklist_id}")
+    checklist_id, cursor, direction = _parse_page(callback.data)
+    # Запоминаем текущую страницу, чтобы вернуться на нее из отчета
+    await state.update_data(parent_menu=callback.data)
 
-    reports_data = await db.get_reports_by_checklist_id(checklist_id)
+    reports_data, has_newer, has_older = await db.get_reports_by_checklist_id(
+        checklist_id, cursor=cursor, direction=direction
+    )
     if not reports_data:
         builder = InlineKeyboardBuilder()
         builder.button(text="🔙 Назад", callback_data="stats_chat")
@@ -105,36 +219,57 @@ async def stats_show_reports_list(callback: types.CallbackQuery, state: FSMConte
     for report, user in reports_data:
         time_str = report.created_at.strftime("%d.%m %H:%M")
         builder.button(text=f"{time_str} | {user.full_name}", callback_data=f"show_rep_{report.id}")
+    nav_count = _add_page_buttons(
+        builder, f"view_ch_{checklist_id}", reports_data, has_newer, has_older
+    )
     builder.button(text="🔙 Назад", callback_data="stats_chat")
-    builder.adjust(1)
-    await callback.message.edit_text("🕑 <b>Последние 10 проверок:</b>", reply_markup=builder.as_markup())
+    builder.adjust(*[1] * len(reports_data), *([nav_count] if nav_count else []), 1)
+    series = await db.get_score_series(checklist_id=checklist_id, start=_trend_start())
+    await callback.message.edit_text(
+        f"🕑 <b>Проверки по шаблону:</b>\n📉 {TREND_WEEKS} нед.: {score_series_line(series)}",
+        reply_markup=builder.as_markup(),
+    )
 
 
 @router.callback_query(F.data == "mode_by_employee")
+@router.callback_query(F.data.startswith("emp_rep_"))
 async def mode_by_employee(callback: types.CallbackQuery) -> None:
-    users = await db.get_employees_with_reports()
+    cursor, direction = None, "older"
+    if callback.data.startswith("emp_rep_"):
+        # emp_rep_<o|n>_<курсор>
+        _, _, page_dir, raw_cursor = callback.data.split("_", 3)
+        cursor = decode_cursor(raw_cursor)
+        direction = "newer" if page_dir == "n" else "older"
+
     admin_shops = await db.get_admin_shops(callback.from_user.id)
-    my_users = [u for u in users if u.shop_id in admin_shops]
-    if not my_users:
+    rows, has_newer, has_older = await db.get_employees_with_reports(
+        [shop.id for shop in admin_shops], cursor=cursor, direction=direction
+    )
+    if not rows:
         builder = InlineKeyboardBuilder()
         builder.button(text="🔙 Назад", callback_data="back_to_modes")
         await callback.message.edit_text("📭 Нет отчетов.", reply_markup=builder.as_markup())
         return
 
     builder = InlineKeyboardBuilder()
-    for user in my_users:
+    for user, _last_report_at in rows:
         builder.button(text=f"👤 {user.full_name}", callback_data=f"hist_user_{user.tg_id}")
+    nav_count = _add_page_buttons(
+        builder, "emp_rep", rows, has_newer, has_older, key=lambda row: (row[1], row[0].id)
+    )
     builder.button(text="🔙 Назад", callback_data="back_to_modes")
-    builder.adjust(1)
+    builder.adjust(*[1] * len(rows), *([nav_count] if nav_count else []), 1)
     await callback.message.edit_text("👤 <b>Выберите сотрудника:</b>", reply_markup=builder.as_markup())
 
 
 @router.callback_query(F.data.startswith("hist_user_"))
 async def show_employee_history(callback: types.CallbackQuery, state: FSMContext) -> None:
-    target_tg_id = int(callback.data.split("_")[2])
-    await state.update_data(parent_menu=f"hist_user_{target_tg_id}")
+    target_tg_id, cursor, direction = _parse_page(callback.data)
+    await state.update_data(parent_menu=callback.data)
 
-    reports_data = await db.get_reports_by_user_tg_id(target_tg_id)
+    reports_data, has_newer, has_older = await db.get_reports_by_user_tg_id(
+        target_tg_id, cursor=cursor, direction=direction
+    )
     if not reports_data:
         await callback.answer("Данных нет.", show_alert=True)
         return
@@ -143,9 +278,17 @@ async def show_employee_history(callback: types.CallbackQuery, state: FSMContext
     for report, checklist in reports_data:
         time_str = report.created_at.strftime("%d.%m %H:%M")
         builder.button(text=f"{time_str} | {checklist.title}", callback_data=f"show_rep_{report.id}")
+    nav_count = _add_page_buttons(
+        builder, f"hist_user_{target_tg_id}", reports_data, has_newer, has_older
+    )
     builder.button(text="🔙 Назад", callback_data="mode_by_employee")
-    builder.adjust(1)
-    await callback.message.edit_text("👤 <b>История сотрудника:</b>", reply_markup=builder.as_markup())
+    builder.adjust(*[1] * len(reports_data), *([nav_count] if nav_count else []), 1)
+    text = "👤 <b>История сотрудника:</b>"
+    user = await db.get_user(target_tg_id)
+    if user:
+        series = await db.get_score_series(user_id=user.id, start=_trend_start())
+        text += f"\n📉 {TREND_WEEKS} нед.: {score_series_line(series)}"
+    await callback.message.edit_text(text, reply_markup=builder.as_markup())
 
 
 @router.callback_query(F.data.startswith("show_rep_"))
@@ -155,7 +298,12 @@ async def show_full_report(callback: types.CallbackQuery, state: FSMContext) ->
     except Exception:
         return
 
-    data = await db.get_report_details(report_id)
+    try:
+        data = await db.get_report_details(report_id)
+    except FileNotFoundError:
+        logger.exception("Отчет %s: архив ответов недоступен", report_id)
+        await callback.answer("Ответы этого отчета в архиве сейчас недоступны.", show_alert=True)
+        return
     if not data or not data.get("report"):
         await callback.answer("Ошибка.", show_alert=True)
         return
@@ -165,13 +313,17 @@ async def show_full_report(callback: types.CallbackQuery, state: FSMContext) ->
     checklist = data["checklist"]
     answers = data["answers"]
 
+    points_text = ""
+    if report.max_points:
+        points_text = f" ({report.points_sum} из {report.max_points} б.)"
+
     text_lines = [
         f"📑 <b>ОТЧЕТ: {checklist.title.upper()}</b>",
         "➖➖➖➖➖➖➖➖",
         f"👤 <b>Сотрудник:</b> {user.full_name}",
-        f"🏠 <b>Точка:</b> {user.shop_id}",
+        f"🏠 <b>Точка:</b> {user.shop_name}",
         f"📅 <b>Дата:</b> {report.created_at.strftime('%d.%m.%Y %H:%M')}",
-        f"📊 <b>Результат:</b> {report.score_percent}%",
+        f"📊 <b>Результат:</b> {report.score_percent}%{points_text}",
         "➖➖➖➖➖➖➖➖\n",
     ]
 
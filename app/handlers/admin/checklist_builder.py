@@ -36,13 +36,13 @@ async def set_title(message: types.Message, state: FSMContext) -> None:
     admin_shops = await db.get_admin_shops(message.from_user.id)
 
     if len(admin_shops) == 1:
-        await state.update_data(shop_id=admin_shops[0])
+        await state.update_data(shop_id=admin_shops[0].id, shop_name=admin_shops[0].name)
         await show_assign_position_menu(message, state, is_edit=False)
     else:
         builder = InlineKeyboardBuilder()
         builder.button(text="🌍 Для всех моих точек", callback_data="shop_all")
         for shop in admin_shops:
-            builder.button(text=f"🏠 {shop}", callback_data=f"shop_sel_{shop}")
+            builder.button(text=f"🏠 {shop.name}", callback_data=f"shop_sel_{shop.id}")
         builder.adjust(1)
         builder.button(text="❌ Отмена", callback_data="cancel_creation")
 
@@ -60,10 +60,14 @@ async def set_checklist_shop(callback: types.CallbackQuery, state: FSMContext) -
         return
 
     if callback.data == "shop_all":
-        await state.update_data(shop_id=None)  # None = для всех точек админа
+        await state.update_data(shop_id=None, shop_name=None)  # None = для всех точек админа
     else:
-        shop_name = callback.data.split("_", 2)[2]
-        await state.update_data(shop_id=shop_name)
+        shop_id = int(callback.data.split("_", 2)[2])
+        admin_shops = {shop.id: shop.name for shop in await db.get_admin_shops(callback.from_user.id)}
+        if shop_id not in admin_shops:
+            await callback.answer("⛔️ Нет доступа к этой точке.", show_alert=True)
+            return
+        await state.update_data(shop_id=shop_id, shop_name=admin_shops[shop_id])
 
     await show_assign_position_menu(callback, state, is_edit=True)
 
@@ -122,7 +126,7 @@ async def set_assignee(callback: types.CallbackQuery, state: FSMContext) -> None
         await state.update_data(checklist_id=checklist_id)
 
     pos_text = target_position if target_position else "Все должности"
-    shop_text = shop_id if shop_id else "Все мои точки"
+    shop_text = data.get("shop_name") or "Все мои точки"
 
     await callback.message.edit_text(
         f"✅ Шаблон создан.\n🏠 Точка: <b>{shop_text}</b>\n🎯 Для: <b>{pos_text}</b>\n\n👇 Введите текст <b>первого вопроса</b>:",
@@ -17,13 +17,13 @@ from .states import EditChecklist
 @router.message(F.text == "✏️ Редактировать шаблон")
 async def start_edit_checklist(message: types.Message, state: FSMContext) -> None:
     """Начало редактирования - показываем список чек-листов админа"""
-    admin_shops = await db.get_admin_shops(message.from_user.id)
+    admin_shop_ids = {shop.id for shop in await db.get_admin_shops(message.from_user.id)}
     all_checklists = await db.get_checklists()
     
     # Фильтруем чек-листы, которые принадлежат админу
     my_checklists = [
         ch for ch in all_checklists 
-        if ch.shop_id is None or ch.shop_id in admin_shops
+        if ch.shop_id is None or ch.shop_id in admin_shop_ids
     ]
     
     if not my_checklists:
@@ -32,7 +32,7 @@ async def start_edit_checklist(message: types.Message, state: FSMContext) -> Non
     
     builder = InlineKeyboardBuilder()
     for ch in my_checklists:
-        shop_text = ch.shop_id if ch.shop_id else "Все точки"
+        shop_text = ch.shop_name or "Все точки"
         builder.button(
             text=f"📋 {ch.title} ({shop_text})", 
             callback_data=f"edit_ch_{ch.id}"
@@ -65,7 +65,7 @@ async def show_checklist_menu(callback: types.CallbackQuery, state: FSMContext)
     
     await state.update_data(checklist_id=checklist_id)
     
-    shop_text = checklist.shop_id if checklist.shop_id else "Все точки"
+    shop_text = checklist.shop_name or "Все точки"
     pos_text = checklist.target_position if checklist.target_position else "Все должности"
     
     builder = InlineKeyboardBuilder()
@@ -115,7 +115,7 @@ async def show_checklist_menu_after_edit(message_or_callback, state: FSMContext,
     if not checklist:
         return
     
-    shop_text = checklist.shop_id if checklist.shop_id else "Все точки"
+    shop_text = checklist.shop_name or "Все точки"
     pos_text = checklist.target_position if checklist.target_position else "Все должности"
     
     builder = InlineKeyboardBuilder()
@@ -171,16 +171,16 @@ async def start_edit_shop(callback: types.CallbackQuery, state: FSMContext) -> N
         
         data = await state.get_data()
         checklist_id = data["checklist_id"]
-        new_shop_id = admin_shops[0]
+        new_shop = admin_shops[0]
         
         # Обновляем точку
-        await db.update_checklist(checklist_id, shop_id=new_shop_id)
+        await db.update_checklist(checklist_id, shop_id=new_shop.id)
         
         # Показываем обновленное меню
         await show_checklist_menu_after_edit(
             callback, 
             state, 
-            status_text=f"✅ Точка установлена: <b>{new_shop_id}</b>"
+            status_text=f"✅ Точка установлена: <b>{new_shop.name}</b>"
         )
         return
     
@@ -188,7 +188,7 @@ async def start_edit_shop(callback: types.CallbackQuery, state: FSMContext) -> N
     builder = InlineKeyboardBuilder()
     builder.button(text="🌍 Для всех моих точек", callback_data="shop_all")
     for shop in admin_shops:
-        builder.button(text=f"🏠 {shop}", callback_data=f"shop_sel_{shop}")
+        builder.button(text=f"🏠 {shop.name}", callback_data=f"shop_sel_{shop.id}")
     builder.adjust(1)
     builder.button(text="❌ Отмена", callback_data="cancel_edit")
     
@@ -219,9 +219,12 @@ async def set_shop(callback: types.CallbackQuery, state: FSMContext) -> None:
         shop_id = None
         shop_text = "все точки"
     else:
-        shop_name = callback.data.split("_", 2)[2]
-        shop_id = shop_name
-        shop_text = shop_name
+        shop_id = int(callback.data.split("_", 2)[2])
+        admin_shops = {shop.id: shop.name for shop in await db.get_admin_shops(callback.from_user.id)}
+        if shop_id not in admin_shops:
+            await callback.answer("⛔️ Нет доступа к этой точке.", show_alert=True)
+            return
+        shop_text = admin_shops[shop_id]
     
     # Проверяем, изменилась ли точка
     checklist = await db.get_checklist(checklist_id)
@@ -670,9 +673,8 @@ async def confirm_delete_checklist(callback: types.CallbackQuery, state: FSMCont
     warning_text = ""
     if reports_count > 0:
         warning_text = (
-            f"\n\n⚠️ <b>ВНИМАНИЕ!</b>\n"
-            f"У этого шаблона есть <b>{reports_count} отчетов</b>.\n"
-            f"При удалении шаблона <b>все отчеты будут удалены безвозвратно!</b>"
+            f"\n\nℹ️ У этого шаблона есть <b>{reports_count} отчетов</b>.\n"
+            f"Шаблон пропадет из списков, отчеты останутся в истории."
         )
     
     await callback.message.edit_text(
@@ -684,7 +686,7 @@ async def confirm_delete_checklist(callback: types.CallbackQuery, state: FSMCont
 
 @router.callback_query(F.data == "confirm_delete_checklist")
 async def delete_checklist_handler(callback: types.CallbackQuery, state: FSMContext) -> None:
-    """Обработчик удаления чек-листа"""
+    """Обработчик удаления чек-листа (мягкое удаление, мгновенно)"""
     data = await state.get_data()
     checklist_id = data.get("checklist_id")
     
@@ -692,7 +694,7 @@ async def delete_checklist_handler(callback: types.CallbackQuery, state: FSMCont
         await callback.answer("Ошибка: не найден ID шаблона.", show_alert=True)
         return
     
-    success, result_message, reports_deleted = await db.delete_checklist(checklist_id)
+    success, result_message, _ = await db.delete_checklist(checklist_id)
     
     if success:
         await callback.message.edit_text(result_message)
@@ -712,4 +714,3 @@ async def delete_checklist_handler(callback: types.CallbackQuery, state: FSMCont
             answer=callback.answer
         )
         await show_checklist_menu(fake_callback, state)
-
@@ -6,6 +6,7 @@ from aiogram.utils.keyboard import InlineKeyboardBuilder
 
 from app import crud as db
 from app import keyboards as kb
+from app.models import Shop
 from app.utils import cancel_kb
 
 from .router import router
@@ -24,6 +25,16 @@ async def cmd_my_employees(message: types.Message) -> None:
     )
 
 
+async def _get_admin_shop(callback: types.CallbackQuery) -> Shop | None:
+    """Точка из callback_data вида <prefix>_<prefix>_<id>, если она закреплена за админом."""
+    shop_id = int(callback.data.split("_", 2)[2])
+    for shop in await db.get_admin_shops(callback.from_user.id):
+        if shop.id == shop_id:
+            return shop
+    await callback.answer("⛔️ Нет доступа к этой точке.", show_alert=True)
+    return None
+
+
 @router.callback_query(F.data == "emp_list")
 async def show_my_shops_for_list(callback: types.CallbackQuery) -> None:
     shops = await db.get_admin_shops(callback.from_user.id)
@@ -33,7 +44,7 @@ async def show_my_shops_for_list(callback: types.CallbackQuery) -> None:
 
     builder = InlineKeyboardBuilder()
     for shop in shops:
-        builder.button(text=f"🏠 {shop}", callback_data=f"shop_view_{shop}")
+        builder.button(text=f"🏠 {shop.name}", callback_data=f"shop_view_{shop.id}")
     builder.button(text="🔙 Назад", callback_data="back_to_emp_menu")
     builder.adjust(2)
 
@@ -44,11 +55,13 @@ async def show_my_shops_for_list(callback: types.CallbackQuery) -> None:
 
 @router.callback_query(F.data.startswith("shop_view_"))
 async def show_shop_employees_list(callback: types.CallbackQuery) -> None:
-    target_shop = callback.data.split("_", 2)[2]
-    users = await db.get_employees_by_shop(target_shop)
+    target_shop = await _get_admin_shop(callback)
+    if target_shop is None:
+        return
+    users = await db.get_employees_by_shop(target_shop.id)
 
     text_lines = [
-        f"🏠 <b>{target_shop}</b>",
+        f"🏠 <b>{target_shop.name}</b>",
         f"👥 Команда: {len(users)} чел.",
         "➖➖➖➖➖➖➖➖➖➖",
     ]
@@ -81,7 +94,7 @@ async def start_del_employee(callback: types.CallbackQuery) -> None:
 
     builder = InlineKeyboardBuilder()
     for shop in shops:
-        builder.button(text=f"🏠 {shop}", callback_data=f"shop_del_{shop}")
+        builder.button(text=f"🏠 {shop.name}", callback_data=f"shop_del_{shop.id}")
 
     builder.button(text="🔙 Назад", callback_data="back_to_emp_menu")
     builder.adjust(2)
@@ -93,8 +106,10 @@ async def start_del_employee(callback: types.CallbackQuery) -> None:
 
 @router.callback_query(F.data.startswith("shop_del_"))
 async def show_users_for_del(callback: types.CallbackQuery) -> None:
-    target_shop = callback.data.split("_", 2)[2]
-    users = await db.get_employees_by_shop(target_shop)
+    target_shop = await _get_admin_shop(callback)
+    if target_shop is None:
+        return
+    users = await db.get_employees_by_shop(target_shop.id)
     worker_list = [u for u in users if u.role == "worker"]
 
     builder = InlineKeyboardBuilder()
@@ -145,16 +160,16 @@ async def set_worker_name(message: types.Message, state: FSMContext) -> None:
     admin_shops = await db.get_admin_shops(message.from_user.id)
 
     if len(admin_shops) == 1:
-        await state.update_data(shop_id=admin_shops[0])
+        await state.update_data(shop_id=admin_shops[0].id, shop_name=admin_shops[0].name)
         await message.answer(
-            f"🏠 Точка: <b>{admin_shops[0]}</b>\n\n💼 Введите <b>Должность</b> (например: Бариста):",
+            f"🏠 Точка: <b>{admin_shops[0].name}</b>\n\n💼 Введите <b>Должность</b> (например: Бариста):",
             reply_markup=cancel_kb(),
         )
         await state.set_state(AddWorker.position)
     else:
         builder = InlineKeyboardBuilder()
         for shop in admin_shops:
-            builder.button(text=shop, callback_data=f"sel_shop_{shop}")
+            builder.button(text=shop.name, callback_data=f"sel_shop_{shop.id}")
         builder.adjust(2)
         await message.answer(
             "🏠 <b>В какую точку добавить сотрудника?</b>", reply_markup=builder.as_markup()
@@ -164,10 +179,12 @@ async def set_worker_name(message: types.Message, state: FSMContext) -> None:
 
 @router.callback_query(AddWorker.select_shop)
 async def set_worker_shop_manual(callback: types.CallbackQuery, state: FSMContext) -> None:
-    shop_name = callback.data.split("_", 2)[2]
-    await state.update_data(shop_id=shop_name)
+    shop = await _get_admin_shop(callback)
+    if shop is None:
+        return
+    await state.update_data(shop_id=shop.id, shop_name=shop.name)
     await callback.message.answer(
-        f"✅ Выбрано: <b>{shop_name}</b>\n\n💼 Введите <b>Должность</b> (например: Бариста):",
+        f"✅ Выбрано: <b>{shop.name}</b>\n\n💼 Введите <b>Должность</b> (например: Бариста):",
         reply_markup=cancel_kb(),
     )
     await state.set_state(AddWorker.position)
@@ -194,7 +211,7 @@ async def set_worker_pos(message: types.Message, state: FSMContext) -> None:
     await message.answer(
         f"🎉 <b>Сотрудник добавлен!</b>\n"
         f"👤 {data['full_name']} ({position})\n"
-        f"🏠 {shop_id}",
+        f"🏠 {data.get('shop_name')}",
         reply_markup=builder.as_markup(),
     )
     await state.clear()
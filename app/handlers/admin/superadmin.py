@@ -1,19 +1,31 @@
 from __future__ import annotations
 
+import html
+import re
+from datetime import datetime, timedelta
+
 from aiogram import F, types
 from aiogram.exceptions import TelegramBadRequest
-from aiogram.filters import Command
+from aiogram.filters import Command, CommandObject
 from aiogram.fsm.context import FSMContext
+from aiogram.types import InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
+from app import clock
 from app import crud as db
 from app import keyboards as kb
-from app.utils import cancel_kb
+from app.cache import cache_stats
+from app.jobs.scheduler import scheduler
+from app.models import User
+from app.utils import cancel_kb, score_series_line, sparkline
 
 from .router import router
 from .states import AddManager, AddSuperAdmin, EditAdmin
 
 
+TREND_WEEKS = 12
+
+
 @router.message(F.text == "📊 Панель аналитики")
 async def analytics_panel(message: types.Message) -> None:
     user = await db.get_user(message.from_user.id)
@@ -137,9 +149,7 @@ async def show_admin_detail(callback: types.CallbackQuery) -> None:
     ]
 
     if last_activity:
-        from datetime import datetime
-
-        now = datetime.now()
+        now = clock.now()
         delta = now - last_activity
         if delta.days == 0:
             hours = delta.seconds // 3600
@@ -217,16 +227,14 @@ async def show_admin_checklists(callback: types.CallbackQuery) -> None:
         score_icon = "🟢" if avg_score >= 90 else "🟡" if avg_score >= 75 else "🔴"
 
         text_lines.append(f"\n📝 <b>{checklist.title}</b>")
-        text_lines.append(f"   🏠 Точка: {checklist.shop_id or 'Все точки'}")
+        text_lines.append(f"   🏠 Точка: {checklist.shop_name or 'Все точки'}")
         text_lines.append(f"   ❓ Вопросов: {questions_count}")
         text_lines.append(f"   📊 Использований: {reports_count}")
         if reports_count > 0:
             text_lines.append(f"   {score_icon} Средний балл: {avg_score}%")
 
         if last_use:
-            from datetime import datetime
-
-            now = datetime.now()
+            now = clock.now()
             delta = now - last_use
             if delta.days == 0:
                 hours = delta.seconds // 3600
@@ -295,8 +303,8 @@ async def show_admin_workers(callback: types.CallbackQuery) -> None:
                 await callback.answer()
         return
 
-    # Сортируем по активности
-    workers_stats.sort(key=lambda x: x.get("total_reports", 0), reverse=True)
+    # Сортируем по активности (копия: список из кэша аналитики общий)
+    workers_stats = sorted(workers_stats, key=lambda x: x.get("total_reports", 0), reverse=True)
 
     text_lines = [f"👷 <b>Сотрудники управленца: {admin.full_name}</b>", "➖➖➖➖➖➖➖➖➖➖"]
 
@@ -313,16 +321,14 @@ async def show_admin_workers(callback: types.CallbackQuery) -> None:
         score_icon = "🟢" if avg_score >= 90 else "🟡" if avg_score >= 75 else "🔴"
 
         text_lines.append(f"\n👤 <b>{worker.full_name}</b>")
-        text_lines.append(f"   🏠 {worker.shop_id or 'Без точки'}")
+        text_lines.append(f"   🏠 {worker.shop_name or 'Без точки'}")
         text_lines.append(f"   💼 {worker.position}")
         text_lines.append(f"   📊 Всего отчетов: {total_reports}")
         text_lines.append(f"   {score_icon} Средний балл: {avg_score}%")
         text_lines.append(f"   📈 Отчетов (7 дней): {reports_week}")
 
         if last_activity:
-            from datetime import datetime
-
-            now = datetime.now()
+            now = clock.now()
             delta = now - last_activity
             if delta.days == 0:
                 hours = delta.seconds // 3600
@@ -384,19 +390,10 @@ async def show_workers_activity(callback: types.CallbackQuery) -> None:
         return
 
     builder = InlineKeyboardBuilder()
-    for shop in shops:
-        # Подсчитываем количество сотрудников для этой точки
-        workers_count = 0
-        if shop == "Без точки":
-            workers_stats, total = await db.get_workers_by_shop(None, offset=0, limit=1)
-            workers_count = total
-        else:
-            workers_stats, total = await db.get_workers_by_shop(shop, offset=0, limit=1)
-            workers_count = total
-        
-        button_text = f"🏠 {shop} ({workers_count})"
-        # Используем shop как callback_data, но для "Без точки" используем специальное значение
-        shop_callback = "worker_shop_none" if shop == "Без точки" else f"worker_shop_{shop}"
+    for shop_id, shop_name, workers_count in shops:
+        button_text = f"🏠 {shop_name} ({workers_count})"
+        # Для сотрудников без точки используем специальное значение
+        shop_callback = "worker_shop_none" if shop_id is None else f"worker_shop_{shop_id}"
         builder.button(text=button_text, callback_data=shop_callback)
 
     builder.button(text="🔙 Назад", callback_data="analytics_back")
@@ -424,24 +421,26 @@ async def show_workers_by_shop(callback: types.CallbackQuery) -> None:
 
     await callback.answer("⏳ Загрузка...")
 
-    callback_data = callback.data
-    offset = 0
-    base_shop_callback = callback_data
-    
-    # Проверяем, есть ли offset в callback_data (для пагинации)
-    if "_offset_" in callback_data:
-        parts = callback_data.split("_offset_")
-        base_shop_callback = parts[0]
-        offset = int(parts[1])
-    
-    if base_shop_callback == "worker_shop_none":
+    # worker_shop_<id|none>[_<reports|score>][_offset_<n>]
+    match = re.match(r"^(worker_shop_(?:none|\d+))(?:_(reports|score))?(?:_offset_(\d+))?$", callback.data)
+    if not match:
+        return
+    shop_key, order, offset_text = match.groups()
+    order = order or "reports"
+    offset = int(offset_text or 0)
+    base_shop_callback = f"{shop_key}_{order}"
+
+    if shop_key == "worker_shop_none":
         shop_id = None
         shop_name = "Без точки"
     else:
-        shop_id = base_shop_callback.replace("worker_shop_", "", 1)
-        shop_name = shop_id
+        shop_id = int(shop_key.replace("worker_shop_", "", 1))
+        shop = await db.get_shop(shop_id)
+        shop_name = shop.name if shop else "—"
 
-    workers_stats, total_count = await db.get_workers_by_shop(shop_id, offset=offset, limit=5)
+    workers_stats, total_count = await db.get_workers_by_shop(
+        shop_id, offset=offset, limit=5, order=order
+    )
 
     if not workers_stats:
         builder = InlineKeyboardBuilder()
@@ -457,7 +456,12 @@ async def show_workers_by_shop(callback: types.CallbackQuery) -> None:
                 await callback.answer()
         return
 
-    text_lines = [f"👷 <b>Сотрудники точки: {shop_name}</b>", "➖➖➖➖➖➖➖➖➖➖"]
+    order_text = "по числу отчетов" if order == "reports" else "по среднему баллу"
+    text_lines = [
+        f"👷 <b>Сотрудники точки: {shop_name}</b>",
+        f"🏆 Рейтинг {order_text}",
+        "➖➖➖➖➖➖➖➖➖➖",
+    ]
 
     for stats in workers_stats:
         worker = stats.get("worker")
@@ -471,16 +475,14 @@ async def show_workers_by_shop(callback: types.CallbackQuery) -> None:
 
         score_icon = "🟢" if avg_score >= 90 else "🟡" if avg_score >= 75 else "🔴"
 
-        text_lines.append(f"\n👤 <b>{worker.full_name}</b>")
+        text_lines.append(f"\n{stats['rank']}. 👤 <b>{worker.full_name}</b>")
         text_lines.append(f"   💼 {worker.position}")
         text_lines.append(f"   📊 Всего отчетов: {total_reports}")
         text_lines.append(f"   {score_icon} Средний балл: {avg_score}%")
         text_lines.append(f"   📈 Отчетов (7 дней): {reports_week}")
 
         if last_activity:
-            from datetime import datetime
-
-            now = datetime.now()
+            now = clock.now()
             delta = now - last_activity
             if delta.days == 0:
                 hours = delta.seconds // 3600
@@ -518,9 +520,13 @@ async def show_workers_by_shop(callback: types.CallbackQuery) -> None:
         else:
             prev_callback = f"{base_shop_callback}_offset_{prev_offset}"
         builder.button(text="⬅️ Назад", callback_data=prev_callback)
-    
+
+    other_order = "score" if order == "reports" else "reports"
+    other_text = "🎯 По баллу" if other_order == "score" else "📊 По отчетам"
+    builder.button(text=f"🔀 {other_text}", callback_data=f"{shop_key}_{other_order}")
     builder.button(text="🔙 Назад к точкам", callback_data="analytics_workers")
-    builder.adjust(2, 1)
+    nav_count = (offset + len(workers_stats) < total_count) + (offset > 0)
+    builder.adjust(*([nav_count] if nav_count else []), 1, 1)
 
     full_text = "\n".join(text_lines)
     try:
@@ -564,17 +570,10 @@ async def show_checklists_stats(callback: types.CallbackQuery) -> None:
         return
 
     builder = InlineKeyboardBuilder()
-    for shop in shops:
-        # Подсчитываем количество чек-листов для этой точки
-        checklists_count = 0
-        if shop == "Все точки":
-            checklists_count = len(await db.get_checklists_by_shop(None))
-        else:
-            checklists_count = len(await db.get_checklists_by_shop(shop))
-        
-        button_text = f"🏠 {shop} ({checklists_count})"
-        # Используем shop как callback_data, но для "Все точки" используем специальное значение
-        shop_callback = "shop_all" if shop == "Все точки" else f"shop_{shop}"
+    for shop_id, shop_name, checklists_count in shops:
+        button_text = f"🏠 {shop_name} ({checklists_count})"
+        # Для общих шаблонов используем специальное значение
+        shop_callback = "shop_all" if shop_id is None else f"shop_{shop_id}"
         builder.button(text=button_text, callback_data=shop_callback)
 
     builder.button(text="🔙 Назад", callback_data="analytics_back")
@@ -593,7 +592,7 @@ async def show_checklists_stats(callback: types.CallbackQuery) -> None:
             raise
 
 
-@router.callback_query(F.data.startswith("shop_"))
+@router.callback_query(F.data.regexp(r"^shop_(all|\d+)$"))
 async def show_checklists_by_shop(callback: types.CallbackQuery) -> None:
     user = await db.get_user(callback.from_user.id)
     if not user or user.role != "superadmin":
@@ -607,8 +606,9 @@ async def show_checklists_by_shop(callback: types.CallbackQuery) -> None:
         shop_id = None
         shop_name = "Все точки"
     else:
-        shop_id = shop_callback.replace("shop_", "", 1)
-        shop_name = shop_id
+        shop_id = int(shop_callback.replace("shop_", "", 1))
+        shop = await db.get_shop(shop_id)
+        shop_name = shop.name if shop else "—"
 
     checklists_stats = await db.get_checklists_by_shop(shop_id)
 
@@ -627,7 +627,7 @@ async def show_checklists_by_shop(callback: types.CallbackQuery) -> None:
         return
 
     # Сортируем по количеству использований (самые популярные сверху)
-    checklists_stats.sort(key=lambda x: x.get("reports_count", 0), reverse=True)
+    checklists_stats = sorted(checklists_stats, key=lambda x: x.get("reports_count", 0), reverse=True)
 
     text_lines = [f"📋 <b>Чек-листы точки: {shop_name}</b>", "➖➖➖➖➖➖➖➖➖➖"]
 
@@ -654,9 +654,7 @@ async def show_checklists_by_shop(callback: types.CallbackQuery) -> None:
             text_lines.append(f"   {score_icon} Средний балл: {avg_score}%")
 
         if last_use:
-            from datetime import datetime
-
-            now = datetime.now()
+            now = clock.now()
             delta = now - last_use
             if delta.days == 0:
                 hours = delta.seconds // 3600
@@ -727,10 +725,26 @@ async def show_network_overview(callback: types.CallbackQuery) -> None:
     avg_score = overview.get("avg_score", 0)
     score_icon = "🟢" if avg_score >= 90 else "🟡" if avg_score >= 75 else "🔴"
     text_lines.append(f"   {score_icon} Средний балл: {avg_score}%")
+    today = clock.today()
+    series = await db.get_score_series(
+        start=today - timedelta(days=today.weekday(), weeks=TREND_WEEKS - 1)
+    )
+    text_lines.append(f"   📉 {TREND_WEEKS} нед.: {score_series_line(series)}")
 
     shops_count = overview.get("shops_count", 0)
     text_lines.append(f"   🏠 Уникальных точек: {shops_count}")
 
+    distribution = await db.get_score_distribution()
+    if distribution["reports"]:
+        text_lines.append("")
+        text_lines.append("📊 <b>Разброс результатов (30 дней):</b>")
+        text_lines.append(
+            f"   Медиана: {distribution['median']:.0f}% · "
+            f"худшие 10%: ≤{distribution['p10']:.0f}% · "
+            f"лучшие 10%: ≥{distribution['p90']:.0f}%"
+        )
+        text_lines.append(f"   0% {sparkline(distribution['histogram'], low=0)} 100%")
+
     text_lines.append("\n" + "➖➖➖➖➖➖➖➖➖➖")
 
     try:
@@ -742,6 +756,115 @@ async def show_network_overview(callback: types.CallbackQuery) -> None:
             raise
 
 
+FAILURE_PERIODS = (7, 30, 90)
+
+
+@router.callback_query(F.data == "analytics_failures")
+async def show_failures_shops(callback: types.CallbackQuery) -> None:
+    user = await db.get_user(callback.from_user.id)
+    if not user or user.role != "superadmin":
+        await callback.answer("⛔️ Доступ запрещен.", show_alert=True)
+        return
+
+    builder = InlineKeyboardBuilder()
+    builder.button(text="🌍 Вся сеть", callback_data="fails_all_30")
+    for shop in await db.get_all_shops():
+        builder.button(text=f"🏠 {shop.name}", callback_data=f"fails_{shop.id}_30")
+    builder.button(text="🔙 Назад", callback_data="analytics_back")
+    builder.adjust(1)
+
+    try:
+        await callback.message.edit_text(
+            "❗ <b>Проблемные пункты</b>\n\n"
+            "Пункты чек-листов, которые чаще всего проваливают:\n"
+            "«Нет» в вопросах да/нет и низкие оценки по шкале.\n\n"
+            "👇 Выберите точку:",
+            reply_markup=builder.as_markup(),
+        )
+    except TelegramBadRequest as e:
+        if "message is not modified" in str(e).lower():
+            pass
+        else:
+            raise
+    await callback.answer()
+
+
+def _failure_trend(fail_rate: float, prev_fail_rate: float | None) -> str:
+    if prev_fail_rate is None:
+        return "🆕"
+    delta = round((fail_rate - prev_fail_rate) * 100)
+    if delta > 0:
+        return f"📈 +{delta} п.п."
+    if delta < 0:
+        return f"📉 {delta} п.п."
+    return "➡️"
+
+
+@router.callback_query(F.data.regexp(r"^fails_(all|\d+)_\d+$"))
+async def show_failures(callback: types.CallbackQuery) -> None:
+    user = await db.get_user(callback.from_user.id)
+    if not user or user.role != "superadmin":
+        await callback.answer("⛔️ Доступ запрещен.", show_alert=True)
+        return
+
+    _, shop_key, days_text = callback.data.split("_")
+    days = int(days_text)
+    if shop_key == "all":
+        shop_ids = None
+        shop_name = "Вся сеть"
+    else:
+        shop = await db.get_shop(int(shop_key))
+        if not shop:
+            await callback.answer("Точка не найдена.", show_alert=True)
+            return
+        shop_ids = [shop.id]
+        shop_name = shop.name
+
+    await callback.answer("⏳ Загрузка...")
+
+    end = clock.today() + timedelta(days=1)
+    # По всей сети - с разбивкой по точкам, по одной точке - по вопросу
+    rows = await db.get_question_failure_stats(
+        shop_ids, start=end - timedelta(days=days), end=end, by_shop=shop_ids is None
+    )
+
+    text_lines = [
+        f"❗ <b>Проблемные пункты: {shop_name}</b>",
+        f"📅 За {days} дн., тренд - к предыдущим {days} дн.",
+        "➖➖➖➖➖➖➖➖➖➖",
+    ]
+    if not rows:
+        text_lines.append("\n📉 За период недостаточно ответов.")
+    for i, row in enumerate(rows, 1):
+        text_lines.append(f"\n{i}. <b>{row['question']}</b>")
+        place = f"📋 {row['checklist']}"
+        if row["shop"]:
+            place += f" · 🏠 {row['shop']}"
+        text_lines.append(f"   {place}")
+        text_lines.append(
+            f"   ❌ Провалов: {row['fails']} из {row['answers']} "
+            f"({round(row['fail_rate'] * 100)}%) "
+            f"{_failure_trend(row['fail_rate'], row['prev_fail_rate'])}"
+        )
+        if row["avg_scale"] is not None:
+            text_lines.append(f"   📏 Средняя оценка: {row['avg_scale']:.1f}")
+
+    builder = InlineKeyboardBuilder()
+    for period in FAILURE_PERIODS:
+        label = f"✅ {period} дн." if period == days else f"{period} дн."
+        builder.button(text=label, callback_data=f"fails_{shop_key}_{period}")
+    builder.button(text="🔙 Назад к точкам", callback_data="analytics_failures")
+    builder.adjust(len(FAILURE_PERIODS), 1)
+
+    try:
+        await callback.message.edit_text("\n".join(text_lines), reply_markup=builder.as_markup())
+    except TelegramBadRequest as e:
+        if "message is not modified" in str(e).lower():
+            pass
+        else:
+            raise
+
+
 @router.message(F.text == "📊 Полный Отчет (Месяц)")
 async def superadmin_monthly_report(message: types.Message) -> None:
     user = await db.get_user(message.from_user.id)
@@ -763,38 +886,37 @@ async def superadmin_monthly_report(message: types.Message) -> None:
     await message.answer("\n".join(text_lines))
 
 
+def _admins_list_kb(admins: list[tuple[User, list[str]]]) -> InlineKeyboardMarkup:
+    """Список админов с первой точкой и числом остальных."""
+    builder = InlineKeyboardBuilder()
+    for admin, shops in admins:
+        shops_text = ", ".join(shops[:1]) if shops else "Нет точек"
+        if len(shops) > 1:
+            shops_text += f" (+{len(shops) - 1})"
+
+        builder.button(
+            text=f"👤 {admin.full_name} ({shops_text})",
+            callback_data=f"manage_admin_{admin.id}"
+        )
+    builder.adjust(1)
+    return builder.as_markup()
+
+
 @router.message(F.text == "👥 Управление админами")
 async def manage_admins_menu(message: types.Message) -> None:
     user = await db.get_user(message.from_user.id)
     if not user or user.role != "superadmin":
         return
 
-    admins = await db.get_all_admins()
+    admins = await db.get_admins_with_shops()
     if not admins:
         await message.answer("👥 <b>Список администраторов пуст.</b>")
         return
 
-    builder = InlineKeyboardBuilder()
-    for admin in admins:
-        # Check roles to ensure we don't list superadmins if get_all_admins includes them (it shouldn't based on query)
-        if admin.role == "superadmin":
-            continue
-            
-        shops = await db.get_admin_shops(admin.tg_id)
-        shops_text = ", ".join(shops[:1]) if shops else "Нет точек"
-        if len(shops) > 1:
-            shops_text += f" (+{len(shops) - 1})"
-        
-        builder.button(
-            text=f"👤 {admin.full_name} ({shops_text})",
-            callback_data=f"manage_admin_{admin.id}"
-        )
-    builder.adjust(1)
-    
     await message.answer(
         "👥 <b>Управление администраторами</b>\n\n"
         "👇 Выберите администратора для управления:",
-        reply_markup=builder.as_markup()
+        reply_markup=_admins_list_kb(admins)
     )
 
 
@@ -815,7 +937,7 @@ async def show_admin_manage_menu(callback: types.CallbackQuery) -> None:
         return
 
     shops = await db.get_admin_shops(admin.tg_id)
-    shops_text = ", ".join(shops) if shops else "Нет точек"
+    shops_text = ", ".join(shop.name for shop in shops) if shops else "Нет точек"
 
     text_lines = [
         f"👤 <b>{admin.full_name}</b>",
@@ -850,7 +972,7 @@ async def back_to_admins_list(callback: types.CallbackQuery) -> None:
         await callback.answer("⛔️ Доступ запрещен.", show_alert=True)
         return
 
-    admins = await db.get_all_admins()
+    admins = await db.get_admins_with_shops()
     if not admins:
         try:
             await callback.message.edit_text("👥 <b>Список администраторов пуст.</b>")
@@ -858,27 +980,11 @@ async def back_to_admins_list(callback: types.CallbackQuery) -> None:
             pass
         return
 
-    builder = InlineKeyboardBuilder()
-    for admin in admins:
-        if admin.role == "superadmin":
-            continue
-            
-        shops = await db.get_admin_shops(admin.tg_id)
-        shops_text = ", ".join(shops[:1]) if shops else "Нет точек"
-        if len(shops) > 1:
-            shops_text += f" (+{len(shops) - 1})"
-        
-        builder.button(
-            text=f"👤 {admin.full_name} ({shops_text})",
-            callback_data=f"manage_admin_{admin.id}"
-        )
-    builder.adjust(1)
-    
     try:
         await callback.message.edit_text(
             "👥 <b>Управление администраторами</b>\n\n"
             "👇 Выберите администратора для управления:",
-            reply_markup=builder.as_markup()
+            reply_markup=_admins_list_kb(admins)
         )
     except TelegramBadRequest as e:
         if "message is not modified" in str(e).lower():
@@ -1118,7 +1224,7 @@ async def set_manager_name(message: types.Message, state: FSMContext) -> None:
         tg_id=data["tg_id"],
         full_name=data["full_name"],
         role="admin",
-        shop_id="Управляющий",
+        shop_id=None,
         position="Управляющий",
     )
     await message.answer(
@@ -1201,12 +1307,12 @@ async def set_superadmin_name(message: types.Message, state: FSMContext) -> None
     data = await state.get_data()
     full_name = message.text
 
-    # shop_id and position are required by DB but irrelevant for superadmin
+    # position is required by DB but irrelevant for superadmin
     await db.add_user(
         tg_id=data["tg_id"],
         full_name=full_name,
         role="superadmin",
-        shop_id="GLOBAL",
+        shop_id=None,
         position="Superadmin",
     )
     await message.answer(
@@ -1217,3 +1323,106 @@ async def set_superadmin_name(message: types.Message, state: FSMContext) -> None
         )
     )
     await state.clear()
+
+
+@router.message(Command("cache_stats"))
+async def show_cache_stats(message: types.Message) -> None:
+    user = await db.get_user(message.from_user.id)
+    if not user or user.role != "superadmin":
+        return
+
+    text_lines = ["🗃 <b>Кэш аналитики</b>", "➖➖➖➖➖➖➖➖➖➖"]
+    for stats in cache_stats():
+        if not stats["hits"] and not stats["misses"]:
+            continue
+        hit_rate = f"{stats['hit_rate']:.0%}" if stats["hit_rate"] is not None else "—"
+        text_lines.append(f"\n<code>{stats['name']}</code>")
+        text_lines.append(
+            f"   попаданий {stats['hits']} / промахов {stats['misses']} ({hit_rate})"
+        )
+        text_lines.append(
+            f"   записей {stats['size']}/{stats['maxsize']}, "
+            f"вытеснено {stats['evictions']}, сбросов {stats['invalidations']}"
+        )
+    if len(text_lines) == 2:
+        text_lines.append("\nКэш еще не использовался.")
+    await message.answer("\n".join(text_lines))
+
+
+@router.message(Command("jobs"))
+async def show_jobs(message: types.Message) -> None:
+    user = await db.get_user(message.from_user.id)
+    if not user or user.role != "superadmin":
+        return
+
+    text_lines = ["⏱ <b>Фоновые задачи</b>", "➖➖➖➖➖➖➖➖➖➖"]
+    for job in scheduler.metrics():
+        status = "⏳ выполняется" if job["running"] else f"след. {job['next_run']:%d.%m %H:%M}"
+        text_lines.append(f"\n<code>{job['name']}</code> ({job['cron']}) — {status}")
+        if job["runs"]:
+            text_lines.append(
+                f"   запусков {job['runs']}, ошибок {job['failures']}, "
+                f"пропущено {job['skipped']}"
+            )
+            text_lines.append(
+                f"   последний {job['last_started_at']:%d.%m %H:%M}, "
+                f"{job['last_duration']:.1f} c (сред. {job['avg_duration']:.1f}, "
+                f"макс. {job['max_duration']:.1f})"
+            )
+        elif job["skipped"]:
+            text_lines.append(f"   пропущено {job['skipped']} (выполнял другой экземпляр)")
+        if job["last_error"]:
+            text_lines.append(f"   ❗ {html.escape(job['last_error'])}")
+    if len(text_lines) == 2:
+        text_lines.append("\nПланировщик не запущен.")
+    await message.answer("\n".join(text_lines))
+
+
+SHOP_TIME_USAGE = (
+    "Формат: <code>/shop_time ID пояс ЧЧ:ММ</code>, например "
+    "<code>/shop_time 3 Asia/Yekaterinburg 07:30</code>.\n"
+    "<code>/shop_time ID -</code> - вернуть значения по умолчанию."
+)
+
+
+@router.message(Command("shop_time"))
+async def shop_time(message: types.Message, command: CommandObject) -> None:
+    """Пояс и начало смены точек: без аргументов - список, с аргументами - изменить."""
+    user = await db.get_user(message.from_user.id)
+    if not user or user.role != "superadmin":
+        return
+
+    args = (command.args or "").split()
+    if not args:
+        text_lines = ["🕰 <b>Часовые пояса и смены</b>", "➖➖➖➖➖➖➖➖➖➖"]
+        for shop in await db.get_all_shops():
+            zone = shop.timezone or "по умолчанию"
+            start = f"{clock.shop_shift_start(shop):%H:%M}"
+            day = clock.business_day(shop)
+            text_lines.append(f"<code>{shop.id}</code> {shop.name}: {zone}, смена с {start} ({day:%d.%m})")
+        text_lines.append("")
+        text_lines.append(SHOP_TIME_USAGE)
+        await message.answer("\n".join(text_lines))
+        return
+
+    reset = len(args) == 2 and args[1] == "-"
+    if not args[0].isdigit() or not (reset or len(args) == 3):
+        await message.answer(SHOP_TIME_USAGE)
+        return
+    timezone, shift_start = None, None
+    if not reset:
+        timezone = args[1]
+        try:
+            shift_start = datetime.strptime(args[2], "%H:%M").time()
+        except ValueError:
+            await message.answer(SHOP_TIME_USAGE)
+            return
+    try:
+        updated = await db.update_shop_schedule(int(args[0]), timezone, shift_start)
+    except ValueError as e:
+        await message.answer(f"⚠️ {html.escape(str(e))}")
+        return
+    if not updated:
+        await message.answer("⚠️ Точка не найдена.")
+        return
+    await message.answer("✅ Настройки точки сохранены.")
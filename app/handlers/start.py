@@ -29,6 +29,8 @@ async def cmd_start(message: Message):
     if user.role == "superadmin":
         await message.answer("Вы вошли как Гендиректор.", reply_markup=kb.superadmin_kb)
     elif user.role == "admin":
-        await message.answer(f"Вы вошли как Управляющий.\nТочка: <b>{user.shop_id}</b>", reply_markup=kb.admin_kb)
+        shops = await db.get_admin_shops(tg_id)
+        shops_text = ", ".join(shop.name for shop in shops) or "Нет точек"
+        await message.answer(f"Вы вошли как Управляющий.\nТочка: <b>{shops_text}</b>", reply_markup=kb.admin_kb)
     elif user.role == "worker":
-        await message.answer(f"💼 Работаем.\n🏠 Точка: <b>{user.shop_id}</b>", reply_markup=kb.worker_kb)
\ No newline at end of file
+        await message.answer(f"💼 Работаем.\n🏠 Точка: <b>{user.shop_name}</b>", reply_markup=kb.worker_kb)
\ No newline at end of file
@@ -73,15 +73,25 @@ async def ignore_callback(callback: types.CallbackQuery):
 @router.callback_query(F.data.startswith("start_"))
 async def start_pass(callback: types.CallbackQuery, state: FSMContext):
     checklist_id = int(callback.data.split("_")[1])
-    report_id = await db.create_report(callback.from_user.id, checklist_id)
+    # Кнопка могла остаться от списка, показанного до удаления шаблона
+    if not await db.get_checklist(checklist_id):
+        await callback.answer("Этот чек-лист больше недоступен.", show_alert=True)
+        return
     questions = await db.get_questions(checklist_id)
     
     if not questions:
         await callback.message.answer("⚠️ В этом чек-листе пока нет вопросов.")
         return
 
-    # Очищаем все старые данные
-    await state.update_data(report_id=report_id, questions=questions, current_index=0, temp_answer=None)
+    # Очищаем все старые данные. Отчет создается с первым ответом (save_step):
+    # открыть чек-лист и уйти - не повод писать в БД
+    await state.update_data(
+        checklist_id=checklist_id,
+        report_id=None,
+        questions=questions,
+        current_index=0,
+        temp_answer=None,
+    )
     await state.set_state(PassChecklist.answering)
     
     await callback.message.edit_text("🚀 <b>Проверка началась!</b>\nОтвечайте честно. Поехали!")
@@ -140,9 +150,14 @@ async def save_step(message_or_callback, state, answer_text, photo_id=None):
     # text вопросы дают 0 баллов
     # ---------------------
 
-    await db.save_answer_with_points(data['report_id'], question.id, answer_text, photo_id, points)
+    report_id = data['report_id']
+    if report_id is None:
+        report_id = await db.create_report(message_or_callback.from_user.id, data['checklist_id'])
+    await db.save_answer_with_points(report_id, question.id, answer_text, photo_id, points)
     
-    await state.update_data(temp_answer=None, current_index=data['current_index'] + 1)
+    await state.update_data(
+        report_id=report_id, temp_answer=None, current_index=data['current_index'] + 1
+    )
     
     # Если это был callback
     if isinstance(message_or_callback, types.CallbackQuery):
@@ -0,0 +1,9 @@
+"""Фоновые задачи бота (обслуживание БД).
+
+- `app.jobs.scheduler` - планировщик с арендой задач в БД, `app.jobs.schedule` - расписание.
+- `app.jobs.reminders` - напоминания сотрудникам о не пройденных чек-листах.
+- `app.jobs.partitions` - месячные партиции reports/answers на Postgres.
+- `app.jobs.archive` - вынос старых ответов в сжатые файлы.
+- `app.jobs.purge` - физическое удаление мягко удаленных шаблонов (по расписанию или вручную).
+- `app.jobs.repair` - пересчет денормализованных полей (запуск вручную).
+"""
@@ -0,0 +1,211 @@
+"""Вынос старых ответов из БД в сжатые месячные файлы.
+
+Ответы отчетов старше `settings.archive_after_months` месяцев переносятся из
+`answers` в `<archive_dir>/answers_YYYY_MM.ndjson.gz` (JSON-строка на ответ).
+Сам отчет с score_percent остается в БД с пометкой `answers_archived`,
+`get_report_details` и выгрузка читают такие ответы из файла. При удалении
+шаблона (`purge_checklist`) ответы его отчетов вычищаются и из файлов.
+
+Каталог архива должен быть общим для всех экземпляров бота (один том в
+docker-compose.yml): задачу выполняет любой из них, а читает архив каждый.
+Файла месяца нет - FileNotFoundError, а не пустой список ответов.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import logging
+import os
+from collections import defaultdict
+from datetime import date, datetime
+from pathlib import Path
+
+from sqlalchemy import delete, select, update
+
+from config import settings
+
+from app import clock
+from app.db import async_session
+from app.models import Answer, Question, Report
+
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_BATCH = 500
+
+# Дописывание и перезапись одного файла не должны пересекаться
+_files_lock = asyncio.Lock()
+
+
+def _month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def archive_path(month: date) -> Path:
+    return Path(settings.archive_dir) / f"answers_{month:%Y_%m}.ndjson.gz"
+
+
+def archive_cutoff(months: int | None = None, today: date | None = None) -> datetime:
+    """Начало месяца, отстоящего на months от текущего: всё раньше - в архив."""
+    if months is None:
+        months = settings.archive_after_months
+    month = _month_start(today or clock.today())
+    index = month.year * 12 + month.month - 1 - months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def _append_lines(by_month: dict[date, list[str]]) -> None:
+    # Каждый вызов дописывает отдельный gzip-member; gzip читает их подряд.
+    # fsync до коммита удаления: потерять ответы хуже, чем записать их дважды.
+    for month, lines in by_month.items():
+        path = archive_path(month)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "ab") as raw:
+            if lines:
+                with gzip.GzipFile(fileobj=raw, mode="ab") as gz:
+                    gz.write(("\n".join(lines) + "\n").encode("utf-8"))
+            raw.flush()
+            os.fsync(raw.fileno())
+
+
+def _month_file(month: date) -> Path:
+    path = archive_path(month)
+    if not path.exists():
+        raise FileNotFoundError(
+            f"Нет архива ответов {path}; archive_dir должен быть общим для всех экземпляров бота"
+        )
+    return path
+
+
+def _read_month(month: date, report_ids: set[int]) -> dict[int, list[dict]]:
+    path = _month_file(month)
+    found: dict[int, dict[int, dict]] = defaultdict(dict)
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            if record["report_id"] in report_ids:
+                # По id: после сбоя между записью и коммитом ответ мог попасть дважды
+                found[record["report_id"]][record["id"]] = record
+    return {
+        report_id: sorted(records.values(), key=lambda r: r["id"])
+        for report_id, records in found.items()
+    }
+
+
+def _drop_from_month(month: date, report_ids: set[int]) -> int:
+    # Перезапись во временный файл и rename: при сбое остается старый файл целиком
+    path = _month_file(month)
+    tmp = path.with_name(path.name + ".tmp")
+    removed = 0
+    with gzip.open(path, "rt", encoding="utf-8") as src, open(tmp, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb") as gz:
+            for line in src:
+                if json.loads(line)["report_id"] in report_ids:
+                    removed += 1
+                else:
+                    gz.write(line.encode("utf-8"))
+        raw.flush()
+        os.fsync(raw.fileno())
+    if removed:
+        os.replace(tmp, path)
+    else:
+        tmp.unlink()
+    return removed
+
+
+def _by_month(reports: list[Report]) -> dict[date, set[int]]:
+    by_month: dict[date, set[int]] = defaultdict(set)
+    for report in reports:
+        by_month[_month_start(report.created_at)].add(report.id)
+    return by_month
+
+
+async def delete_archived_answers(reports: list[Report]) -> int:
+    """Удалить из архива ответы отчетов; файл месяца перезаписывается один раз.
+
+    Возвращает число удаленных ответов.
+    """
+    removed = 0
+    async with _files_lock:
+        for month, report_ids in _by_month(reports).items():
+            removed += await asyncio.to_thread(_drop_from_month, month, report_ids)
+    return removed
+
+
+async def load_archived_answers(reports: list[Report]) -> dict[int, list[dict]]:
+    """Ответы из архива для отчетов: {report_id: [запись, ...]}; один проход на месяц."""
+    result: dict[int, list[dict]] = {}
+    for month, report_ids in _by_month(reports).items():
+        result.update(await asyncio.to_thread(_read_month, month, report_ids))
+    return result
+
+
+async def archive_old_answers(
+    months: int | None = None, today: date | None = None, batch_size: int = ARCHIVE_BATCH
+) -> int:
+    """Вынести в архив ответы отчетов старше months месяцев. Возвращает число отчетов.
+
+    Отчеты in_progress не трогаются: их вынесет запуск после того, как
+    abandon_stale_reports пометит их брошенными.
+    """
+    cutoff = archive_cutoff(months, today)
+    archived = 0
+    while True:
+        async with async_session() as session:
+            reports = (
+                await session.execute(
+                    select(Report.id, Report.created_at)
+                    .where(Report.created_at < cutoff)
+                    .where(Report.answers_archived == False)
+                    # Незавершенный отчет еще дописывается (save_answer_with_points)
+                    .where(Report.status != "in_progress")
+                    .order_by(Report.created_at, Report.id)
+                    .limit(batch_size)
+                )
+            ).all()
+            if not reports:
+                return archived
+
+            report_ids = [r.id for r in reports]
+            rows = await session.execute(
+                select(Answer, Question.text)
+                .outerjoin(Question, Question.id == Answer.question_id)
+                .where(Answer.report_id.in_(report_ids))
+                .where(Answer.created_at < cutoff)
+                .order_by(Answer.report_id, Answer.id)
+            )
+            # Файл месяца создается, даже если у его отчетов нет ответов:
+            # по отсутствию файла чтение узнает, что архив недоступен
+            by_month: dict[date, list[str]] = {_month_start(r.created_at): [] for r in reports}
+            for answer, question_text in rows:
+                by_month[_month_start(answer.created_at)].append(
+                    json.dumps(
+                        {
+                            "id": answer.id,
+                            "report_id": answer.report_id,
+                            "question_id": answer.question_id,
+                            "question": question_text,
+                            "answer_text": answer.answer_text,
+                            "photo_id": answer.photo_id,
+                            "points": answer.points,
+                            "created_at": answer.created_at.isoformat(),
+                        },
+                        ensure_ascii=False,
+                    )
+                )
+            async with _files_lock:
+                await asyncio.to_thread(_append_lines, by_month)
+
+            await session.execute(
+                delete(Answer)
+                .where(Answer.report_id.in_(report_ids))
+                .where(Answer.created_at < cutoff)
+            )
+            await session.execute(
+                update(Report).where(Report.id.in_(report_ids)).values(answers_archived=True)
+            )
+            await session.commit()
+            archived += len(report_ids)
+
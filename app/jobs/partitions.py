@@ -0,0 +1,141 @@
+"""Месячные партиции `reports` и `answers` на Postgres.
+
+Таблицы секционируются миграцией `b8e2a5c3d7f9`; здесь партиции досоздаются
+впрок, чтобы вставки нового месяца не падали в DEFAULT-партицию
+(бот делает это по расписанию, см. `app.jobs.schedule`). Если месяц все же
+пропущен, его строки переносятся из DEFAULT в новую партицию.
+На SQLite и на несекционированных таблицах ничего не делает.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import date
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app import clock
+
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_TABLES = ("reports", "answers")
+MONTHS_AHEAD = 3
+
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month:%Y}m{month:%m}"
+
+
+async def _create_month(conn: AsyncConnection, tables: list[str], start: date) -> list[str]:
+    """Создать недостающие партиции месяца start; строки месяца из DEFAULT - в них."""
+    end = _add_months(start, 1)
+    missing = [
+        table
+        for table in tables
+        if not await conn.scalar(
+            text("SELECT to_regclass(:name)"), {"name": partition_name(table, start)}
+        )
+    ]
+    if not missing:
+        return []
+
+    # Пока партиции не было, строки месяца ложились в DEFAULT, и с ними
+    # CREATE ... PARTITION OF падает. Выносим их во временную таблицу и
+    # возвращаем после создания. Ответы ссылаются на отчеты (report_id,
+    # created_at), поэтому выносятся первыми, а возвращаются последними.
+    in_month = f"created_at >= '{start}' AND created_at < '{end}'"
+    moved: list[str] = []
+    for table in reversed(tables):
+        default = f"{table}_default"
+        if not await conn.scalar(text("SELECT to_regclass(:name)"), {"name": default}):
+            continue
+        await conn.execute(text(f"LOCK TABLE {default} IN EXCLUSIVE MODE"))
+        has_rows = await conn.scalar(
+            text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {in_month})")
+        )
+        if not has_rows:
+            continue
+        await conn.execute(
+            text(
+                f"CREATE TEMP TABLE moved_{table} ON COMMIT DROP AS "
+                f"SELECT * FROM {default} WHERE {in_month}"
+            )
+        )
+        await conn.execute(text(f"DELETE FROM {default} WHERE {in_month}"))
+        moved.append(table)
+
+    for table in missing:
+        await conn.execute(
+            text(
+                f"CREATE TABLE {partition_name(table, start)} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{start}') TO ('{end}')"
+            )
+        )
+
+    for table in reversed(moved):
+        columns = ", ".join(
+            (
+                await conn.execute(
+                    text(
+                        "SELECT column_name FROM information_schema.columns "
+                        "WHERE table_name = :table AND table_schema = current_schema()"
+                    ),
+                    {"table": table},
+                )
+            ).scalars()
+        )
+        result = await conn.execute(
+            text(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM moved_{table}")
+        )
+        logger.warning(
+            "%s: %s строк за %s перенесено из DEFAULT-партиции",
+            table,
+            result.rowcount,
+            f"{start:%m.%Y}",
+        )
+    return [partition_name(table, start) for table in missing]
+
+
+async def ensure_partitions(
+    engine: AsyncEngine, months_ahead: int = MONTHS_AHEAD, today: date | None = None
+) -> list[str]:
+    """Создать партиции с текущего месяца на months_ahead вперед. Возвращает новые.
+
+    Каждый месяц - отдельная транзакция: сбой одного не мешает остальным.
+    """
+    if engine.dialect.name != "postgresql":
+        return []
+
+    async with engine.connect() as conn:
+        partitioned = set(
+            (
+                await conn.execute(
+                    text(
+                        "SELECT c.relname FROM pg_partitioned_table p "
+                        "JOIN pg_class c ON c.oid = p.partrelid"
+                    )
+                )
+            ).scalars()
+        )
+    tables = [table for table in PARTITIONED_TABLES if table in partitioned]
+    if not tables:
+        return []
+
+    month = (today or clock.today()).replace(day=1)
+    created: list[str] = []
+    for i in range(months_ahead + 1):
+        start = _add_months(month, i)
+        try:
+            async with engine.begin() as conn:
+                created.extend(await _create_month(conn, tables, start))
+        except SQLAlchemyError:
+            logger.exception("Не удалось создать партиции за %s", f"{start:%m.%Y}")
+    return created
@@ -0,0 +1,71 @@
+"""Физическое удаление мягко удаленных шаблонов вместе с их историей.
+
+Бот запускает очистку по расписанию (`app.jobs.schedule`); вручную:
+
+    python -m app.jobs.purge [--days N]
+
+Удаляет шаблоны, помеченные удаленными больше N дней назад
+(по умолчанию `settings.checklist_purge_after_days`).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+from datetime import timedelta
+
+from sqlalchemy import select
+
+from config import settings
+
+from app import clock
+from app.crud import purge_checklist
+from app.db import async_session
+from app.models import Checklist
+
+
+logger = logging.getLogger(__name__)
+
+
+async def purge_deleted_checklists(days: int | None = None) -> int:
+    """Удалить шаблоны, помеченные удаленными больше days дней назад. Возвращает их число."""
+    if days is None:
+        days = settings.checklist_purge_after_days
+    before = clock.now() - timedelta(days=days)
+
+    async with async_session() as session:
+        result = await session.execute(
+            select(Checklist.id, Checklist.title)
+            .where(Checklist.is_deleted == True)
+            .where(Checklist.deleted_at <= before)
+            .order_by(Checklist.deleted_at)
+        )
+        tombstones = result.all()
+
+    for checklist_id, title in tombstones:
+
+        async def on_progress(deleted: int, total: int) -> None:
+            logger.info("«%s»: удалено отчетов %s из %s", title, deleted, total)
+
+        reports = await purge_checklist(checklist_id, on_progress=on_progress)
+        logger.info("Шаблон «%s» удален, отчетов: %s", title, reports)
+    return len(tombstones)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=None,
+        help="Удалять шаблоны, помеченные удаленными больше N дней назад.",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    purged = asyncio.run(purge_deleted_checklists(args.days))
+    logger.info("Удалено шаблонов: %s", purged)
+
+
+if __name__ == "__main__":
+    main()
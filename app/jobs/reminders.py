@@ -0,0 +1,125 @@
+"""Напоминания сотрудникам о не пройденных сегодня чек-листах.
+
+Точка получает напоминание через `settings.reminder_after_shift` после
+начала своей смены (пояс и смена точки, см. `app.clock`), то есть всегда
+про уже начавшийся рабочий день. Задача запускается каждые
+`REMINDER_STEP_MINUTES` минут и берет точки, чье время напоминания попало
+в прошедший шаг; запуск, пропущенный целиком (бот не работал), не
+наверстывается. Кому напомнить, считает один запрос
+(`get_pending_checklists_today`), а сообщения уходят пачками не быстрее
+`SEND_RATE` в секунду - под лимит Telegram на рассылку.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError, TelegramForbiddenError, TelegramRetryAfter
+
+from config import settings
+
+from app import clock
+from app import crud as db
+from app import keyboards as kb
+
+
+logger = logging.getLogger(__name__)
+
+# Telegram пропускает около 30 сообщений в секунду от бота
+SEND_RATE = 25
+SEND_ATTEMPTS = 3
+# Шаг запуска задачи; время напоминания точки округляется до него вверх
+REMINDER_STEP_MINUTES = 15
+
+
+async def _send(bot: Bot, chat_id: int, text: str, **kwargs) -> bool:
+    for _ in range(SEND_ATTEMPTS):
+        try:
+            await bot.send_message(chat_id, text, **kwargs)
+            return True
+        except TelegramRetryAfter as e:
+            await asyncio.sleep(e.retry_after)
+        except TelegramForbiddenError:
+            # Бот заблокирован или чат удален - повтор не поможет
+            return False
+        except TelegramAPIError:
+            logger.exception("Не удалось отправить сообщение в чат %s", chat_id)
+            return False
+    return False
+
+
+async def send_batch(
+    bot: Bot, messages: Sequence[tuple[int, str]], rate: int = SEND_RATE, **kwargs
+) -> tuple[int, int]:
+    """Разослать (chat_id, текст) пачками по rate в секунду. Возвращает (отправлено, нет)."""
+    loop = asyncio.get_running_loop()
+    sent = 0
+    for i in range(0, len(messages), rate):
+        started = loop.time()
+        results = await asyncio.gather(
+            *(_send(bot, chat_id, text, **kwargs) for chat_id, text in messages[i : i + rate])
+        )
+        sent += sum(results)
+        delay = 1 - (loop.time() - started)
+        if delay > 0 and i + rate < len(messages):
+            await asyncio.sleep(delay)
+    return sent, len(messages) - sent
+
+
+def reminder_text(titles: list[str]) -> str:
+    lines = "\n".join(f"• {title}" for title in titles)
+    return (
+        "⏰ <b>Напоминание</b>\n\n"
+        f"Сегодня еще не пройдены чек-листы:\n{lines}\n\n"
+        "Нажмите «✅ Пройти чек-лист»."
+    )
+
+
+def reminder_delay() -> timedelta | None:
+    """settings.reminder_after_shift как timedelta; None - напоминания выключены."""
+    if not settings.reminder_after_shift:
+        return None
+    value = datetime.strptime(settings.reminder_after_shift, "%H:%M")
+    return timedelta(hours=value.hour, minutes=value.minute)
+
+
+async def due_shops(until: datetime, delay: timedelta) -> list[int | None]:
+    """Точки, чье время напоминания попало в последний шаг до until (None - без точки).
+
+    until - время хранения, округляется вниз до шага; берется (until - шаг, until].
+    """
+    step = timedelta(minutes=REMINDER_STEP_MINUTES)
+    slot_end = until.replace(second=0, microsecond=0) - timedelta(
+        minutes=until.minute % REMINDER_STEP_MINUTES
+    )
+    moment = clock.from_storage(until)
+
+    def is_due(shop) -> bool:
+        start, _ = clock.day_bounds(shop, clock.business_day(shop, moment))
+        return slot_end - step < start + delay <= slot_end
+
+    due: list[int | None] = [shop.id for shop in await db.get_all_shops() if is_due(shop)]
+    if is_due(None):
+        # Сотрудники без точки живут по настройкам по умолчанию
+        due.append(None)
+    return due
+
+
+async def send_reminders(bot: Bot, until: datetime | None = None) -> int:
+    """Напомнить сотрудникам точек, у которых подошло время. Возвращает число отправленных."""
+    delay = reminder_delay()
+    if delay is None:
+        return 0
+    shop_ids = await due_shops(until or clock.now(), delay)
+    if not shop_ids:
+        return 0
+    pending = await db.get_pending_checklists_today(shop_ids)
+    messages = [(tg_id, reminder_text(titles)) for tg_id, _, titles in pending]
+    sent, failed = await send_batch(bot, messages, reply_markup=kb.worker_kb)
+    if messages:
+        logger.info("Напоминания: отправлено %s, не доставлено %s", sent, failed)
+    return sent
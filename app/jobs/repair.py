@@ -0,0 +1,60 @@
+"""Пересчет денормализованных данных из исходных таблиц.
+
+Запускается вручную, например после правок БД в обход бота:
+
+    python -m app.jobs.repair [max-points] [scores] [daily-stats] [question-stats]
+
+Без аргументов пересчитывает всё; порядок важен - итоги точек
+считаются по уже пересчитанным процентам.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+
+from app.crud import (
+    rebuild_checklist_max_points,
+    rebuild_question_daily_stats,
+    rebuild_report_scores,
+    rebuild_shop_daily_stats,
+)
+
+
+logger = logging.getLogger(__name__)
+
+REPAIRS = {
+    # Checklist.max_points по неудаленным вопросам
+    "max-points": rebuild_checklist_max_points,
+    # Report.score_percent из снимка баллов отчета
+    "scores": rebuild_report_scores,
+    # Дневные итоги точек shop_daily_stats по отчетам
+    "daily-stats": rebuild_shop_daily_stats,
+    # Дневные итоги вопросов question_daily_stats по ответам в БД;
+    # дни, ответы которых вынесены в архив, не трогаются
+    "question-stats": rebuild_question_daily_stats,
+}
+
+
+async def repair(names: list[str]) -> None:
+    for name in [name for name in REPAIRS if name in names]:
+        await REPAIRS[name]()
+        logger.info("Пересчитано: %s", name)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "names", nargs="*", metavar="name", help=f"Что пересчитать: {', '.join(REPAIRS)}."
+    )
+    args = parser.parse_args()
+    unknown = [name for name in args.names if name not in REPAIRS]
+    if unknown:
+        parser.error(f"неизвестно: {', '.join(unknown)}")
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(repair(args.names or list(REPAIRS)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Расписание фоновых задач бота.
+
+Время - в поясе хранения (`settings.timezone`, см. `app.clock`). Ночные задачи разнесены по времени и
+сдвигаются на случайную задержку, чтобы не нагружать БД одновременно.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+from functools import partial
+
+from aiogram import Bot
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from config import settings
+
+from app import clock
+from app import crud as db
+from app.jobs.archive import archive_old_answers
+from app.jobs.partitions import ensure_partitions
+from app.jobs.purge import purge_deleted_checklists
+from app.jobs.reminders import REMINDER_STEP_MINUTES, send_reminders
+from app.jobs.scheduler import Scheduler
+
+
+logger = logging.getLogger(__name__)
+
+# Сколько прошедших дней сверять в дневных итогах
+ROLLUP_REFRESH_DAYS = 3
+NIGHTLY_JITTER = 10 * 60
+
+
+async def create_partitions(engine: AsyncEngine) -> None:
+    created = await ensure_partitions(engine)
+    if created:
+        logger.info("Созданы партиции: %s", ", ".join(created))
+
+
+async def archive_answers() -> None:
+    archived = await archive_old_answers()
+    if archived:
+        logger.info("Ответы %s отчетов вынесены в архив", archived)
+
+
+async def purge_checklists() -> None:
+    purged = await purge_deleted_checklists()
+    if purged:
+        logger.info("Удалено шаблонов: %s", purged)
+
+
+async def abandon_reports() -> None:
+    abandoned = await db.abandon_stale_reports()
+    if abandoned:
+        logger.info("Брошенных отчетов: %s", abandoned)
+
+
+async def refresh_rollups(days: int = ROLLUP_REFRESH_DAYS) -> None:
+    """Сверить дневные итоги за последние days дней с отчетами.
+
+    Текущий день не трогаем: его итоги обновляются на лету.
+    """
+    today = clock.today()
+    start = today - timedelta(days=days)
+    await db.rebuild_shop_daily_stats(start, today)
+    await db.rebuild_question_daily_stats(start, today)
+
+
+def register_jobs(scheduler: Scheduler, engine: AsyncEngine, bot: Bot) -> None:
+    scheduler.add_job(
+        "partitions", "15 0 * * *", partial(create_partitions, engine), run_at_start=True
+    )
+    scheduler.add_job("archive", "30 2 * * *", archive_answers, jitter=NIGHTLY_JITTER)
+    scheduler.add_job("purge", "0 3 * * *", purge_checklists, jitter=NIGHTLY_JITTER)
+    scheduler.add_job("abandoned_reports", "5 * * * *", abandon_reports, jitter=60)
+    scheduler.add_job("rollups", "30 3 * * *", refresh_rollups, jitter=NIGHTLY_JITTER)
+    if settings.reminder_after_shift:
+        scheduler.add_job(
+            "reminders", f"*/{REMINDER_STEP_MINUTES} * * * *", partial(send_reminders, bot)
+        )
@@ -0,0 +1,312 @@
+"""Планировщик фоновых задач внутри процесса бота.
+
+Задача запускается по cron-выражению (минута час день месяц день_недели,
+время в поясе хранения, см. `app.clock`) со случайной задержкой до `jitter` секунд, чтобы экземпляры
+бота не били в БД одновременно. Одна задача не выполняется дважды
+одновременно: в процессе это проверяет флаг, между экземплярами - аренда
+в таблице `job_leases`. Пока задача идет, аренда продлевается; если
+экземпляр упал, ее через `lease_ttl` секунд подхватит другой.
+Длительности и исходы запусков - `Scheduler.metrics()`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import socket
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy import or_, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app import clock
+from app.db import async_session
+from app.models import JobLease
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEASE_TTL = 10 * 60
+# Дальше не ищем: такое выражение (например, 31 февраля) не сработает никогда
+CRON_SEARCH_YEARS = 8
+
+
+def _parse_field(spec: str, low: int, high: int) -> frozenset[int]:
+    values: set[int] = set()
+    for part in spec.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = int(step_text)
+            if step < 1:
+                raise ValueError(f"Шаг должен быть положительным: {spec}")
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start_text, end_text = part.split("-", 1)
+            start, end = int(start_text), int(end_text)
+        else:
+            start = int(part)
+            # "5/15" - с 5 до конца диапазона с шагом 15
+            end = high if step > 1 else start
+        if not low <= start <= end <= high:
+            raise ValueError(f"Значение вне диапазона {low}-{high}: {spec}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class CronSchedule:
+    """Cron-выражение из пяти полей: *, числа, списки, диапазоны и шаги."""
+
+    def __init__(self, expr: str) -> None:
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"Ожидается 5 полей cron: {expr!r}")
+        self.expr = expr
+        self.minutes = _parse_field(fields[0], 0, 59)
+        self.hours = _parse_field(fields[1], 0, 23)
+        self.days = _parse_field(fields[2], 1, 31)
+        self.months = _parse_field(fields[3], 1, 12)
+        # 0 и 7 - воскресенье, как в cron
+        self.weekdays = frozenset(day % 7 for day in _parse_field(fields[4], 0, 7))
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def _day_matches(self, day: date) -> bool:
+        day_ok = day.day in self.days
+        weekday_ok = (day.weekday() + 1) % 7 in self.weekdays
+        if self._any_day and self._any_weekday:
+            return True
+        if self._any_day:
+            return weekday_ok
+        if self._any_weekday:
+            return day_ok
+        # Как в cron: если заданы оба поля, достаточно любого
+        return day_ok or weekday_ok
+
+    def next_after(self, moment: datetime) -> datetime:
+        """Ближайший момент срабатывания строго после moment."""
+        current = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = current.replace(year=current.year + CRON_SEARCH_YEARS, day=1)
+        while current < limit:
+            if current.month not in self.months:
+                month_start = current.replace(day=1, hour=0, minute=0)
+                current = (month_start + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(current.date()):
+                current = (current + timedelta(days=1)).replace(hour=0, minute=0)
+            elif current.hour not in self.hours:
+                current = (current + timedelta(hours=1)).replace(minute=0)
+            elif current.minute not in self.minutes:
+                current += timedelta(minutes=1)
+            else:
+                return current
+        raise ValueError(f"Cron-выражение никогда не срабатывает: {self.expr!r}")
+
+
+@dataclass
+class JobStats:
+    runs: int = 0
+    failures: int = 0
+    # Пропуски: задача еще шла здесь или ее держит другой экземпляр
+    skipped: int = 0
+    last_started_at: datetime | None = None
+    last_duration: float | None = None
+    total_duration: float = 0.0
+    max_duration: float = 0.0
+    last_error: str | None = None
+
+
+@dataclass
+class Job:
+    name: str
+    schedule: CronSchedule
+    func: Callable[[], Awaitable[Any]]
+    jitter: float = 0
+    lease_ttl: float = DEFAULT_LEASE_TTL
+    run_at_start: bool = False
+    stats: JobStats = field(default_factory=JobStats)
+    running: bool = False
+
+
+async def _acquire_lease(name: str, owner: str, ttl: float) -> bool:
+    now = clock.now()
+    values = {"owner": owner, "expires_at": now + timedelta(seconds=ttl), "last_started_at": now}
+    async with async_session() as session:
+        dialect = postgresql if session.bind.dialect.name == "postgresql" else sqlite
+        inserted = await session.execute(
+            dialect.insert(JobLease)
+            .values(name=name, **values)
+            .on_conflict_do_nothing(index_elements=[JobLease.name])
+        )
+        if inserted.rowcount != 1:
+            taken = await session.execute(
+                update(JobLease)
+                .where(JobLease.name == name)
+                .where(or_(JobLease.expires_at <= now, JobLease.owner == owner))
+                .values(**values)
+            )
+            if taken.rowcount != 1:
+                return False
+        await session.commit()
+        return True
+
+
+async def _extend_lease(name: str, owner: str, ttl: float) -> bool:
+    async with async_session() as session:
+        result = await session.execute(
+            update(JobLease)
+            .where(JobLease.name == name)
+            .where(JobLease.owner == owner)
+            .values(expires_at=clock.now() + timedelta(seconds=ttl))
+        )
+        await session.commit()
+        return result.rowcount == 1
+
+
+async def _release_lease(name: str, owner: str, duration: float, error: str | None) -> None:
+    now = clock.now()
+    async with async_session() as session:
+        await session.execute(
+            update(JobLease)
+            .where(JobLease.name == name)
+            .where(JobLease.owner == owner)
+            .values(
+                owner=None,
+                expires_at=now,
+                last_finished_at=now,
+                last_duration=duration,
+                last_error=error,
+            )
+        )
+        await session.commit()
+
+
+class Scheduler:
+    def __init__(self, owner: str | None = None) -> None:
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:6]}"
+        self.jobs: dict[str, Job] = {}
+
+    def add_job(
+        self,
+        name: str,
+        cron: str,
+        func: Callable[[], Awaitable[Any]],
+        *,
+        jitter: float = 0,
+        lease_ttl: float = DEFAULT_LEASE_TTL,
+        run_at_start: bool = False,
+    ) -> Job:
+        if name in self.jobs:
+            raise ValueError(f"Задача {name} уже зарегистрирована")
+        job = Job(name, CronSchedule(cron), func, jitter, lease_ttl, run_at_start)
+        self.jobs[name] = job
+        return job
+
+    async def run(self) -> None:
+        """Крутить все задачи до отмены."""
+        tasks = [
+            asyncio.create_task(self._loop(job), name=f"job:{job.name}")
+            for job in self.jobs.values()
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _loop(self, job: Job) -> None:
+        if job.run_at_start:
+            await self.run_job(job.name)
+        while True:
+            now = clock.now()
+            delay = (job.schedule.next_after(now) - now).total_seconds()
+            await asyncio.sleep(delay + random.uniform(0, job.jitter))
+            await self.run_job(job.name)
+
+    async def _heartbeat(self, job: Job) -> None:
+        while True:
+            await asyncio.sleep(job.lease_ttl / 3)
+            try:
+                if not await _extend_lease(job.name, self.owner, job.lease_ttl):
+                    logger.warning("Задача %s: аренда потеряна, ее может запустить другой экземпляр", job.name)
+            except Exception:
+                logger.exception("Задача %s: не удалось продлить аренду", job.name)
+
+    async def run_job(self, name: str) -> bool:
+        """Выполнить задачу сейчас. False - пропущена (уже идет) или упала."""
+        job = self.jobs[name]
+        if job.running:
+            job.stats.skipped += 1
+            logger.info("Задача %s еще выполняется, запуск пропущен", name)
+            return False
+        job.running = True
+        try:
+            try:
+                acquired = await _acquire_lease(name, self.owner, job.lease_ttl)
+            except Exception:
+                logger.exception("Задача %s: не удалось взять аренду", name)
+                acquired = False
+            if not acquired:
+                job.stats.skipped += 1
+                return False
+
+            job.stats.last_started_at = clock.now()
+            heartbeat = asyncio.create_task(self._heartbeat(job))
+            started = time.monotonic()
+            error = None
+            try:
+                await job.func()
+            except Exception as exc:
+                error = repr(exc)[:255]
+                logger.exception("Задача %s завершилась ошибкой", name)
+            finally:
+                heartbeat.cancel()
+                duration = time.monotonic() - started
+                stats = job.stats
+                stats.runs += 1
+                stats.failures += error is not None
+                stats.last_duration = duration
+                stats.total_duration += duration
+                stats.max_duration = max(stats.max_duration, duration)
+                stats.last_error = error
+                logger.info("Задача %s: %.2f c", name, duration)
+                try:
+                    await _release_lease(name, self.owner, duration, error)
+                except Exception:
+                    logger.exception("Задача %s: не удалось освободить аренду", name)
+            return error is None
+        finally:
+            job.running = False
+
+    def metrics(self) -> list[dict]:
+        now = clock.now()
+        result = []
+        for job in self.jobs.values():
+            stats = job.stats
+            result.append(
+                {
+                    "name": job.name,
+                    "cron": job.schedule.expr,
+                    "next_run": job.schedule.next_after(now),
+                    "running": job.running,
+                    "runs": stats.runs,
+                    "failures": stats.failures,
+                    "skipped": stats.skipped,
+                    "last_started_at": stats.last_started_at,
+                    "last_duration": stats.last_duration,
+                    "avg_duration": stats.total_duration / stats.runs if stats.runs else None,
+                    "max_duration": stats.max_duration if stats.runs else None,
+                    "last_error": stats.last_error,
+                }
+            )
+        return result
+
+
+scheduler = Scheduler()
@@ -74,5 +74,6 @@ analytics_panel_kb = InlineKeyboardMarkup(inline_keyboard=[
     [InlineKeyboardButton(text="👷 Активность сотрудников", callback_data="analytics_workers")],
     [InlineKeyboardButton(text="📋 Все чек-листы", callback_data="analytics_checklists")],
     [InlineKeyboardButton(text="📈 Общая статистика", callback_data="analytics_overview")],
+    [InlineKeyboardButton(text="❗ Проблемные пункты", callback_data="analytics_failures")],
     [InlineKeyboardButton(text="🔙 Назад", callback_data="analytics_back")]
 ])
@@ -15,10 +15,21 @@ from aiogram.enums import ParseMode
 
 from config import settings
 from app import crud as db
-from app.db import init_db
+from app.db import engine, init_db
 from app.handlers.admin import router as admin_router
 from app.handlers.start import router as start_router
 from app.handlers.worker import router as worker_router
+from app.jobs.schedule import register_jobs
+from app.jobs.scheduler import scheduler
+
+
+def create_dispatcher() -> Dispatcher:
+    dp = Dispatcher()
+
+    dp.include_router(admin_router)
+    dp.include_router(start_router)
+    dp.include_router(worker_router)
+    return dp
 
 
 async def main():
@@ -30,7 +41,7 @@ async def main():
         tg_id=942944230, 
         full_name="Администратор", 
         role="superadmin", 
-        shop_id="Пр. Мира, 1", 
+        shop_id=None, 
         position="Управляющий"
     )
 
@@ -44,14 +55,20 @@ async def main():
         token=settings.bot_token,
         default=DefaultBotProperties(parse_mode=ParseMode.HTML),
     )
-    dp = Dispatcher()
-    
-    dp.include_router(admin_router)
-    dp.include_router(start_router)
-    dp.include_router(worker_router)
-    
+    dp = create_dispatcher()
+
+    # Партиции, архив ответов, очистка шаблонов, сверка итогов
+    scheduler_task = None
+    if settings.scheduler_enabled:
+        register_jobs(scheduler, engine, bot)
+        scheduler_task = asyncio.create_task(scheduler.run())
+
     print("Бот запущен!")
-    await dp.start_polling(bot)
+    try:
+        await dp.start_polling(bot)
+    finally:
+        if scheduler_task is not None:
+            scheduler_task.cancel()
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
@@ -1,23 +1,41 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import date, datetime, time
 
 from sqlalchemy import (
     BigInteger,
     Boolean,
+    Date,
     DateTime,
+    Float,
     ForeignKey,
+    Index,
     Integer,
     String,
+    Time,
+    UniqueConstraint,
+    text,
 )
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
+from app.clock import now
+
 
 class Base(AsyncAttrs, DeclarativeBase):
     pass
 
 
+class Shop(Base):
+    __tablename__ = "shops"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String(50), unique=True)
+    # Пояс (IANA) и начало смены точки; пусто - settings.timezone / shift_start
+    timezone: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    shift_start: Mapped[time | None] = mapped_column(Time, nullable=True)
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -25,29 +43,69 @@ class User(Base):
     tg_id: Mapped[int] = mapped_column(BigInteger, unique=True)
     full_name: Mapped[str] = mapped_column(String(100))
     role: Mapped[str] = mapped_column(String(20))
-    shop_id: Mapped[str] = mapped_column(String(50), nullable=True)
+    # Точка сотрудника; у админов и суперадминов пусто (точки админа - в admin_shops)
+    shop_id: Mapped[int | None] = mapped_column(ForeignKey("shops.id"), nullable=True)
     position: Mapped[str] = mapped_column(String(50))
 
+    shop = relationship("Shop", lazy="joined")
+
+    @property
+    def shop_name(self) -> str | None:
+        return self.shop.name if self.shop else None
+
+
 class AdminShop(Base):
     __tablename__ = 'admin_shops'
+    __table_args__ = (
+        UniqueConstraint("admin_tg_id", "shop_id", name="uq_admin_shops_admin_shop"),
+    )
+
     id: Mapped[int] = mapped_column(primary_key=True)
     admin_tg_id: Mapped[int] = mapped_column(BigInteger) # ID админа
-    shop_name: Mapped[str] = mapped_column(String(50)) 
+    shop_id: Mapped[int] = mapped_column(ForeignKey("shops.id"))
+
+    shop = relationship("Shop", lazy="joined")
+
 
 class Checklist(Base):
     __tablename__ = "checklists"
+    __table_args__ = (
+        # Постраничный список шаблонов точки и подсчет по точкам; удаленные
+        # шаблоны в списки не попадают, поэтому индекс только по живым.
+        # Условие записано так, как рендерится `is_deleted == False`:
+        # SQLite применяет частичный индекс только при буквальном совпадении
+        Index(
+            "ix_checklists_shop_id",
+            "shop_id",
+            "id",
+            postgresql_where=text("is_deleted = false"),
+            sqlite_where=text("is_deleted = 0"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     title: Mapped[str] = mapped_column(String(100))
-    shop_id: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    # Пусто - шаблон для всех точек
+    shop_id: Mapped[int | None] = mapped_column(ForeignKey("shops.id"), nullable=True)
     target_position: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    # Сумма максимальных баллов неудаленных вопросов; ведут функции вопросов
+    # в app.crud.checklists, пересчет - python -m app.jobs.repair
+    max_points: Mapped[int] = mapped_column(Integer, default=0)
+    # Мягкое удаление: отчеты остаются, физически удаляет app.jobs.purge
+    is_deleted: Mapped[bool] = mapped_column(Boolean, default=False)
+    deleted_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
 
+    shop = relationship("Shop", lazy="joined")
     questions = relationship(
         "Question",
         back_populates="checklist",
         cascade="all, delete",
     )
 
+    @property
+    def shop_name(self) -> str | None:
+        return self.shop.name if self.shop else None
+
 
 class Question(Base):
     __tablename__ = "questions"
@@ -63,17 +121,41 @@ class Question(Base):
 
 
 class Report(Base):
+    # На Postgres таблица секционирована по месяцам created_at, первичный ключ
+    # в БД - (id, created_at); для ORM идентичность отчета по-прежнему id.
     __tablename__ = "reports"
+    __table_args__ = (
+        # Keyset-пагинация архива: (created_at, id) в рамках шаблона / сотрудника
+        Index("ix_reports_checklist_created", "checklist_id", "created_at", "id"),
+        Index("ix_reports_user_created", "user_id", "created_at", "id"),
+        # Поиск брошенных отчетов (in_progress старше порога)
+        Index("ix_reports_status_created", "status", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
     checklist_id: Mapped[int] = mapped_column(ForeignKey("checklists.id"))
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+    # Точка сотрудника на момент создания: по ней дневные итоги и рабочий
+    # день отчета, даже если сотрудника потом перевели в другую точку
+    shop_id: Mapped[int | None] = mapped_column(ForeignKey("shops.id"), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=now)
     score_percent: Mapped[int] = mapped_column(Integer, default=0)
+    # in_progress -> completed (finish_report_calculation) или abandoned
+    # (abandon_stale_reports); итоги и средние считаются по completed
+    status: Mapped[str] = mapped_column(String(20), default="in_progress")
+    # Набранные и максимальные баллы на момент прохождения (finish_report_calculation)
+    points_sum: Mapped[int] = mapped_column(Integer, default=0)
+    max_points: Mapped[int] = mapped_column(Integer, default=0)
+    # Ответы вынесены в архивный файл (app.jobs.archive), в answers их нет
+    answers_archived: Mapped[bool] = mapped_column(Boolean, default=False)
 
 
 class Answer(Base):
     __tablename__ = "answers"
+    __table_args__ = (
+        # Ответы отчета; created_at отсекает лишние партиции на Postgres
+        Index("ix_answers_report_created", "report_id", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     report_id: Mapped[int] = mapped_column(ForeignKey("reports.id"))
@@ -81,3 +163,47 @@ class Answer(Base):
     answer_text: Mapped[str | None] = mapped_column(String(255), nullable=True)
     photo_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
     points: Mapped[int] = mapped_column(Integer, default=0)
+    # Копия reports.created_at: ответ лежит в той же месячной партиции, что и отчет
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=now)
+
+
+class ShopDailyStats(Base):
+    """Дневные итоги отчетов по точке: сводки за период читаются отсюда."""
+
+    __tablename__ = "shop_daily_stats"
+
+    shop_id: Mapped[int] = mapped_column(ForeignKey("shops.id"), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    reports_count: Mapped[int] = mapped_column(Integer, default=0)
+    score_sum: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class QuestionDailyStats(Base):
+    """Дневные итоги ответов на вопрос по точке: аналитика провалов читает отсюда."""
+
+    __tablename__ = "question_daily_stats"
+
+    question_id: Mapped[int] = mapped_column(ForeignKey("questions.id"), primary_key=True)
+    shop_id: Mapped[int] = mapped_column(ForeignKey("shops.id"), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    answers_count: Mapped[int] = mapped_column(Integer, default=0)
+    # Ответов с 0 баллов ("Нет" в binary) и с оценкой не выше SCALE_FAIL_MAX
+    zero_count: Mapped[int] = mapped_column(Integer, default=0)
+    low_count: Mapped[int] = mapped_column(Integer, default=0)
+    points_sum: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class JobLease(Base):
+    """Аренда фоновой задачи: при нескольких экземплярах бота ее выполняет один."""
+
+    __tablename__ = "job_leases"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    # Экземпляр бота, держащий аренду (хост:pid:суффикс)
+    owner: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    expires_at: Mapped[datetime] = mapped_column(DateTime)
+    # Последний запуск - на любом экземпляре
+    last_started_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    last_finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    last_duration: Mapped[float | None] = mapped_column(Float, nullable=True)
+    last_error: Mapped[str | None] = mapped_column(String(255), nullable=True)
@@ -0,0 +1,535 @@
+"""Генератор синтетических данных для локального воспроизведения нагрузки.
+
+Создает точки, управляющих (с привязкой через `admin_shops`), сотрудников по
+должностям, шаблоны с вопросами `binary`/`scale`/`text` и историю отчетов с
+ответами за несколько месяцев.
+
+Запуск:
+    python -m app.seed --shops 50 --months 12
+    python -m app.seed --answers 10000000 --database-url postgresql+asyncpg://...
+
+Отчеты и ответы пишутся пачками: на Postgres через COPY (asyncpg),
+на SQLite через executemany.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import math
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Allow running as a script: `python app/seed.py`
+if __package__ is None or __package__ == "":
+    repo_root = Path(__file__).resolve().parents[1]
+    sys.path.insert(0, str(repo_root))
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+
+from app import clock
+from app.crud.reports import refresh_question_daily_stats, refresh_shop_daily_stats
+from app.models import AdminShop, Answer, Base, Checklist, Question, Report, Shop, User
+
+
+logger = logging.getLogger(__name__)
+
+POSITIONS = ["Бариста", "Старший бариста", "Кассир"]
+
+FIRST_NAMES = [
+    "Анна", "Мария", "Екатерина", "Ольга", "Дарья", "Алина", "Полина", "София",
+    "Иван", "Дмитрий", "Алексей", "Сергей", "Никита", "Артем", "Максим", "Егор",
+]
+LAST_NAMES = [
+    "Иванов", "Смирнов", "Кузнецов", "Попов", "Васильев", "Петров", "Соколов",
+    "Михайлов", "Новиков", "Федоров", "Морозов", "Волков", "Алексеев", "Лебедев",
+]
+STREETS = [
+    "Пр. Мира", "Ул. Ленина", "Тверская", "Арбат", "Ул. Гагарина", "Невский пр.",
+    "Ул. Пушкина", "Садовая", "Ул. Советская", "Набережная",
+]
+
+# (название, смена): смена определяет распределение времени прохождения
+CHECKLIST_TEMPLATES = [
+    ("Открытие смены", "opening"),
+    ("Витрина и выкладка", "opening"),
+    ("Чистота зала", "day"),
+    ("Стандарты приготовления", "day"),
+    ("Кассовая дисциплина", "closing"),
+    ("Закрытие смены", "closing"),
+]
+QUESTION_TEXTS = [
+    "Кофемашина промыта?", "Гриндер откалиброван?", "Витрина заполнена?",
+    "Ценники на месте?", "Пол чистый?", "Столы протерты?", "Санузел убран?",
+    "Молоко в холодильнике свежее?", "Сиропы промаркированы?", "Касса сверена?",
+    "Мусор вынесен?", "Музыка включена?", "Форма опрятная?", "Температура холодильника в норме?",
+]
+TEXT_ANSWERS = [
+    "Все в порядке", "Замечаний нет", "Заканчивается молоко", "Нужен ремонт",
+    "Мало стаканов", "Сделано", "Перенесли на завтра",
+]
+WEEKDAY_WEIGHTS = [1.0, 1.0, 1.0, 1.0, 1.1, 1.3, 1.2]
+
+CHUNK_ROWS = 50_000
+
+
+@dataclass
+class SeedConfig:
+    shops: int = 10
+    shops_per_admin: int = 3
+    workers_per_position: int = 2
+    checklists_per_shop: int = 3
+    network_checklists: int = 2
+    min_questions: int = 5
+    max_questions: int = 15
+    months: int = 3
+    reports_per_worker_day: float = 1.5
+    answers: int | None = None
+    seed: int = 42
+    end: datetime = field(default_factory=clock.now)
+
+
+@dataclass
+class _QuestionInfo:
+    id: int
+    type: str
+    needs_photo: bool
+
+
+@dataclass
+class _ChecklistInfo:
+    id: int
+    shop: int | None
+    position: str | None
+    shift: str
+    questions: list[_QuestionInfo]
+    max_points: int
+
+
+@dataclass
+class _WorkerInfo:
+    id: int
+    shop: int
+    position: str
+    skill: float
+    checklists: list[_ChecklistInfo] = field(default_factory=list)
+
+
+async def _next_id(conn: AsyncConnection, model) -> int:
+    return (await conn.scalar(select(func.max(model.id)))) or 0
+
+
+async def _bulk_insert(conn: AsyncConnection, model, rows: list[dict]) -> None:
+    """Вставка пачки строк: COPY на Postgres, executemany на остальных СУБД."""
+    if not rows:
+        return
+
+    if conn.dialect.name == "postgresql":
+        columns = list(rows[0].keys())
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            model.__tablename__,
+            records=[tuple(row[c] for c in columns) for row in rows],
+            columns=columns,
+        )
+    else:
+        await conn.execute(insert(model), rows)
+
+
+async def _reset_sequences(conn: AsyncConnection) -> None:
+    """После вставки с явными id подтягиваем sequence'ы Postgres."""
+    if conn.dialect.name != "postgresql":
+        return
+    for model in (Shop, User, AdminShop, Checklist, Question, Report, Answer):
+        table = model.__tablename__
+        await conn.execute(
+            text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM {table}), 0) + 1, false)"
+            )
+        )
+
+
+def _max_points(questions: list[_QuestionInfo]) -> int:
+    # Та же формула, что и Checklist.max_points (QUESTION_MAX_POINTS)
+    total = 0
+    for q in questions:
+        if q.type == "binary":
+            total += 1
+        elif q.type == "scale":
+            total += 10
+    return total
+
+
+async def _seed_structure(
+    conn: AsyncConnection, cfg: SeedConfig, rnd: random.Random
+) -> list[_WorkerInfo]:
+    """Точки, управляющие, сотрудники, шаблоны и вопросы."""
+    user_id = await _next_id(conn, User)
+    admin_shop_id = await _next_id(conn, AdminShop)
+    checklist_id = await _next_id(conn, Checklist)
+    question_id = await _next_id(conn, Question)
+    tg_base = 9_000_000_000 + user_id * 10
+
+    shop_names = [
+        f"{STREETS[i % len(STREETS)]}, {i // len(STREETS) + 1}" for i in range(cfg.shops)
+    ]
+    # Точки с такими названиями могли остаться от прошлого запуска без --reset
+    existing = dict(
+        (await conn.execute(select(Shop.name, Shop.id).where(Shop.name.in_(shop_names)))).all()
+    )
+    shop_id = await _next_id(conn, Shop)
+    shop_rows: list[dict] = []
+    for name in shop_names:
+        if name not in existing:
+            shop_id += 1
+            existing[name] = shop_id
+            shop_rows.append({"id": shop_id, "name": name})
+    shops = [existing[name] for name in shop_names]
+
+    users: list[dict] = []
+    admin_shops: list[dict] = []
+    workers: list[_WorkerInfo] = []
+
+    for a in range(math.ceil(cfg.shops / cfg.shops_per_admin)):
+        user_id += 1
+        admin_tg_id = tg_base + user_id
+        users.append(
+            {
+                "id": user_id,
+                "tg_id": admin_tg_id,
+                "full_name": f"{rnd.choice(LAST_NAMES)} {rnd.choice(FIRST_NAMES)} (упр.)",
+                "role": "admin",
+                "shop_id": None,
+                "position": "Управляющий",
+            }
+        )
+        for shop in shops[a * cfg.shops_per_admin:(a + 1) * cfg.shops_per_admin]:
+            admin_shop_id += 1
+            admin_shops.append(
+                {"id": admin_shop_id, "admin_tg_id": admin_tg_id, "shop_id": shop}
+            )
+
+    for shop in shops:
+        for position in POSITIONS:
+            for _ in range(cfg.workers_per_position):
+                user_id += 1
+                users.append(
+                    {
+                        "id": user_id,
+                        "tg_id": tg_base + user_id,
+                        "full_name": f"{rnd.choice(LAST_NAMES)} {rnd.choice(FIRST_NAMES)}",
+                        "role": "worker",
+                        "shop_id": shop,
+                        "position": position,
+                    }
+                )
+                workers.append(
+                    _WorkerInfo(
+                        id=user_id, shop=shop, position=position, skill=rnd.betavariate(5, 2)
+                    )
+                )
+
+    checklists: list[dict] = []
+    questions: list[dict] = []
+    infos: list[_ChecklistInfo] = []
+
+    owners: list[int | None] = [None] * cfg.network_checklists
+    for shop in shops:
+        owners.extend([shop] * cfg.checklists_per_shop)
+
+    for owner in owners:
+        checklist_id += 1
+        title, shift = rnd.choice(CHECKLIST_TEMPLATES)
+        position = rnd.choice([None, None, *POSITIONS])
+        checklists.append(
+            {
+                "id": checklist_id,
+                "title": title,
+                "shop_id": owner,
+                "target_position": position,
+            }
+        )
+
+        q_infos: list[_QuestionInfo] = []
+        for _ in range(rnd.randint(cfg.min_questions, cfg.max_questions)):
+            question_id += 1
+            q_type = rnd.choices(["binary", "scale", "text"], weights=[60, 25, 15])[0]
+            needs_photo = rnd.random() < 0.2
+            is_deleted = rnd.random() < 0.05
+            questions.append(
+                {
+                    "id": question_id,
+                    "checklist_id": checklist_id,
+                    "text": rnd.choice(QUESTION_TEXTS),
+                    "type": q_type,
+                    "needs_photo": needs_photo,
+                    "is_deleted": is_deleted,
+                }
+            )
+            if not is_deleted:
+                q_infos.append(_QuestionInfo(question_id, q_type, needs_photo))
+
+        infos.append(
+            _ChecklistInfo(
+                id=checklist_id,
+                shop=owner,
+                position=position,
+                shift=shift,
+                questions=q_infos,
+                max_points=_max_points(q_infos),
+            )
+        )
+        checklists[-1]["max_points"] = infos[-1].max_points
+
+    for worker in workers:
+        worker.checklists = [
+            ch
+            for ch in infos
+            if ch.questions
+            and (ch.shop is None or ch.shop == worker.shop)
+            and (ch.position is None or ch.position == worker.position)
+        ]
+
+    for model, rows in (
+        (Shop, shop_rows),
+        (User, users),
+        (AdminShop, admin_shops),
+        (Checklist, checklists),
+        (Question, questions),
+    ):
+        for i in range(0, len(rows), CHUNK_ROWS):
+            await _bulk_insert(conn, model, rows[i:i + CHUNK_ROWS])
+
+    logger.info(
+        "Структура: %s точек, %s пользователей, %s шаблонов, %s вопросов",
+        len(shops), len(users), len(checklists), len(questions),
+    )
+    return [w for w in workers if w.checklists]
+
+
+def _report_time(day: datetime, shift: str, rnd: random.Random) -> datetime:
+    """Время прохождения: открытие ~8:00, закрытие ~21:30, дневные равномерно."""
+    if shift == "opening":
+        minutes = rnd.gauss(8 * 60, 30)
+    elif shift == "closing":
+        minutes = rnd.gauss(21 * 60 + 30, 40)
+    else:
+        minutes = rnd.uniform(11 * 60, 17 * 60)
+    minutes = min(max(minutes, 6 * 60), 23 * 60 + 59)
+    return day + timedelta(minutes=minutes, seconds=rnd.uniform(0, 60))
+
+
+def _answer(q: _QuestionInfo, skill: float, rnd: random.Random) -> tuple[str, int]:
+    if q.type == "binary":
+        if rnd.random() < 0.75 + 0.2 * skill:
+            return "Да", 1
+        return "Нет", 0
+    if q.type == "scale":
+        value = min(max(round(rnd.gauss(5 + 4 * skill, 1.5)), 1), 10)
+        return str(value), value
+    return rnd.choice(TEXT_ANSWERS), 0
+
+
+async def _seed_history(
+    conn: AsyncConnection,
+    cfg: SeedConfig,
+    rnd: random.Random,
+    workers: list[_WorkerInfo],
+) -> tuple[int, int]:
+    """История отчетов и ответов, упорядоченная по времени."""
+    days = max(cfg.months * 30, 1)
+    end_day = cfg.end.replace(hour=0, minute=0, second=0, microsecond=0)
+    start_day = end_day - timedelta(days=days - 1)
+
+    if cfg.answers is not None:
+        avg_questions = sum(
+            len(ch.questions) for w in workers for ch in w.checklists
+        ) / max(sum(len(w.checklists) for w in workers), 1)
+        total_reports = max(int(cfg.answers / max(avg_questions, 1)), 1)
+    else:
+        total_reports = int(len(workers) * days * cfg.reports_per_worker_day)
+
+    day_weights = [WEEKDAY_WEIGHTS[(start_day + timedelta(days=d)).weekday()] for d in range(days)]
+    weight_sum = sum(day_weights)
+
+    report_id = await _next_id(conn, Report)
+    answer_id = await _next_id(conn, Answer)
+    reports: list[dict] = []
+    answers: list[dict] = []
+    reports_total = answers_total = 0
+
+    async def flush() -> None:
+        nonlocal reports, answers
+        await _bulk_insert(conn, Report, reports)
+        await _bulk_insert(conn, Answer, answers)
+        await conn.commit()
+        reports, answers = [], []
+
+    carry = 0.0
+    for d in range(days):
+        day = start_day + timedelta(days=d)
+        expected = total_reports * day_weights[d] / weight_sum + carry
+        count = int(expected)
+        carry = expected - count
+
+        day_reports = []
+        for _ in range(count):
+            worker = rnd.choice(workers)
+            checklist = rnd.choice(worker.checklists)
+            created_at = _report_time(day, checklist.shift, rnd)
+            if created_at > cfg.end:
+                continue
+            day_reports.append((created_at, worker, checklist))
+        day_reports.sort(key=lambda r: r[0])
+
+        for created_at, worker, checklist in day_reports:
+            report_id += 1
+            points_sum = 0
+            for q in checklist.questions:
+                answer_id += 1
+                answer_text, points = _answer(q, worker.skill, rnd)
+                points_sum += points
+                photo_id = None
+                if q.needs_photo:
+                    photo_id = f"AgACAgIAAxkBAAI{rnd.getrandbits(96):024x}"
+                answers.append(
+                    {
+                        "id": answer_id,
+                        "report_id": report_id,
+                        "question_id": q.id,
+                        "answer_text": answer_text,
+                        "photo_id": photo_id,
+                        "points": points,
+                        "created_at": created_at,
+                    }
+                )
+
+            percent = 0
+            if checklist.max_points > 0:
+                percent = int((points_sum / checklist.max_points) * 100)
+            reports.append(
+                {
+                    "id": report_id,
+                    "user_id": worker.id,
+                    "checklist_id": checklist.id,
+                    "shop_id": worker.shop,
+                    "created_at": created_at,
+                    "score_percent": percent,
+                    "status": "completed",
+                    "points_sum": points_sum,
+                    "max_points": checklist.max_points,
+                }
+            )
+            reports_total += 1
+            answers_total += len(checklist.questions)
+
+            if len(answers) >= CHUNK_ROWS:
+                await flush()
+
+        if d % 30 == 0 and d:
+            logger.info("... %s дней, %s отчетов, %s ответов", d, reports_total, answers_total)
+
+    await flush()
+    return reports_total, answers_total
+
+
+async def seed(engine: AsyncEngine, cfg: SeedConfig, reset: bool = False) -> dict:
+    """Заполнить БД синтетическими данными. Возвращает счетчики созданных строк."""
+    rnd = random.Random(cfg.seed)
+    started = time.perf_counter()
+
+    async with engine.begin() as conn:
+        if reset:
+            await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with engine.connect() as conn:
+        if conn.dialect.name == "sqlite":
+            await conn.execute(text("PRAGMA journal_mode=WAL"))
+            await conn.execute(text("PRAGMA synchronous=OFF"))
+
+        workers = await _seed_structure(conn, cfg, rnd)
+        await conn.commit()
+        if not workers:
+            raise ValueError("Нет сотрудников с доступными шаблонами - нечего заполнять.")
+
+        reports_total, answers_total = await _seed_history(conn, cfg, rnd, workers)
+        await refresh_shop_daily_stats(conn)
+        await refresh_question_daily_stats(conn)
+        await _reset_sequences(conn)
+        await conn.commit()
+
+    elapsed = time.perf_counter() - started
+    logger.info(
+        "Готово за %.1f c: %s отчетов, %s ответов", elapsed, reports_total, answers_total
+    )
+    return {
+        "workers": len(workers),
+        "reports": reports_total,
+        "answers": answers_total,
+        "seconds": elapsed,
+    }
+
+
+def _parse_args(argv: list[str] | None = None) -> tuple[argparse.Namespace, SeedConfig]:
+    defaults = SeedConfig()
+    parser = argparse.ArgumentParser(description="Заполнить БД синтетическими данными.")
+    parser.add_argument("--database-url", help="По умолчанию DATABASE_URL из настроек.")
+    parser.add_argument("--reset", action="store_true", help="Удалить и пересоздать таблицы.")
+    parser.add_argument("--shops", type=int, default=defaults.shops)
+    parser.add_argument("--shops-per-admin", type=int, default=defaults.shops_per_admin)
+    parser.add_argument("--workers-per-position", type=int, default=defaults.workers_per_position)
+    parser.add_argument("--checklists-per-shop", type=int, default=defaults.checklists_per_shop)
+    parser.add_argument("--network-checklists", type=int, default=defaults.network_checklists)
+    parser.add_argument("--months", type=int, default=defaults.months)
+    parser.add_argument(
+        "--reports-per-worker-day", type=float, default=defaults.reports_per_worker_day
+    )
+    parser.add_argument(
+        "--answers", type=int, default=None,
+        help="Целевое число ответов (перекрывает --reports-per-worker-day).",
+    )
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    args = parser.parse_args(argv)
+
+    cfg = SeedConfig(
+        shops=args.shops,
+        shops_per_admin=args.shops_per_admin,
+        workers_per_position=args.workers_per_position,
+        checklists_per_shop=args.checklists_per_shop,
+        network_checklists=args.network_checklists,
+        months=args.months,
+        reports_per_worker_day=args.reports_per_worker_day,
+        answers=args.answers,
+        seed=args.seed,
+    )
+    return args, cfg
+
+
+async def main(argv: list[str] | None = None) -> None:
+    args, cfg = _parse_args(argv)
+    if args.database_url:
+        engine = create_async_engine(args.database_url)
+    else:
+        from app.db import engine
+
+    try:
+        stats = await seed(engine, cfg, reset=args.reset)
+    finally:
+        await engine.dispose()
+    print(
+        f"Создано: {stats['reports']} отчетов, {stats['answers']} ответов "
+        f"за {stats['seconds']:.1f} c"
+    )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
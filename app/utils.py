@@ -1,7 +1,15 @@
+from datetime import datetime
+
 from aiogram.types import InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
 
+CURSOR_TS_FORMAT = "%Y%m%d%H%M%S%f"
+SPARK_BARS = "▁▂▃▄▅▆▇█"
+SPARK_GAP = "·"
+SCORE_MIN_SPAN = 20
+
+
 def cancel_kb(cancel_callback: str = "cancel_creation") -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     builder.button(text="❌ Отмена", callback_data=cancel_callback)
@@ -14,3 +22,49 @@ def nav_kb(back_callback: str, cancel_callback: str = "cancel_creation") -> Inli
     builder.button(text="❌ Отмена", callback_data=cancel_callback)
     builder.adjust(1)
     return builder.as_markup()
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Курсор keyset-пагинации для callback_data (точный до микросекунд)."""
+    return f"{created_at.strftime(CURSOR_TS_FORMAT)}_{row_id}"
+
+
+def decode_cursor(value: str) -> tuple[datetime, int]:
+    ts, row_id = value.split("_")
+    return datetime.strptime(ts, CURSOR_TS_FORMAT), int(row_id)
+
+
+def sparkline(values: list[float | None], low: float | None = None, high: float | None = None) -> str:
+    """Мини-график строкой: символ на значение, None - пропуск.
+
+    Шкала - от low до high; по умолчанию от минимума до максимума ряда.
+    """
+    known = [v for v in values if v is not None]
+    if not known:
+        return SPARK_GAP * len(values)
+    low = min(known) if low is None else low
+    high = max(known) if high is None else high
+    top = len(SPARK_BARS) - 1
+    chars = []
+    for value in values:
+        if value is None:
+            chars.append(SPARK_GAP)
+        elif high <= low:
+            chars.append(SPARK_BARS[top // 2])
+        else:
+            level = round((min(max(value, low), high) - low) / (high - low) * top)
+            chars.append(SPARK_BARS[level])
+    return "".join(chars)
+
+
+def score_series_line(series: list[dict]) -> str:
+    """«▃▅▆█ 87%»: средний результат по корзинам ряда и последнее значение."""
+    scores = [bucket["avg_score"] for bucket in series]
+    known = [score for score in scores if score is not None]
+    if not known:
+        return "нет данных"
+    # Шкала не уже SCORE_MIN_SPAN пунктов, чтобы колебания в 2-3% не рисовались обвалом
+    low, high = min(known), max(known)
+    pad = max(SCORE_MIN_SPAN - (high - low), 0) / 2
+    low, high = max(low - pad, 0), min(high + pad, 100)
+    return f"{sparkline(scores, low, high)} {int(known[-1])}%"
@@ -0,0 +1,7 @@
+"""Бенчмарки CRUD-слоя и нагрузочные сценарии.
+
+- `python -m benchmarks.crud` - латентность, число запросов и пик памяти
+  для функций из `app.crud.__all__` на наборах данных разного размера.
+- `python -m benchmarks.load` - сквозной прогон апдейтов через Dispatcher
+  с заглушкой Bot API.
+"""
@@ -0,0 +1,91 @@
+"""Общие утилиты бенчмарков: наборы данных, счетчик запросов, перцентили."""
+
+from __future__ import annotations
+
+import hashlib
+import shutil
+from dataclasses import replace
+from pathlib import Path
+
+from sqlalchemy import event
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.models import Base
+from app.seed import SeedConfig, seed
+
+
+DATA_DIR = Path(__file__).resolve().parent / ".data"
+
+# Размер набора -> параметры генератора (число ответов задает объем истории)
+SIZES: dict[str, SeedConfig] = {
+    "1k": SeedConfig(shops=3, shops_per_admin=2, months=1, answers=1_000),
+    "100k": SeedConfig(shops=10, months=3, answers=100_000),
+    "10m": SeedConfig(shops=100, workers_per_position=3, months=12, answers=10_000_000),
+}
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Перцентиль с линейной интерполяцией (p от 0 до 100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+class QueryCounter:
+    """Считает SQL-запросы, прошедшие через engine."""
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.count = 0
+        self._engine = engine.sync_engine
+        event.listen(self._engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args, **kwargs) -> None:
+        self.count += 1
+
+    def close(self) -> None:
+        event.remove(self._engine, "before_cursor_execute", self._on_execute)
+
+
+def schema_fingerprint() -> str:
+    """Хеш DDL моделей: кеш наборов сбрасывается при изменении схемы."""
+    dialect = sqlite.dialect()
+    ddl = []
+    for table in Base.metadata.sorted_tables:
+        ddl.append(str(CreateTable(table).compile(dialect=dialect)))
+        ddl.extend(
+            str(CreateIndex(index).compile(dialect=dialect))
+            for index in sorted(table.indexes, key=lambda i: i.name or "")
+        )
+    return hashlib.sha1("".join(ddl).encode()).hexdigest()[:8]
+
+
+async def prepare_sqlite(size: str, reseed: bool = False) -> AsyncEngine:
+    """Рабочая копия SQLite-набора: эталон генерируется один раз и кешируется."""
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    master = DATA_DIR / f"sqlite-{size}-{schema_fingerprint()}.db"
+    work = DATA_DIR / f"sqlite-{size}.work.db"
+
+    if reseed or not master.exists():
+        master.unlink(missing_ok=True)
+        engine = create_async_engine(f"sqlite+aiosqlite:///{master}")
+        try:
+            await seed(engine, replace(SIZES[size]), reset=True)
+        finally:
+            await engine.dispose()
+
+    shutil.copyfile(master, work)
+    return create_async_engine(f"sqlite+aiosqlite:///{work}")
+
+
+async def prepare_postgres(url: str, size: str, reseed: bool = True) -> AsyncEngine:
+    """Postgres-набор: база пересоздается генератором (если не передан --no-seed)."""
+    engine = create_async_engine(url)
+    if reseed:
+        await seed(engine, replace(SIZES[size]), reset=True)
+    return engine
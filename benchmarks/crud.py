@@ -0,0 +1,444 @@
+"""Бенчмарк функций из `app.crud.__all__`.
+
+Каждая функция прогоняется на наборах данных разного размера (1k, 100k, 10M
+ответов) на SQLite и, если передан `--postgres-url`, на Postgres. Для каждой
+фиксируются перцентили латентности, число SQL-запросов на вызов и пик памяти.
+
+Запуск:
+    python -m benchmarks.crud --sizes 1k,100k --output bench.json
+    python -m benchmarks.crud --postgres-url postgresql+asyncpg://u:p@localhost/bench
+    python -m benchmarks.crud --compare old.json new.json
+
+В режиме сравнения рост числа запросов (типичный признак N+1) или замедление
+p50 сверх `--threshold` считается регрессией, код выхода 1.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+# Allow running as a script: `python benchmarks/crud.py`
+if __package__ is None or __package__ == "":
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import desc, func, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app import crud as db
+from app.cache import clear_caches
+from app.db import async_session
+from app.models import AdminShop, Checklist, Question, Report, User
+from benchmarks.common import (
+    DATA_DIR,
+    SIZES,
+    QueryCounter,
+    percentile,
+    prepare_postgres,
+    prepare_sqlite,
+)
+
+
+logger = logging.getLogger(__name__)
+
+Call = Callable[[], Awaitable[Any]]
+
+
+@dataclass
+class Sample:
+    """Идентификаторы «типичных» объектов набора, на которых гоняются функции."""
+
+    worker_tg: int
+    worker_pk: int
+    admin_tg: int
+    shop: int
+    shop_name: str
+    checklist_id: int
+    question_id: int
+    report_id: int
+
+
+async def load_sample() -> Sample:
+    async with async_session() as session:
+        worker_pk, _ = (
+            await session.execute(
+                select(Report.user_id, func.count(Report.id))
+                .group_by(Report.user_id)
+                .order_by(desc(func.count(Report.id)))
+                .limit(1)
+            )
+        ).one()
+        worker = await session.get(User, worker_pk)
+        admin_tg = await session.scalar(
+            select(AdminShop.admin_tg_id).where(AdminShop.shop_id == worker.shop_id).limit(1)
+        )
+        checklist_id = await session.scalar(
+            select(Report.checklist_id)
+            .group_by(Report.checklist_id)
+            .order_by(desc(func.count(Report.id)))
+            .limit(1)
+        )
+        question_id = await session.scalar(
+            select(Question.id)
+            .where(Question.checklist_id == checklist_id)
+            .where(Question.is_deleted == False)
+            .limit(1)
+        )
+        report_id = await session.scalar(select(func.max(Report.id)))
+
+    return Sample(
+        worker_tg=worker.tg_id,
+        worker_pk=worker.id,
+        admin_tg=admin_tg,
+        shop=worker.shop_id,
+        shop_name=worker.shop_name,
+        checklist_id=checklist_id,
+        question_id=question_id,
+        report_id=report_id,
+    )
+
+
+# --- Подготовка одноразовых объектов для функций, изменяющих данные ---
+
+_scratch_counter = 0
+
+
+def _scratch_tg_id() -> int:
+    global _scratch_counter
+    _scratch_counter += 1
+    return 7_000_000_000 + _scratch_counter
+
+
+async def _insert(obj) -> int:
+    async with async_session() as session:
+        session.add(obj)
+        await session.commit()
+        return obj.id
+
+
+async def _scratch_report(s: Sample) -> int:
+    return await _insert(Report(user_id=s.worker_pk, checklist_id=s.checklist_id, score_percent=0))
+
+
+async def _scratch_checklist(s: Sample) -> int:
+    return await _insert(Checklist(title="bench", shop_id=s.shop, target_position=None))
+
+
+def _read(fn: Callable[..., Awaitable[Any]], *args: Callable[[Sample], Any]):
+    async def prepare(s: Sample) -> Call:
+        # Замеряется запрос, а не попадание в кэш аналитики
+        clear_caches()
+        values = [a(s) for a in args]
+        return lambda: fn(*values)
+
+    return prepare
+
+
+async def _prepare_add_user(s: Sample) -> Call:
+    tg_id = _scratch_tg_id()
+    return lambda: db.add_user(tg_id, "Bench User", "worker", s.shop, "Бариста")
+
+
+async def _prepare_add_admin_shop(s: Sample) -> Call:
+    tg_id = _scratch_tg_id()
+    return lambda: db.add_admin_shop(tg_id, s.shop_name)
+
+
+async def _prepare_delete_user(s: Sample) -> Call:
+    user_id = await _insert(
+        User(tg_id=_scratch_tg_id(), full_name="Bench", role="worker", shop_id=s.shop, position="Бариста")
+    )
+    return lambda: db.delete_user(user_id)
+
+
+async def _prepare_update_checklist(s: Sample) -> Call:
+    checklist_id = await _scratch_checklist(s)
+    return lambda: db.update_checklist(checklist_id, title="bench-upd")
+
+
+async def _prepare_delete_checklist(s: Sample) -> Call:
+    checklist_id = await _scratch_checklist(s)
+    return lambda: db.delete_checklist(checklist_id)
+
+
+async def _prepare_purge_checklist(s: Sample) -> Call:
+    checklist_id = await _scratch_checklist(s)
+    return lambda: db.purge_checklist(checklist_id)
+
+
+async def _prepare_add_question(s: Sample) -> Call:
+    checklist_id = await _scratch_checklist(s)
+    return lambda: db.add_question(checklist_id, "bench?", "binary", False)
+
+
+async def _prepare_update_question(s: Sample) -> Call:
+    checklist_id = await _scratch_checklist(s)
+    question_id = await _insert(Question(checklist_id=checklist_id, text="bench?", type="binary"))
+    return lambda: db.update_question(question_id, text="bench!")
+
+
+async def _prepare_delete_question(s: Sample) -> Call:
+    checklist_id = await _scratch_checklist(s)
+    question_id = await _insert(Question(checklist_id=checklist_id, text="bench?", type="binary"))
+    return lambda: db.delete_question(question_id)
+
+
+async def _prepare_save_answer(s: Sample) -> Call:
+    report_id = await _scratch_report(s)
+    return lambda: db.save_answer_with_points(report_id, s.question_id, "Да", None, 1)
+
+
+async def _prepare_finish_report(s: Sample) -> Call:
+    report_id = await _scratch_report(s)
+    return lambda: db.finish_report_calculation(report_id)
+
+
+CASES: dict[str, Callable[[Sample], Awaitable[Call]]] = {
+    # users
+    "get_user": _read(db.get_user, lambda s: s.worker_tg),
+    "get_user_by_pk": _read(db.get_user_by_pk, lambda s: s.worker_pk),
+    "add_user": _prepare_add_user,
+    "add_admin_shop": _prepare_add_admin_shop,
+    "update_user": _read(db.update_user, lambda s: s.worker_pk, lambda s: "Bench Renamed"),
+    "delete_user": _prepare_delete_user,
+    "get_all_positions": _read(db.get_all_positions),
+    "get_all_workers": _read(db.get_all_workers),
+    "get_all_admins": _read(db.get_all_admins),
+    "get_all_shops": _read(db.get_all_shops),
+    "get_shop": _read(db.get_shop, lambda s: s.shop),
+    "update_shop_schedule": _read(db.update_shop_schedule, lambda s: s.shop),
+    "get_admins_with_shops": _read(db.get_admins_with_shops),
+    "get_admin_shops": _read(db.get_admin_shops, lambda s: s.admin_tg),
+    "get_employees_by_shop": _read(db.get_employees_by_shop, lambda s: s.shop),
+    "get_employees_with_reports": _read(db.get_employees_with_reports, lambda s: [s.shop]),
+    # checklists
+    "create_checklist": _read(db.create_checklist, lambda s: "bench", lambda s: s.shop),
+    "update_checklist": _prepare_update_checklist,
+    "delete_checklist": _prepare_delete_checklist,
+    "purge_checklist": _prepare_purge_checklist,
+    "get_checklist": _read(db.get_checklist, lambda s: s.checklist_id),
+    "get_checklists_for_user": _read(db.get_checklists_for_user, lambda s: s.worker_tg),
+    "get_checklists": _read(db.get_checklists),
+    "get_checklists_page": _read(db.get_checklists_page, lambda s: s.shop),
+    "get_checklists_count_by_shop": _read(db.get_checklists_count_by_shop, lambda s: [s.shop]),
+    "get_questions": _read(db.get_questions, lambda s: s.checklist_id),
+    "get_question": _read(db.get_question, lambda s: s.question_id),
+    "add_question": _prepare_add_question,
+    "update_question": _prepare_update_question,
+    "delete_question": _prepare_delete_question,
+    "get_checklists_today": _read(db.get_checklists_today),
+    # reports
+    "create_report": _read(db.create_report, lambda s: s.worker_tg, lambda s: s.checklist_id),
+    "save_answer_with_points": _prepare_save_answer,
+    "finish_report_calculation": _prepare_finish_report,
+    "get_monthly_stats_by_shop": _read(db.get_monthly_stats_by_shop, lambda s: [s.shop]),
+    "rebuild_shop_daily_stats": _read(db.rebuild_shop_daily_stats),
+    "rebuild_checklist_max_points": _read(db.rebuild_checklist_max_points),
+    "rebuild_report_scores": _read(db.rebuild_report_scores),
+    "rebuild_question_daily_stats": _read(db.rebuild_question_daily_stats),
+    "abandon_stale_reports": _read(db.abandon_stale_reports),
+    "get_question_failure_stats": _read(db.get_question_failure_stats),
+    "get_score_series": _read(db.get_score_series, lambda s: s.shop),
+    "get_score_series_by_shop": _read(db.get_score_series_by_shop, lambda s: [s.shop]),
+    "get_score_distribution": _read(db.get_score_distribution, lambda s: s.shop),
+    "get_workers_leaderboard": _read(db.get_workers_leaderboard, lambda s: s.shop),
+    "get_all_reports_data": _read(db.get_all_reports_data),
+    "get_today_completed_checklist_ids": _read(
+        db.get_today_completed_checklist_ids, lambda s: s.worker_tg
+    ),
+    "get_pending_checklists_today": _read(db.get_pending_checklists_today),
+    "get_reports_by_checklist_id": _read(db.get_reports_by_checklist_id, lambda s: s.checklist_id),
+    "get_report_details": _read(db.get_report_details, lambda s: s.report_id),
+    "get_reports_by_user_tg_id": _read(db.get_reports_by_user_tg_id, lambda s: s.worker_tg),
+    # analytics
+    "get_admin_activity_stats": _read(db.get_admin_activity_stats, lambda s: s.admin_tg),
+    "get_all_admins_activity": _read(db.get_all_admins_activity),
+    "get_all_workers_activity": _read(db.get_all_workers_activity),
+    "get_all_checklists_stats": _read(db.get_all_checklists_stats),
+    "get_network_overview_stats": _read(db.get_network_overview_stats),
+    "get_admin_checklists": _read(db.get_admin_checklists, lambda s: s.admin_tg),
+    "get_admin_workers": _read(db.get_admin_workers, lambda s: s.admin_tg),
+    "get_checklists_shops": _read(db.get_checklists_shops),
+    "get_checklists_by_shop": _read(db.get_checklists_by_shop, lambda s: s.shop),
+    "get_workers_shops": _read(db.get_workers_shops),
+    "get_workers_by_shop": _read(db.get_workers_by_shop, lambda s: s.shop),
+}
+
+
+async def bench_function(
+    name: str,
+    sample: Sample,
+    counter: QueryCounter,
+    repeat: int,
+    timeout: float,
+) -> dict:
+    result: dict[str, Any] = {"function": name}
+    prepare = CASES.get(name)
+    if prepare is None:
+        result["error"] = "no benchmark case"
+        return result
+
+    timings: list[float] = []
+    queries = 0
+    try:
+        # Первый прогон - прогрев и замер памяти
+        call = await prepare(sample)
+        tracemalloc.start()
+        await asyncio.wait_for(call(), timeout)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["peak_kb"] = round(peak / 1024, 1)
+
+        for _ in range(repeat):
+            call = await prepare(sample)
+            before = counter.count
+            started = time.perf_counter()
+            await asyncio.wait_for(call(), timeout)
+            timings.append((time.perf_counter() - started) * 1000)
+            queries = counter.count - before
+    except asyncio.TimeoutError:
+        result["error"] = f"timeout > {timeout}s"
+    except Exception as e:  # noqa: BLE001 - фиксируем в отчете и идем дальше
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    if timings:
+        result.update(
+            runs=len(timings),
+            queries=queries,
+            p50_ms=round(percentile(timings, 50), 3),
+            p95_ms=round(percentile(timings, 95), 3),
+            p99_ms=round(percentile(timings, 99), 3),
+            mean_ms=round(sum(timings) / len(timings), 3),
+        )
+    return result
+
+
+async def run_suite(
+    engine: AsyncEngine,
+    backend: str,
+    size: str,
+    functions: list[str],
+    repeat: int,
+    timeout: float,
+) -> list[dict]:
+    async_session.configure(bind=engine)
+    counter = QueryCounter(engine)
+    results = []
+    try:
+        sample = await load_sample()
+        for name in functions:
+            res = await bench_function(name, sample, counter, repeat, timeout)
+            res.update(backend=backend, size=size)
+            logger.info(
+                "%-8s %-5s %-36s p50=%s ms queries=%s %s",
+                backend, size, name, res.get("p50_ms"), res.get("queries"), res.get("error", ""),
+            )
+            results.append(res)
+    finally:
+        counter.close()
+        await engine.dispose()
+    return results
+
+
+async def run(args: argparse.Namespace) -> dict:
+    # __all__ может содержать повторы (get_employees_with_reports)
+    functions = list(dict.fromkeys(db.__all__))
+    if args.functions:
+        wanted = set(args.functions.split(","))
+        functions = [f for f in functions if f in wanted]
+
+    results: list[dict] = []
+    for size in args.sizes.split(","):
+        if size not in SIZES:
+            raise SystemExit(f"Неизвестный размер {size!r}, доступны: {', '.join(SIZES)}")
+
+        if not args.skip_sqlite:
+            engine = await prepare_sqlite(size, reseed=args.reseed)
+            results += await run_suite(engine, "sqlite", size, functions, args.repeat, args.timeout)
+
+        if args.postgres_url:
+            engine = await prepare_postgres(args.postgres_url, size, reseed=not args.no_seed)
+            results += await run_suite(engine, "postgres", size, functions, args.repeat, args.timeout)
+
+    return {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(base_path: str, new_path: str, threshold: float) -> int:
+    """Печатает сравнение двух прогонов. Возвращает число регрессий."""
+    base = json.loads(Path(base_path).read_text(encoding="utf-8"))["results"]
+    new = json.loads(Path(new_path).read_text(encoding="utf-8"))["results"]
+    index = {(r["backend"], r["size"], r["function"]): r for r in base}
+
+    regressions = 0
+    print(f"{'backend':8} {'size':5} {'function':36} {'p50 old':>9} {'p50 new':>9} {'ratio':>6} {'queries':>11}")
+    for r in new:
+        key = (r["backend"], r["size"], r["function"])
+        old = index.get(key)
+        if not old or "p50_ms" not in old or "p50_ms" not in r:
+            continue
+
+        ratio = r["p50_ms"] / old["p50_ms"] if old["p50_ms"] else 1.0
+        flags = []
+        if r["queries"] > old["queries"]:
+            flags.append("MORE QUERIES")
+        if ratio > threshold:
+            flags.append("SLOWER")
+        regressions += bool(flags)
+        print(
+            f"{key[0]:8} {key[1]:5} {key[2]:36} {old['p50_ms']:9.2f} {r['p50_ms']:9.2f} "
+            f"{ratio:6.2f} {old['queries']:>5}->{r['queries']:<5} {' '.join(flags)}"
+        )
+    return regressions
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Бенчмарк функций app.crud.")
+    parser.add_argument("--sizes", default="1k,100k,10m", help="Через запятую: 1k,100k,10m")
+    parser.add_argument("--postgres-url", help="postgresql+asyncpg://... (база будет пересоздана)")
+    parser.add_argument("--skip-sqlite", action="store_true")
+    parser.add_argument("--no-seed", action="store_true", help="Не пересоздавать Postgres-набор.")
+    parser.add_argument("--reseed", action="store_true", help="Пересоздать кеш SQLite-наборов.")
+    parser.add_argument("--functions", help="Только указанные функции, через запятую.")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=60.0, help="Лимит на один вызов, c.")
+    parser.add_argument("--output", default=str(DATA_DIR / "crud.json"))
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"))
+    parser.add_argument("--threshold", type=float, default=1.25, help="Допустимое замедление p50.")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    if args.compare:
+        regressions = compare(*args.compare, threshold=args.threshold)
+        sys.exit(1 if regressions else 0)
+
+    report = asyncio.run(run(args))
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"Результаты сохранены в {args.output}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
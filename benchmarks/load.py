@@ -0,0 +1,389 @@
+"""Сквозной нагрузочный сценарий через aiogram Dispatcher.
+
+Синтетические `Update` подаются прямо в `Dispatcher` из `app.main`, а Bot
+работает через заглушку сессии, которая только записывает исходящие вызовы
+API. Сотрудники параллельно проходят «✅ Пройти чек-лист» → `start_` → `ans_`,
+управляющие листают архив, нажимая кнопки из последнего полученного сообщения.
+
+Запуск:
+    python -m benchmarks.load --size 100k --workers 300 --admins 20 --passes 3
+    python -m benchmarks.load --database-url postgresql+asyncpg://... --workers 500
+
+В отчете: пропускная способность, p50/p95/p99 по каждому хендлеру, исходящие
+вызовы API и показатели БД (время в запросах, пик занятых соединений пула,
+ошибки блокировок).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from collections.abc import AsyncGenerator
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+# Allow running as a script: `python benchmarks/load.py`
+if __package__ is None or __package__ == "":
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from aiogram import BaseMiddleware, Bot
+from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.base import BaseSession
+from aiogram.enums import ParseMode
+from aiogram.methods import TelegramMethod
+from aiogram.types import Chat, InlineKeyboardMarkup, Message, Update
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.db import async_session
+from app.models import AdminShop, User
+from benchmarks.common import DATA_DIR, SIZES, percentile, prepare_sqlite
+
+
+logger = logging.getLogger(__name__)
+
+BOT_ID = 100_000
+
+
+class RecordingSession(BaseSession):
+    """Сессия Bot API без сети: запоминает вызовы и последний ответ в каждый чат."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls: Counter[str] = Counter()
+        self.last_text: dict[int, str] = {}
+        self.last_markup: dict[int, InlineKeyboardMarkup] = {}
+        self.last_message_id: dict[int, int] = {}
+        self._message_ids = itertools.count(1)
+
+    async def make_request(self, bot: Bot, method: TelegramMethod[Any], timeout: int | None = None) -> Any:
+        name = type(method).__name__
+        self.calls[name] += 1
+
+        chat_id = getattr(method, "chat_id", None)
+        markup = getattr(method, "reply_markup", None)
+        text = getattr(method, "text", None) or getattr(method, "caption", None)
+        if isinstance(chat_id, int):
+            if text is not None:
+                self.last_text[chat_id] = text
+            if isinstance(markup, InlineKeyboardMarkup):
+                self.last_markup[chat_id] = markup
+            elif text is not None and name in ("SendMessage", "EditMessageText"):
+                self.last_markup.pop(chat_id, None)
+
+        if name in ("SendMessage", "SendPhoto"):
+            message_id = next(self._message_ids)
+            self.last_message_id[chat_id] = message_id
+            return Message(
+                message_id=message_id,
+                date=datetime.now(),
+                chat=Chat(id=chat_id, type="private"),
+                text=text,
+            )
+        # edit/delete/answer_callback_query и прочее - достаточно True
+        return True
+
+    async def close(self) -> None:
+        pass
+
+    async def stream_content(self, *args: Any, **kwargs: Any) -> AsyncGenerator[bytes, None]:
+        # Абстрактный в BaseSession; скачивание файлов в нагрузке не моделируется
+        return
+        yield
+
+
+class HandlerTimer(BaseMiddleware):
+    """Латентность по имени хендлера."""
+
+    def __init__(self) -> None:
+        self.timings: dict[str, list[float]] = defaultdict(list)
+        self.errors: Counter[str] = Counter()
+
+    async def __call__(self, handler, event, data):
+        name = data["handler"].callback.__name__
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            self.errors[name] += 1
+            raise
+        finally:
+            self.timings[name].append((time.perf_counter() - started) * 1000)
+
+
+class DbMonitor:
+    """Время в SQL-запросах и занятость пула соединений."""
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine.sync_engine
+        self.queries = 0
+        self.query_ms = 0.0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.locked_errors = 0
+        event.listen(self.engine, "before_cursor_execute", self._before)
+        event.listen(self.engine, "after_cursor_execute", self._after)
+        event.listen(self.engine, "handle_error", self._error)
+        event.listen(self.engine.pool, "checkout", self._checkout)
+        event.listen(self.engine.pool, "checkin", self._checkin)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_started"] = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        self.queries += 1
+        self.query_ms += (time.perf_counter() - conn.info.pop("query_started")) * 1000
+
+    def _error(self, context):
+        if "locked" in str(context.original_exception).lower():
+            self.locked_errors += 1
+
+    def _checkout(self, *args):
+        self.checked_out += 1
+        self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def _checkin(self, *args):
+        self.checked_out -= 1
+
+
+class Simulator:
+    def __init__(self, bot: Bot, dp, session: RecordingSession, think_ms: int) -> None:
+        self.bot = bot
+        self.dp = dp
+        self.session = session
+        self.think_ms = think_ms
+        self.update_ids = itertools.count(1)
+        self.updates = 0
+        self.failed = 0
+
+    async def _feed(self, payload: dict) -> None:
+        payload["update_id"] = next(self.update_ids)
+        update = Update.model_validate(payload, context={"bot": self.bot})
+        self.updates += 1
+        try:
+            await self.dp.feed_update(self.bot, update)
+        except Exception:
+            self.failed += 1
+            logger.exception("Ошибка обработки update")
+        if self.think_ms:
+            await asyncio.sleep(random.uniform(0, self.think_ms) / 1000)
+
+    @staticmethod
+    def _user(tg_id: int) -> dict:
+        return {"id": tg_id, "is_bot": False, "first_name": "Load"}
+
+    def _message(self, tg_id: int, **fields: Any) -> dict:
+        return {
+            "message_id": next(self.update_ids),
+            "date": int(time.time()),
+            "chat": {"id": tg_id, "type": "private"},
+            "from": self._user(tg_id),
+            **fields,
+        }
+
+    async def send_text(self, tg_id: int, text: str) -> None:
+        await self._feed({"message": self._message(tg_id, text=text)})
+
+    async def send_photo(self, tg_id: int) -> None:
+        photo = [{"file_id": "AgACAgIAAxkBAAIload", "file_unique_id": "load", "width": 90, "height": 90}]
+        await self._feed({"message": self._message(tg_id, photo=photo)})
+
+    async def press(self, tg_id: int, data: str) -> None:
+        bot_message = {
+            "message_id": self.session.last_message_id.get(tg_id, 1),
+            "date": int(time.time()),
+            "chat": {"id": tg_id, "type": "private"},
+            "from": {"id": BOT_ID, "is_bot": True, "first_name": "Bot"},
+            "text": self.session.last_text.get(tg_id, ""),
+        }
+        await self._feed(
+            {
+                "callback_query": {
+                    "id": str(next(self.update_ids)),
+                    "from": self._user(tg_id),
+                    "chat_instance": str(tg_id),
+                    "message": bot_message,
+                    "data": data,
+                }
+            }
+        )
+
+    def buttons(self, tg_id: int, prefix: str = "") -> list[str]:
+        markup = self.session.last_markup.get(tg_id)
+        if not markup:
+            return []
+        return [
+            b.callback_data
+            for row in markup.inline_keyboard
+            for b in row
+            if b.callback_data and b.callback_data.startswith(prefix)
+        ]
+
+    async def worker_flow(self, tg_id: int, passes: int) -> None:
+        for _ in range(passes):
+            await self.send_text(tg_id, "✅ Пройти чек-лист")
+            options = self.buttons(tg_id, "start_")
+            if not options:
+                return
+            await self.press(tg_id, random.choice(options))
+
+            # Отвечаем, пока бот не сообщит о завершении
+            for _step in range(200):
+                text = self.session.last_text.get(tg_id, "")
+                if "Чек-лист завершен" in text or "нет вопросов" in text:
+                    break
+                if "Пришлите фото" in text or "Сначала выберите" in text:
+                    await self.send_photo(tg_id)
+                    continue
+                answers = self.buttons(tg_id, "ans_")
+                if answers:
+                    await self.press(tg_id, random.choice(answers))
+                else:
+                    await self.send_text(tg_id, "Все в порядке")
+
+    async def admin_flow(self, tg_id: int, clicks: int) -> None:
+        skip = ("close_", "cancel", "cleanup_and_back")
+        await self.send_text(tg_id, "🗄 Архив")
+        for _ in range(clicks):
+            options = [b for b in self.buttons(tg_id) if not b.startswith(skip)]
+            if not options:
+                await self.send_text(tg_id, "🗄 Архив")
+                continue
+            await self.press(tg_id, random.choice(options))
+
+
+async def _load_actors(workers: int, admins: int) -> tuple[list[int], list[int]]:
+    async with async_session() as session:
+        worker_ids = list(
+            (await session.scalars(select(User.tg_id).where(User.role == "worker").limit(workers))).all()
+        )
+        admin_ids = list(
+            (
+                await session.scalars(
+                    select(AdminShop.admin_tg_id).distinct().limit(admins)
+                )
+            ).all()
+        )
+    return worker_ids, admin_ids
+
+
+def _summary(timer: HandlerTimer, db_monitor: DbMonitor, sim: Simulator, elapsed: float, session: RecordingSession) -> dict:
+    handlers = {}
+    for name, values in sorted(timer.timings.items()):
+        handlers[name] = {
+            "count": len(values),
+            "errors": timer.errors.get(name, 0),
+            "p50_ms": round(percentile(values, 50), 2),
+            "p95_ms": round(percentile(values, 95), 2),
+            "p99_ms": round(percentile(values, 99), 2),
+        }
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "updates": sim.updates,
+        "failed_updates": sim.failed,
+        "throughput_ups": round(sim.updates / elapsed, 1) if elapsed else 0,
+        "handlers": handlers,
+        "api_calls": dict(session.calls),
+        "db": {
+            "queries": db_monitor.queries,
+            "query_time_s": round(db_monitor.query_ms / 1000, 2),
+            "avg_query_ms": round(db_monitor.query_ms / db_monitor.queries, 3) if db_monitor.queries else 0,
+            "peak_checked_out": db_monitor.peak_checked_out,
+            "locked_errors": db_monitor.locked_errors,
+        },
+    }
+
+
+def _print_summary(summary: dict) -> None:
+    print(
+        f"\n{summary['updates']} updates за {summary['elapsed_s']} c "
+        f"({summary['throughput_ups']} upd/s), ошибок: {summary['failed_updates']}"
+    )
+    print(f"\n{'handler':36} {'count':>7} {'p50':>9} {'p95':>9} {'p99':>9} {'err':>5}")
+    for name, h in summary["handlers"].items():
+        print(
+            f"{name:36} {h['count']:7} {h['p50_ms']:9.2f} {h['p95_ms']:9.2f} "
+            f"{h['p99_ms']:9.2f} {h['errors']:5}"
+        )
+    db = summary["db"]
+    print(
+        f"\nБД: {db['queries']} запросов, {db['query_time_s']} c в запросах "
+        f"(среднее {db['avg_query_ms']} мс), пик соединений {db['peak_checked_out']}, "
+        f"ошибок блокировки {db['locked_errors']}"
+    )
+    print("API:", ", ".join(f"{k}={v}" for k, v in sorted(summary["api_calls"].items())))
+
+
+async def run(args: argparse.Namespace) -> dict:
+    if args.database_url:
+        engine = create_async_engine(args.database_url)
+    else:
+        engine = await prepare_sqlite(args.size)
+    async_session.configure(bind=engine)
+
+    from app.main import create_dispatcher
+
+    dp = create_dispatcher()
+    timer = HandlerTimer()
+    dp.message.middleware(timer)
+    dp.callback_query.middleware(timer)
+    db_monitor = DbMonitor(engine)
+
+    session = RecordingSession()
+    bot = Bot(
+        token=f"{BOT_ID}:LOADTEST",
+        session=session,
+        default=DefaultBotProperties(parse_mode=ParseMode.HTML),
+    )
+    sim = Simulator(bot, dp, session, think_ms=args.think_ms)
+
+    workers, admins = await _load_actors(args.workers, args.admins)
+    logger.info("Сотрудников: %s, управляющих: %s", len(workers), len(admins))
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(
+            *(sim.worker_flow(tg_id, args.passes) for tg_id in workers),
+            *(sim.admin_flow(tg_id, args.admin_clicks) for tg_id in admins),
+        )
+    finally:
+        elapsed = time.perf_counter() - started
+        await engine.dispose()
+
+    return _summary(timer, db_monitor, sim, elapsed, session)
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Нагрузочный прогон бота через Dispatcher.")
+    parser.add_argument("--size", default="100k", choices=list(SIZES), help="SQLite-набор из benchmarks.common")
+    parser.add_argument("--database-url", help="Готовая БД вместо SQLite-набора.")
+    parser.add_argument("--workers", type=int, default=200)
+    parser.add_argument("--admins", type=int, default=10)
+    parser.add_argument("--passes", type=int, default=2, help="Прохождений чек-листа на сотрудника.")
+    parser.add_argument("--admin-clicks", type=int, default=30)
+    parser.add_argument("--think-ms", type=int, default=0, help="Пауза между действиями, до N мс.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=str(DATA_DIR / "load.json"))
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    random.seed(args.seed)
+    summary = asyncio.run(run(args))
+    _print_summary(summary)
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.output).write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -1,10 +1,29 @@
+from datetime import time
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     # NOTE: default "" so imports don't crash when env missing.
     # main.py will validate that token is set before starting polling.
-    bot_token: str
-    database_url: str 
+    bot_token: str = ""
+    database_url: str = "sqlite+aiosqlite:///bot.db"
+    # Пояс меток времени в БД и точек по умолчанию (Europe/Moscow); "" - пояс сервера
+    timezone: str = ""
+    # Начало смены по умолчанию: отчеты до него относятся к предыдущему рабочему дню
+    shift_start: time = time(0, 0)
+    # Ответы старше archive_after_months месяцев выносятся в archive_dir
+    # (общий каталог для всех экземпляров бота, см. app.jobs.archive)
+    archive_dir: str = "archive"
+    archive_after_months: int = 6
+    # Мягко удаленные шаблоны старше стольких дней удаляются (app.jobs.purge)
+    checklist_purge_after_days: int = 30
+    # Незавершенные отчеты старше стольких часов помечаются брошенными
+    report_abandon_after_hours: int = 12
+    # Через сколько после начала смены точки (ЧЧ:ММ, по ее часам) напоминать
+    # о не пройденных чек-листах; "" - не напоминать
+    reminder_after_shift: str = "10:00"
+    # Фоновые задачи по расписанию (app.jobs.schedule) внутри процесса бота
+    scheduler_enabled: bool = True
     model_config = SettingsConfigDict(
         env_file=".env", 
         env_file_encoding="utf-8",